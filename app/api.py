@@ -1,15 +1,22 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File, Request
+from fastapi import FastAPI, HTTPException, UploadFile, File, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel, validator
+from . import metrics
+from .logs import Truncated, configure_logging, dropped_records, log_sampled
+from .parser import StreamParser
+from .profiling import profiler
 from .store import store
+from .parallel import shutdown_pools
+from .sessions import sessions
+from .streaming import DuplexStreamingResponse, check_stream
 import os
-import tempfile
 import logging
 import time
-from typing import Optional
+from typing import List, Optional
 
-# Configurar logging
-logging.basicConfig(level=logging.INFO)
+# Logging asíncrono (cola + listener); ver logs.py para nivel, formato y muestreo
+configure_logging()
 logger = logging.getLogger(__name__)
 
 app = FastAPI(title="AFD Recognizer", version="1.0")
@@ -25,8 +32,20 @@ app.add_middleware(
 
 # Límites de seguridad
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
+UPLOAD_CHUNK_SIZE = 64 * 1024
 MAX_WORD_LENGTH = 10000
 MAX_AUTOMATA_NAME_LENGTH = 100
+# Límites de /check/batch (configurables por variables de entorno)
+MAX_BATCH_WORDS = int(os.getenv("AFD_MAX_BATCH_WORDS", "10000"))
+MAX_BATCH_CHARS = int(os.getenv("AFD_MAX_BATCH_CHARS", str(1024 * 1024)))
+# Paralelismo de /check/batch: procesos (1 = en el mismo proceso) y tamaño de fragmento
+BATCH_WORKERS = int(os.getenv("AFD_BATCH_WORKERS", "1"))
+BATCH_CHUNK_SIZE = int(os.getenv("AFD_BATCH_CHUNK_SIZE", "1000"))
+# Longitud máxima de una línea en /check/stream
+MAX_STREAM_LINE_LENGTH = int(os.getenv("AFD_MAX_STREAM_LINE_LENGTH", str(64 * 1024)))
+# Límites de /scan: tamaño del texto y coincidencias devueltas
+MAX_SCAN_CHARS = int(os.getenv("AFD_MAX_SCAN_CHARS", str(1024 * 1024)))
+MAX_SCAN_MATCHES = int(os.getenv("AFD_MAX_SCAN_MATCHES", "10000"))
 
 @app.on_event("startup")
 async def startup_event():
@@ -35,8 +54,14 @@ async def startup_event():
     store.initialize()
     logger.info("✅ Store inicializado correctamente")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Cierra los pools de procesos usados por /check/batch"""
+    shutdown_pools()
+
 class LoadRequest(BaseModel):
     path: str  # ruta en el contenedor, p.ej. /app/data/automatas.txt
+    minimize: bool = False  # guardar también la forma mínima para simular
     
     @validator('path')
     def validate_path(cls, v):
@@ -47,19 +72,73 @@ class LoadRequest(BaseModel):
             raise ValueError('Path no permitido por seguridad')
         return v
 
+def _validate_automata_name(v: str) -> str:
+    if not v or len(v) > MAX_AUTOMATA_NAME_LENGTH:
+        raise ValueError(f'Nombre de autómata debe tener entre 1 y {MAX_AUTOMATA_NAME_LENGTH} caracteres')
+    # Solo caracteres seguros
+    import re
+    if not re.match(r'^[a-zA-Z0-9_-]+$', v):
+        raise ValueError('Nombre de autómata solo puede contener letras, números, _ y -')
+    return v
+
 class CheckRequest(BaseModel):
     automata: str
     word: str
     max_length: Optional[int] = MAX_WORD_LENGTH
+    include_path: bool = True  # False => solo aceptación, sin trayectoria
+    
+    @validator('automata')
+    def validate_automata_name(cls, v):
+        return _validate_automata_name(v)
+    
+    @validator('word')
+    def validate_word(cls, v):
+        if len(v) > MAX_WORD_LENGTH:
+            raise ValueError(f'Palabra demasiado larga (máximo {MAX_WORD_LENGTH} caracteres)')
+        return v
+    
+    @validator('max_length')
+    def validate_max_length(cls, v):
+        if v is not None and (v < 1 or v > MAX_WORD_LENGTH):
+            raise ValueError(f'max_length debe estar entre 1 y {MAX_WORD_LENGTH}')
+        return v
+
+class CheckBatchRequest(BaseModel):
+    automata: str
+    words: List[str]
+    max_length: Optional[int] = MAX_WORD_LENGTH
+    include_path: bool = False
+    vectorized: bool = False  # motor NumPy: todas las palabras avanzan juntas
+    prefix_cache: bool = False  # retomar desde el prefijo ya visto más largo
     
     @validator('automata')
     def validate_automata_name(cls, v):
-        if not v or len(v) > MAX_AUTOMATA_NAME_LENGTH:
-            raise ValueError(f'Nombre de autómata debe tener entre 1 y {MAX_AUTOMATA_NAME_LENGTH} caracteres')
-        # Solo caracteres seguros
-        import re
-        if not re.match(r'^[a-zA-Z0-9_-]+$', v):
-            raise ValueError('Nombre de autómata solo puede contener letras, números, _ y -')
+        return _validate_automata_name(v)
+    
+    @validator('words')
+    def validate_words(cls, v):
+        if len(v) > MAX_BATCH_WORDS:
+            raise ValueError(f'Demasiadas palabras en el lote (máximo {MAX_BATCH_WORDS})')
+        total = sum(len(w) for w in v)
+        if total > MAX_BATCH_CHARS:
+            raise ValueError(f'Lote demasiado grande: {total} > {MAX_BATCH_CHARS} caracteres')
+        return v
+    
+    @validator('max_length')
+    def validate_max_length(cls, v):
+        if v is not None and (v < 1 or v > MAX_WORD_LENGTH):
+            raise ValueError(f'max_length debe estar entre 1 y {MAX_WORD_LENGTH}')
+        return v
+
+class CheckAllRequest(BaseModel):
+    word: str
+    automata: Optional[List[str]] = None  # None => todos los cargados
+    max_length: Optional[int] = MAX_WORD_LENGTH
+    
+    @validator('automata')
+    def validate_automata_names(cls, v):
+        if v is not None:
+            return [_validate_automata_name(name) for name in v]
         return v
     
     @validator('word')
@@ -74,12 +153,84 @@ class CheckRequest(BaseModel):
             raise ValueError(f'max_length debe estar entre 1 y {MAX_WORD_LENGTH}')
         return v
 
+class CombineRequest(BaseModel):
+    operation: str  # union, intersection, difference o complement
+    operands: List[str]
+    name: str  # nombre del autómata resultante
+    minimize: bool = False
+    
+    @validator('operands')
+    def validate_operands(cls, v):
+        if not 1 <= len(v) <= 2:
+            raise ValueError('Se requieren uno o dos autómatas')
+        return [_validate_automata_name(name) for name in v]
+    
+    @validator('name')
+    def validate_automata_name(cls, v):
+        return _validate_automata_name(v)
+
+class ScanRequest(BaseModel):
+    automata: str
+    text: str
+    longest: bool = False  # solo la coincidencia más larga por posición de inicio
+    max_matches: int = 1000
+    max_match_length: Optional[int] = None
+    
+    @validator('automata')
+    def validate_automata_name(cls, v):
+        return _validate_automata_name(v)
+    
+    @validator('text')
+    def validate_text(cls, v):
+        if len(v) > MAX_SCAN_CHARS:
+            raise ValueError(f'Texto demasiado largo (máximo {MAX_SCAN_CHARS} caracteres)')
+        return v
+    
+    @validator('max_matches')
+    def validate_max_matches(cls, v):
+        if v < 1 or v > MAX_SCAN_MATCHES:
+            raise ValueError(f'max_matches debe estar entre 1 y {MAX_SCAN_MATCHES}')
+        return v
+    
+    @validator('max_match_length')
+    def validate_max_match_length(cls, v):
+        if v is not None and (v < 1 or v > MAX_WORD_LENGTH):
+            raise ValueError(f'max_match_length debe estar entre 1 y {MAX_WORD_LENGTH}')
+        return v
+
+class SessionRequest(BaseModel):
+    automata: str
+    
+    @validator('automata')
+    def validate_automata_name(cls, v):
+        return _validate_automata_name(v)
+
+class FeedRequest(BaseModel):
+    symbols: str  # siguiente fragmento de la palabra
+    
+    @validator('symbols')
+    def validate_symbols(cls, v):
+        if len(v) > MAX_WORD_LENGTH:
+            raise ValueError(f'Fragmento demasiado largo (máximo {MAX_WORD_LENGTH} caracteres)')
+        return v
+
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    start_time = time.time()
+    # Perfilado a pedido: la marca llega al endpoint por ContextVar (ver profiling.py)
+    profiler.request(
+        request.headers.get("x-profile", "").lower() in ("1", "true")
+        or request.query_params.get("profile", "").lower() in ("1", "true")
+    )
+    start_time = time.perf_counter()
     response = await call_next(request)
-    process_time = time.time() - start_time
-    logger.info(f"{request.method} {request.url.path} - {response.status_code} - {process_time:.3f}s")
+    process_time = time.perf_counter() - start_time
+    # Ruta como plantilla (/sessions/{session_id}) para acotar las etiquetas
+    route = request.scope.get("route")
+    path = route.path if route is not None else "<sin_ruta>"
+    metrics.REQUESTS.inc(path, request.method, str(response.status_code))
+    metrics.REQUEST_SECONDS.observe(process_time, path, request.method)
+    log_sampled(logger, "%s %s - %s - %.3fs", request.method, request.url.path,
+                response.status_code, process_time)
     return response
 
 @app.get("/health")
@@ -87,8 +238,12 @@ def health():
     return {"status": "ok"}
 
 @app.post("/upload")
-async def upload_file(file: UploadFile = File(...)):
-    """Sube un archivo de autómatas y lo carga directamente"""
+@profiler.profiled("/upload", sampled=True)
+async def upload_file(file: UploadFile = File(...), minimize: bool = False):
+    """Sube un archivo de autómatas y lo carga directamente.
+
+    Con ``?minimize=true`` se guarda además la forma mínima para simular.
+    """
     try:
         # Validaciones de seguridad
         if not file.filename:
@@ -100,51 +255,52 @@ async def upload_file(file: UploadFile = File(...)):
         if not file.filename.endswith('.txt'):
             raise HTTPException(status_code=400, detail="Solo se permiten archivos .txt")
         
-        # Verificar tamaño del archivo
-        content = await file.read()
-        if len(content) > MAX_FILE_SIZE:
-            raise HTTPException(
-                status_code=413, 
-                detail=f"Archivo demasiado grande. Máximo: {MAX_FILE_SIZE // (1024*1024)}MB"
-            )
-        
-        if len(content) == 0:
-            raise HTTPException(status_code=400, detail="Archivo vacío")
-        
-        # Crear un archivo temporal
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as tmp_file:
-            try:
-                content_str = content.decode('utf-8')
-            except UnicodeDecodeError:
-                raise HTTPException(status_code=400, detail="El archivo debe estar en formato UTF-8")
-            
-            tmp_file.write(content_str)
-            tmp_path = tmp_file.name
-        
         try:
-            # Cargar los autómatas desde el archivo temporal
-            logger.info(f"Cargando archivo: {file.filename}")
-            loaded = store.load_from_file(tmp_path)
-            logger.info(f"Autómatas cargados exitosamente: {loaded}")
+            # Parsear por fragmentos, sin leer todo el archivo ni usar temporales
+            log_sampled(logger, "Cargando archivo: %s", file.filename)
+            parser = StreamParser()
+            size = 0
+            t0 = time.perf_counter()
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                # Verificar tamaño del archivo
+                size += len(chunk)
+                if size > MAX_FILE_SIZE:
+                    raise HTTPException(
+                        status_code=413, 
+                        detail=f"Archivo demasiado grande. Máximo: {MAX_FILE_SIZE // (1024*1024)}MB"
+                    )
+                parser.feed(chunk)
+            
+            if size == 0:
+                raise HTTPException(status_code=400, detail="Archivo vacío")
+            
+            loaded = store.load_parsed(parser, file.filename, minimize=minimize)
+            metrics.PARSE_SECONDS.observe(time.perf_counter() - t0, "upload")
+            metrics.PARSE_BYTES.inc("upload", amount=size)
+            log_sampled(logger, "Autómatas cargados exitosamente: %s", loaded)
             
-            return {
+            result = {
                 "message": f"Archivo '{file.filename}' subido y cargado exitosamente",
                 "loaded": loaded,
                 "count": len(loaded),
                 "filename": file.filename
             }
+            if minimize:
+                result["minimization"] = [store.minimization_stats(name) for name in loaded]
+            return result
+        except HTTPException:
+            raise
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=400, detail="El archivo debe estar en formato UTF-8")
         except ValueError as e:
             logger.error(f"Error de validación cargando {file.filename}: {e}")
             raise HTTPException(status_code=400, detail=f"Error de validación: {str(e)}")
         except Exception as e:
             logger.error(f"Error procesando {file.filename}: {e}")
             raise HTTPException(status_code=500, detail=f"Error interno procesando archivo")
-        finally:
-            # Limpiar archivo temporal
-            try:
-                os.unlink(tmp_path)
-            except:
-                pass
             
     except HTTPException:
         raise
@@ -153,16 +309,23 @@ async def upload_file(file: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail="Error interno del servidor")
 
 @app.post("/load")
+@profiler.profiled("/load")
 def load(req: LoadRequest):
     try:
-        logger.info(f"Cargando desde path: {req.path}")
-        loaded = store.load_from_file(req.path)
-        logger.info(f"Autómatas cargados: {loaded}")
-        return {
+        log_sampled(logger, "Cargando desde path: %s", req.path)
+        t0 = time.perf_counter()
+        loaded = store.load_from_file(req.path, minimize=req.minimize)
+        metrics.PARSE_SECONDS.observe(time.perf_counter() - t0, "load")
+        metrics.PARSE_BYTES.inc("load", amount=os.path.getsize(req.path))
+        log_sampled(logger, "Autómatas cargados: %s", loaded)
+        result = {
             "loaded": loaded,
             "count": len(loaded),
             "path": req.path
         }
+        if req.minimize:
+            result["minimization"] = [store.minimization_stats(name) for name in loaded]
+        return result
     except FileNotFoundError:
         logger.error(f"Archivo no encontrado: {req.path}")
         raise HTTPException(status_code=404, detail=f"Archivo no encontrado: {req.path}")
@@ -189,23 +352,32 @@ def list_automata():
         raise HTTPException(status_code=500, detail="Error interno del servidor")
 
 @app.post("/check")
+@profiler.profiled("/check", sampled=True)
 def check(req: CheckRequest):
     try:
-        logger.info(f"Verificando '{req.word}' en autómata '{req.automata}'")
-        
         # Usar el límite especificado en la request
         max_length = req.max_length or MAX_WORD_LENGTH
         
-        result = store.check(req.automata, req.word, max_length=max_length)
+        t0 = time.perf_counter()
+        result = store.check(
+            req.automata, req.word, max_length=max_length, include_path=req.include_path
+        )
+        metrics.record_checks(req.automata, time.perf_counter() - t0, [len(req.word)],
+                              int(result["accepted"]))
         
         # Agregar información adicional útil
         result.update({
             "word_length": len(req.word),
-            "max_length_used": max_length,
-            "path_length": len(result.get("path", []))
+            "max_length_used": max_length
         })
+        if req.include_path:
+            result["path_length"] = len(result["path"])
         
-        logger.info(f"Resultado: {result['accepted']}, path length: {result['path_length']}")
+        log_sampled(
+            logger, "Verificación de '%s' en '%s': %s", Truncated(req.word), req.automata,
+            result["accepted"], automata=req.automata, word_length=len(req.word),
+            accepted=result["accepted"]
+        )
         return result
         
     except KeyError as ke:
@@ -218,6 +390,192 @@ def check(req: CheckRequest):
         logger.error(f"Error inesperado en check: {e}")
         raise HTTPException(status_code=500, detail="Error interno del servidor")
 
+@app.post("/check/batch")
+@profiler.profiled("/check/batch")
+def check_batch(req: CheckBatchRequest):
+    """Verifica muchas palabras contra un mismo autómata; resultados en columnas"""
+    try:
+        max_length = req.max_length or MAX_WORD_LENGTH
+        t0 = time.perf_counter()
+        result = store.check_many(
+            req.automata, req.words, max_length=max_length, include_path=req.include_path,
+            workers=BATCH_WORKERS, chunk_size=BATCH_CHUNK_SIZE, vectorized=req.vectorized,
+            prefix_cache=req.prefix_cache
+        )
+        metrics.record_checks(req.automata, time.perf_counter() - t0,
+                              [len(w) for w in req.words], result["accepted_count"])
+        result["max_length_used"] = max_length
+        log_sampled(logger, "Lote '%s': %d palabras, %d aceptadas", req.automata,
+                    result["count"], result["accepted_count"])
+        return result
+        
+    except KeyError as ke:
+        logger.error(f"Autómata no encontrado: {ke}")
+        raise HTTPException(status_code=404, detail=f"Autómata no encontrado: {str(ke)}")
+    except ValueError as e:
+        logger.error(f"Error de validación: {e}")
+        raise HTTPException(status_code=400, detail=f"Error de validación: {str(e)}")
+    except Exception as e:
+        logger.error(f"Error inesperado en check/batch: {e}")
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+@app.post("/check/all")
+@profiler.profiled("/check/all")
+def check_all(req: CheckAllRequest):
+    """Autómatas (todos o los indicados) que aceptan la palabra, en una sola pasada"""
+    try:
+        max_length = req.max_length or MAX_WORD_LENGTH
+        names = req.automata if req.automata is not None else store.list()
+        t0 = time.perf_counter()
+        result = store.classify(req.word, names=names, max_length=max_length)
+        # Una pasada para todos: el tiempo se reparte por igual entre los autómatas
+        elapsed = (time.perf_counter() - t0) / max(result["checked"], 1)
+        accepted = set(result["accepted"])
+        for name in set(names):
+            metrics.record_checks(name, elapsed, [len(req.word)], int(name in accepted))
+        result.update({
+            "accepted_count": len(result["accepted"]),
+            "word_length": len(req.word),
+            "max_length_used": max_length
+        })
+        log_sampled(logger, "Clasificación de '%s': %d/%d autómatas aceptan", Truncated(req.word),
+                    result["accepted_count"], result["checked"])
+        return result
+        
+    except KeyError as ke:
+        logger.error(f"Autómata no encontrado: {ke}")
+        raise HTTPException(status_code=404, detail=f"Autómata no encontrado: {str(ke)}")
+    except ValueError as e:
+        logger.error(f"Error de validación: {e}")
+        raise HTTPException(status_code=400, detail=f"Error de validación: {str(e)}")
+    except Exception as e:
+        logger.error(f"Error inesperado en check/all: {e}")
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+@app.post("/check/stream")
+async def check_stream_endpoint(
+    request: Request,
+    automata: Optional[str] = None,
+    max_length: int = MAX_WORD_LENGTH,
+    include_path: bool = False,
+    prefix_cache: bool = False
+):
+    """Verifica un flujo de palabras (o registros NDJSON) y responde en NDJSON.
+
+    Con ``?automata=NOMBRE`` cada línea del cuerpo es una palabra; sin él,
+    cada línea es un registro ``{"automata": ..., "word": ...}``. Con
+    ``?prefix_cache=true`` las líneas con prefijos comunes retoman la
+    simulación desde el último checkpoint compartido.
+    """
+    if max_length < 1 or max_length > MAX_WORD_LENGTH:
+        raise HTTPException(status_code=400, detail=f"max_length debe estar entre 1 y {MAX_WORD_LENGTH}")
+    if prefix_cache and include_path:
+        raise HTTPException(status_code=400, detail="prefix_cache no construye rutas (use include_path=false)")
+    if automata is not None:
+        try:
+            store.get(_validate_automata_name(automata))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Error de validación: {str(e)}")
+        except KeyError as ke:
+            raise HTTPException(status_code=404, detail=f"Autómata no encontrado: {str(ke)}")
+    
+    log_sampled(logger, "Iniciando verificación en flujo (autómata: %s)", automata or "por registro")
+    return DuplexStreamingResponse(
+        check_stream(
+            store, request.stream(), automata=automata, max_length=max_length,
+            include_path=include_path, max_line_length=MAX_STREAM_LINE_LENGTH,
+            prefix_cache=prefix_cache
+        )
+    )
+
+@app.post("/scan")
+@profiler.profiled("/scan")
+def scan(req: ScanRequest):
+    """Busca en el texto las subcadenas aceptadas por el autómata"""
+    try:
+        scanner = store.get(req.automata).scanner(
+            longest=req.longest, max_match=req.max_match_length
+        )
+        t0 = time.perf_counter()
+        # Una de más para saber si hubo truncamiento
+        found = scanner.matches(req.text, limit=req.max_matches + 1)
+        elapsed = time.perf_counter() - t0
+        truncated = len(found) > req.max_matches
+        found = found[:req.max_matches]
+        mb = len(req.text.encode("utf-8")) / (1024 * 1024)
+        log_sampled(logger, "Escaneo '%s': %d coincidencias en %.2fMB", req.automata, len(found), mb)
+        return {
+            "automata": req.automata,
+            "count": len(found),
+            "truncated": truncated,
+            "matches": [
+                {"start": start, "end": end, "match": req.text[start:end]}
+                for start, end in found
+            ],
+            "elapsed_seconds": elapsed,
+            "mb_per_s": mb / elapsed if elapsed else None
+        }
+    except KeyError as ke:
+        logger.error(f"Autómata no encontrado: {ke}")
+        raise HTTPException(status_code=404, detail=f"Autómata no encontrado: {str(ke)}")
+    except ValueError as e:
+        logger.error(f"Error de validación: {e}")
+        raise HTTPException(status_code=400, detail=f"Error de validación: {str(e)}")
+    except Exception as e:
+        logger.error(f"Error inesperado en scan: {e}")
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+@app.post("/sessions")
+def open_session(req: SessionRequest):
+    """Abre una sesión de simulación incremental sobre un autómata"""
+    try:
+        session = sessions.open(store.get(req.automata))
+        log_sampled(logger, "Sesión %s abierta sobre '%s'", session.id, req.automata)
+        result = session.status()
+        result["ttl_seconds"] = sessions.ttl
+        return result
+    except KeyError as ke:
+        logger.error(f"Autómata no encontrado: {ke}")
+        raise HTTPException(status_code=404, detail=f"Autómata no encontrado: {str(ke)}")
+    except ValueError as e:
+        logger.error(f"Error de validación: {e}")
+        raise HTTPException(status_code=400, detail=f"Error de validación: {str(e)}")
+    except Exception as e:
+        logger.error(f"Error inesperado abriendo sesión: {e}")
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+@app.post("/sessions/{session_id}/feed")
+def feed_session(session_id: str, req: FeedRequest):
+    """Agrega símbolos a la palabra de la sesión y avanza su estado actual"""
+    try:
+        return sessions.feed(session_id, req.symbols)
+    except KeyError as ke:
+        raise HTTPException(status_code=404, detail=ke.args[0])
+    except Exception as e:
+        logger.error(f"Error inesperado alimentando sesión: {e}")
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+@app.get("/sessions/{session_id}")
+def get_session(session_id: str):
+    """Estado de la sesión: si la palabra recibida hasta ahora es aceptada"""
+    try:
+        return sessions.status(session_id)
+    except KeyError as ke:
+        raise HTTPException(status_code=404, detail=ke.args[0])
+
+@app.delete("/sessions/{session_id}")
+def close_session(session_id: str):
+    """Cierra la sesión antes de que expire"""
+    try:
+        # La palabra de la sesión queda completa al cerrarla: se registra entonces,
+        # con el tiempo acumulado de todos sus feed
+        final = sessions.close(session_id)
+        metrics.record_checks(final["automata"], final["simulation_seconds"], [final["length"]],
+                              int(bool(final["accepted"])))
+        return {"message": f"Sesión {session_id} cerrada", "success": True}
+    except KeyError as ke:
+        raise HTTPException(status_code=404, detail=ke.args[0])
+
 @app.get("/automata/{name}/info")
 def get_automata_info(name: str):
     """Obtiene información detallada de un autómata específico"""
@@ -225,7 +583,7 @@ def get_automata_info(name: str):
         if len(name) > MAX_AUTOMATA_NAME_LENGTH:
             raise HTTPException(status_code=400, detail="Nombre de autómata demasiado largo")
         
-        dfa = store.get(name)
+        dfa = store.get_original(name)
         return {
             "name": dfa.name,
             "states": sorted(list(dfa.states)),
@@ -239,7 +597,8 @@ def get_automata_info(name: str):
             "is_complete": dfa.is_complete(),
             "state_count": len(dfa.states),
             "alphabet_size": len(dfa.alphabet),
-            "transition_count": len(dfa.delta)
+            "transition_count": len(dfa.delta),
+            "minimization": store.minimization_stats(name)
         }
     except KeyError:
         raise HTTPException(status_code=404, detail=f"Autómata '{name}' no encontrado")
@@ -247,6 +606,41 @@ def get_automata_info(name: str):
         logger.error(f"Error obteniendo info de {name}: {e}")
         raise HTTPException(status_code=500, detail="Error interno del servidor")
 
+@app.post("/automata/{name}/minimize")
+def minimize_automata(name: str):
+    """Minimiza un autómata (Hopcroft) y reporta los estados antes y después"""
+    try:
+        stats = store.minimize(name)
+        logger.info("Autómata %s minimizado: %d -> %d estados", name,
+                    stats["states_before"], stats["states_after"])
+        return stats
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Autómata '{name}' no encontrado")
+    except ValueError as e:
+        logger.error(f"Error de validación: {e}")
+        raise HTTPException(status_code=400, detail=f"Error de validación: {str(e)}")
+    except Exception as e:
+        logger.error(f"Error minimizando {name}: {e}")
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+@app.post("/automata/combine")
+def combine_automata(req: CombineRequest):
+    """Crea un autómata nuevo por unión, intersección, diferencia o complemento"""
+    try:
+        stats = store.combine(req.operation, req.operands, req.name, minimize=req.minimize)
+        logger.info("Autómata %s = %s(%s): %d estados", req.name, req.operation,
+                    ", ".join(req.operands), stats["states"])
+        return stats
+    except KeyError as ke:
+        logger.error(f"Autómata no encontrado: {ke}")
+        raise HTTPException(status_code=404, detail=f"Autómata no encontrado: {str(ke)}")
+    except ValueError as e:
+        logger.error(f"Error de validación: {e}")
+        raise HTTPException(status_code=400, detail=f"Error de validación: {str(e)}")
+    except Exception as e:
+        logger.error(f"Error combinando autómatas: {e}")
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
+
 @app.post("/admin/clear")
 def clear_all_automatas():
     """Limpia todos los autómatas de la memoria (admin)"""
@@ -280,10 +674,67 @@ def get_store_status():
         return {
             "automata_count": len(automata_list),
             "automata": automata_list,
-            "storage_type": "memory_only",
+            "storage_type": "memory_only" if store.cache_dir is None else "memory+compiled_cache",
+            "cache_dir": store.cache_dir,
+            "shared_registry": store.shared,
+            "generation": store.versions()["generation"],
+            "result_cache": store.result_cache_stats(),
+            "sessions": sessions.stats(),
+            "log_records_dropped": dropped_records(),
             "default_file_exists": os.path.exists("/app/data/automatas.txt"),
             "note": "Los autómatas se mantienen solo en memoria durante la sesión del servidor"
+                    if store.cache_dir is None else
+                    "Los autómatas cargados se restauran desde la caché compilada al reiniciar"
         }
     except Exception as e:
         logger.error(f"Error obteniendo status: {e}")
         raise HTTPException(status_code=500, detail="Error interno del servidor")
+
+@app.get("/admin/profile")
+def get_profile(top: int = 20, sort: str = "cumulative", format: str = "json"):
+    """Perfil acumulado de las peticiones perfiladas (funciones más costosas o volcado pstats)"""
+    if format == "pstats":
+        # Se lee con pstats.Stats(archivo) o snakeviz
+        data = profiler.dump()
+        if data is None:
+            raise HTTPException(status_code=404, detail="Aún no hay peticiones perfiladas")
+        return Response(data, media_type="application/octet-stream",
+                        headers={"Content-Disposition": "attachment; filename=afd.pstats"})
+    if format != "json":
+        raise HTTPException(status_code=400, detail="format debe ser json o pstats")
+    if top < 1 or top > 500:
+        raise HTTPException(status_code=400, detail="top debe estar entre 1 y 500")
+    try:
+        return {**profiler.summary(), "sort": sort, "top": profiler.top(top, sort)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Error de validación: {str(e)}")
+
+@app.post("/admin/profile")
+def configure_profile(sample_rate: float):
+    """Fija la fracción de /check y /upload que se perfila (0 desactiva el muestreo)"""
+    try:
+        profiler.set_sample_rate(sample_rate)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Error de validación: {str(e)}")
+    logger.info("Muestreo de perfilado: %.2f%% de /check y /upload", sample_rate * 100)
+    return profiler.summary()
+
+@app.delete("/admin/profile")
+def reset_profile():
+    """Descarta el perfil acumulado"""
+    profiler.reset()
+    return profiler.summary()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Métricas en formato de exposición de texto de Prometheus"""
+    return PlainTextResponse(metrics.render(store.snapshot()), media_type="text/plain; version=0.0.4")
+
+@app.get("/admin/versions")
+def get_store_versions():
+    """Generación de la instantánea del store y versión de cada autómata (admin)"""
+    try:
+        return store.versions()
+    except Exception as e:
+        logger.error(f"Error obteniendo versiones: {e}")
+        raise HTTPException(status_code=500, detail="Error interno del servidor")
@@ -1,6 +1,139 @@
 import argparse
+import csv
+import io
+import mmap
+import os
+import struct
+import sys
+import time
+from .parallel import DEFAULT_CHUNK_SIZE, check_words_parallel
 from .store import store
 
+# Formato binario de check-file (little endian):
+#   cabecera:  b"AFDR" | versión u8 | flags u8 (bit 0: incluye estado final)
+#              con estado final: cantidad u32 y nombres (longitud u16 + UTF-8)
+#   por línea: aceptada u8 [| índice del estado final i32, -1 si no llegó al final]
+RESULT_MAGIC = b"AFDR"
+OUTPUT_BUFFER_SIZE = 1024 * 1024
+_RECORD = struct.Struct("<B")
+_RECORD_STATE = struct.Struct("<Bi")
+
+def _read_words(path):
+    """Recorre las líneas de un archivo mapeado en memoria (memoria constante)."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            find = mm.find
+            pos, size = 0, len(mm)
+            while pos < size:
+                end = find(b"\n", pos)
+                if end < 0:
+                    end = size
+                line = mm[pos:end]
+                if line.endswith(b"\r"):
+                    line = line[:-1]
+                yield line.decode("utf-8", errors="replace")
+                pos = end + 1
+
+def _final_state_rows(compiled, words, max_length):
+    """Filas (acepta, motivo, posición, índice_de_estado_final o -1)."""
+    n = compiled.n_symbols
+    run, outcome = compiled.run, compiled.outcome
+    for word in words:
+        if len(word) > max_length:
+            yield (False, f"#ERR:word_too_long_{len(word)}>_{max_length}", None, -1)
+            continue
+        current, pos = run(word)
+        ok, reason, position = outcome(word, current, pos)
+        yield (ok, reason, position, current // n if pos == len(word) else -1)
+
+def check_file(name, path, out, workers=1, chunk_size=DEFAULT_CHUNK_SIZE, max_length=10000,
+               fmt="csv", final_state=False):
+    """Verifica cada línea de ``path`` y escribe los resultados en ``out`` (binario).
+
+    ``fmt`` es ``csv`` (línea, aceptada, motivo[, estado_final]) o ``binary``
+    (ver RESULT_MAGIC). Devuelve (líneas, aceptadas).
+    """
+    dfa = store.get(name)
+    dfa.ensure_valid()
+    compiled = dfa.compile()
+    words = _read_words(path)
+    if final_state:
+        if workers > 1:
+            raise ValueError("--final-state no está disponible con --workers > 1")
+        rows = _final_state_rows(compiled, words, max_length)
+    elif workers > 1:
+        rows = check_words_parallel(
+            dfa, words, max_length=max_length, workers=workers, chunk_size=chunk_size
+        )
+    else:
+        rows = (compiled.check_words([w], max_length)[0] for w in words)
+
+    total = accepted = 0
+    if fmt == "binary":
+        header = RESULT_MAGIC + bytes([1, int(final_state)])
+        if final_state:
+            header += struct.pack("<I", len(compiled.states))
+            for state in compiled.states:
+                raw = state.encode("utf-8")
+                header += struct.pack("<H", len(raw)) + raw
+        out.write(header)
+        if final_state:
+            pack = _RECORD_STATE.pack
+            for total, row in enumerate(rows, 1):
+                accepted += row[0]
+                out.write(pack(row[0], row[3]))
+        else:
+            pack = _RECORD.pack
+            for total, row in enumerate(rows, 1):
+                accepted += row[0]
+                out.write(pack(row[0]))
+        return total, accepted
+
+    text = io.TextIOWrapper(out, encoding="utf-8", newline="", write_through=False)
+    try:
+        writer = csv.writer(text)
+        writer.writerow(["line", "accepted", "reason"] + (["final_state"] if final_state else []))
+        states = compiled.states
+        for total, row in enumerate(rows, 1):
+            ok, reason = row[0], row[1]
+            accepted += ok
+            if final_state:
+                writer.writerow([total, int(ok), reason or "", states[row[3]] if row[3] >= 0 else ""])
+            else:
+                writer.writerow([total, int(ok), reason or ""])
+        text.flush()
+    finally:
+        # No cerrar ``out`` (puede ser stdout): solo soltar el envoltorio
+        text.detach()
+    return total, accepted
+
+def scan_file(name, path, out, longest=False, max_match=None):
+    """Escanea ``path`` y escribe un CSV (inicio, fin, coincidencia) en ``out``."""
+    scanner = store.get(name).scanner(longest=longest, max_match=max_match)
+    writer = csv.writer(out)
+    writer.writerow(["start", "end", "match"])
+    stats = {}
+    count = 0
+    for count, row in enumerate(scanner.scan_file(path, stats=stats, with_text=True), 1):
+        writer.writerow(row)
+    return count, stats
+
+def automaton_lines(dfa) -> list:
+    """Líneas del formato del enunciado para ``dfa`` (transiciones en lotes de 200)."""
+    triples = [f"{s},{a},{t}" for (s, a), t in sorted(dfa.delta.items())]
+    lines = [
+        f"1:{dfa.name}:{','.join(sorted(dfa.states))}",
+        f"2:{dfa.name}:{','.join(sorted(dfa.alphabet))}",
+        f"3:{dfa.name}:{dfa.start}",
+    ]
+    if dfa.finals:
+        lines.append(f"4:{dfa.name}:{','.join(sorted(dfa.finals))}")
+    for i in range(0, len(triples), 200):
+        lines.append(f"5:{dfa.name}:{';'.join(triples[i:i + 200])}")
+    return lines
+
 def main():
     parser = argparse.ArgumentParser(
         description="Programa reconocedor de palabras con AFD (CLI)"
@@ -13,22 +146,105 @@ def main():
     check = sub.add_parser("check", help="Verificar si un AFD reconoce una palabra")
     check.add_argument("name", help="Nombre del autómata")
     check.add_argument("word", help="Palabra a verificar")
+    check.add_argument("--no-path", action="store_true",
+                       help="Solo aceptación/rechazo, sin construir la ruta de estados")
+
+    check_file_cmd = sub.add_parser("check-file", help="Verificar cada línea de un archivo de palabras")
+    check_file_cmd.add_argument("name", help="Nombre del autómata")
+    check_file_cmd.add_argument("path", help="Archivo con una palabra por línea")
+    check_file_cmd.add_argument("--output", "-o", help="Archivo de salida (por defecto stdout)")
+    check_file_cmd.add_argument("--format", choices=["csv", "binary"], default="csv",
+                                help="Formato de salida: CSV o binario compacto")
+    check_file_cmd.add_argument("--final-state", action="store_true",
+                                help="Incluir el estado final alcanzado por cada línea")
+    check_file_cmd.add_argument("--max-length", type=int, default=10000,
+                                help="Largo máximo de palabra")
+    check_file_cmd.add_argument("--workers", "-w", type=int, default=1,
+                                help="Procesos a usar (1 = sin pool de procesos)")
+    check_file_cmd.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                                help="Palabras por fragmento enviado a cada proceso")
+
+    scan = sub.add_parser("scan", help="Buscar subcadenas aceptadas por un AFD en un archivo de texto")
+    scan.add_argument("name", help="Nombre del autómata")
+    scan.add_argument("path", help="Archivo de texto a escanear (UTF-8)")
+    scan.add_argument("--longest", action="store_true",
+                      help="Solo la coincidencia más larga en cada posición de inicio")
+    scan.add_argument("--max-match", type=int, default=None,
+                      help="Largo máximo de una coincidencia (acota la memoria)")
+    scan.add_argument("--output", "-o", help="Archivo CSV de salida (por defecto stdout)")
+
+    combine_cmd = sub.add_parser("combine", help="Crear un AFD por unión, intersección, diferencia o complemento")
+    combine_cmd.add_argument("operation", choices=["union", "intersection", "difference", "complement"])
+    combine_cmd.add_argument("name", help="Nombre del autómata resultante")
+    combine_cmd.add_argument("operands", nargs="+", help="Autómata(s) de entrada")
+    combine_cmd.add_argument("--minimize", action="store_true", help="Minimizar el resultado")
+    combine_cmd.add_argument("--output", "-o",
+                             help="Guardar el resultado en formato del enunciado (por defecto stdout)")
 
     args = parser.parse_args()
 
-    if args.file:
-        loaded = store.load_from_file(args.file)
-        print(f"Cargados: {', '.join(loaded)}")
-
-    if args.cmd == "list":
-        print("\n".join(store.list()))
-    elif args.cmd == "check":
-        res = store.check(args.name, args.word)
-        status = "ACEPTADA" if res["accepted"] else "RECHAZADA"
-        print(f"[{res['automata']}] '{res['word']}' => {status}")
-        print("Ruta:", " -> ".join(res["path"]))
-    else:
-        parser.print_help()
+    try:
+        if args.file:
+            loaded = store.load_from_file(args.file)
+            # check-file, scan y combine escriben su resultado en stdout: los mensajes van a stderr
+            print(f"Cargados: {', '.join(loaded)}",
+                  file=sys.stderr if args.cmd in ("check-file", "scan", "combine") else sys.stdout)
+
+        if args.cmd == "list":
+            print("\n".join(store.list()))
+        elif args.cmd == "check":
+            res = store.check(args.name, args.word, include_path=not args.no_path)
+            status = "ACEPTADA" if res["accepted"] else "RECHAZADA"
+            print(f"[{res['automata']}] '{res['word']}' => {status}")
+            if args.no_path:
+                if res["reason"] and res["position"] is not None:
+                    print(f"Motivo: {res['reason']} (posición {res['position']})")
+                elif res["reason"]:
+                    print(f"Motivo: {res['reason']}")
+            else:
+                print("Ruta:", " -> ".join(res["path"]))
+        elif args.cmd == "check-file":
+            t0 = time.perf_counter()
+            options = dict(workers=args.workers, chunk_size=args.chunk_size, max_length=args.max_length,
+                           fmt=args.format, final_state=args.final_state)
+            if args.output:
+                with open(args.output, "wb", buffering=OUTPUT_BUFFER_SIZE) as out:
+                    total, accepted = check_file(args.name, args.path, out, **options)
+            else:
+                sys.stdout.flush()
+                total, accepted = check_file(args.name, args.path, sys.stdout.buffer, **options)
+                sys.stdout.buffer.flush()
+            elapsed = time.perf_counter() - t0
+            print(f"[{args.name}] {total} palabras, {accepted} aceptadas en {elapsed:.2f}s"
+                  f" => {total / elapsed if elapsed else 0:,.0f} líneas/s", file=sys.stderr)
+        elif args.cmd == "scan":
+            t0 = time.perf_counter()
+            if args.output:
+                with open(args.output, "w", encoding="utf-8", newline="") as out:
+                    count, stats = scan_file(args.name, args.path, out, args.longest, args.max_match)
+            else:
+                count, stats = scan_file(args.name, args.path, sys.stdout, args.longest, args.max_match)
+            elapsed = time.perf_counter() - t0
+            mb = stats["bytes"] / (1024 * 1024)
+            print(f"[{args.name}] {count} coincidencias en {mb:.2f}MB, {elapsed:.2f}s"
+                  f" => {mb / elapsed if elapsed else 0:.1f} MB/s", file=sys.stderr)
+        elif args.cmd == "combine":
+            stats = store.combine(args.operation, args.operands, args.name, minimize=args.minimize)
+            lines = "\n".join(automaton_lines(store.get(args.name))) + "\n"
+            if args.output:
+                with open(args.output, "w", encoding="utf-8") as out:
+                    out.write(lines)
+            else:
+                sys.stdout.write(lines)
+            print(f"[{args.name}] {args.operation}({', '.join(args.operands)}): "
+                  f"{len(store.get(args.name).states)} estados (producto: {stats['states']})",
+                  file=sys.stderr)
+        else:
+            parser.print_help()
+    except (KeyError, ValueError) as e:
+        # Errores del almacén (autómata inexistente, archivo inválido...): sin traza
+        print(f"Error: {e.args[0] if e.args else e}", file=sys.stderr)
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
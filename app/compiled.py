@@ -0,0 +1,321 @@
+from __future__ import annotations
+from array import array
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional
+
+if TYPE_CHECKING:
+    from .dfa import DFA
+
+# Centinela para transiciones no definidas (estado trampa implícito)
+TRAP = -1
+
+class CompiledDFA:
+    """Forma compilada de un AFD: estados y símbolos como enteros pequeños.
+
+    La tabla de transiciones es un arreglo plano de tamaño |Q|·|Σ| en el que
+    cada celda guarda el *desplazamiento de fila* del estado destino
+    (índice_estado · |Σ|), de modo que cada paso es una suma y un acceso.
+    Las transiciones ausentes se marcan con ``TRAP``.
+
+    Si el alfabeto tiene símbolos de varios caracteres, la palabra se
+    tokeniza con un trie de coincidencia más larga (``tokens``); si todos son
+    de un carácter se recorre carácter a carácter sin tokenizador.
+    """
+
+    __slots__ = (
+        "name", "states", "symbols", "state_index", "symbol_index",
+        "n_symbols", "start", "table", "finals", "_vectorized",
+        "trie_children", "trie_symbol", "_prefix",
+    )
+
+    def __init__(self, dfa: "DFA") -> None:
+        self.name = dfa.name
+        # Orden determinista para que la tabla sea reproducible
+        self.states: List[str] = sorted(dfa.states)
+        self.symbols: List[str] = sorted(dfa.alphabet)
+        self.state_index: Dict[str, int] = {s: i for i, s in enumerate(self.states)}
+        self.symbol_index: Dict[str, int] = {a: j for j, a in enumerate(self.symbols)}
+        self.n_symbols = len(self.symbols)
+
+        n = self.n_symbols
+        self.start = self.state_index[dfa.start] * n
+        self.table = array("i", [TRAP]) * (len(self.states) * n)
+        for (s, a), t in dfa.delta.items():
+            self.table[self.state_index[s] * n + self.symbol_index[a]] = self.state_index[t] * n
+
+        # Bitmap de estados finales
+        self.finals = bytearray((len(self.states) + 7) // 8)
+        for f in dfa.finals:
+            i = self.state_index[f]
+            self.finals[i >> 3] |= 1 << (i & 7)
+
+        self._vectorized = None
+        self._prefix = None
+        self._build_trie()
+
+    @classmethod
+    def from_tables(cls, name: str, states: List[str], symbols: List[str], start: int,
+                    table: array, finals: bytearray) -> "CompiledDFA":
+        """Reconstruye la forma compilada a partir de sus tablas (p.ej. desde disco).
+
+        ``start`` es el índice del estado inicial y ``table`` guarda
+        desplazamientos de fila, igual que en la forma construida desde un AFD.
+        """
+        self = cls.__new__(cls)
+        self.name = name
+        self.states = states
+        self.symbols = symbols
+        self.state_index = {s: i for i, s in enumerate(states)}
+        self.symbol_index = {a: j for j, a in enumerate(symbols)}
+        self.n_symbols = len(symbols)
+        self.start = start * self.n_symbols
+        self.table = table
+        self.finals = finals
+        self._vectorized = None
+        self._prefix = None
+        self._build_trie()
+        return self
+
+    def __getstate__(self):
+        # La tabla puede ser una vista sobre un mmap (ver diskcache): se envía copiada
+        state = {k: getattr(self, k) for k in self.__slots__}
+        state["_vectorized"] = state["_prefix"] = None  # se reconstruyen bajo demanda
+        if not isinstance(self.table, array):
+            state["table"] = array("i", self.table)
+        return state
+
+    def __setstate__(self, state) -> None:
+        for k, v in state.items():
+            setattr(self, k, v)
+
+    def _build_trie(self) -> None:
+        """Trie de símbolos: hijos por nodo y símbolo terminado en cada nodo (-1 si ninguno)."""
+        if all(len(a) == 1 for a in self.symbols):
+            self.trie_children: Optional[List[Dict[str, int]]] = None
+            self.trie_symbol: Optional[array] = None
+            return
+        children: List[Dict[str, int]] = [{}]
+        terminal = [-1]
+        for j, a in enumerate(self.symbols):
+            node = 0
+            for ch in a:
+                nxt = children[node].get(ch)
+                if nxt is None:
+                    nxt = len(children)
+                    children[node][ch] = nxt
+                    children.append({})
+                    terminal.append(-1)
+                node = nxt
+            terminal[node] = j
+        self.trie_children = children
+        self.trie_symbol = array("i", terminal)
+
+    def tokens(self, word: str, start: int = 0) -> Iterator[tuple[int, int]]:
+        """Genera (posición, índice_de_símbolo) con coincidencia más larga desde ``start``.
+
+        Un índice -1 indica que en esa posición no empieza ningún símbolo; en
+        ese caso la tokenización termina. Sin alfabeto multicarácter cada
+        carácter es un token.
+        """
+        if self.trie_children is None:
+            get = self.symbol_index.get
+            for i in range(start, len(word)):
+                ch = word[i]
+                j = get(ch)
+                yield (i, -1 if j is None else j)
+                if j is None:
+                    return
+            return
+        children = self.trie_children
+        terminal = self.trie_symbol
+        n = len(word)
+        i = start
+        while i < n:
+            node = 0
+            j = -1
+            end = k = i
+            while k < n:
+                node = children[node].get(word[k])
+                if node is None:
+                    break
+                k += 1
+                if terminal[node] >= 0:
+                    j = terminal[node]
+                    end = k
+            yield (i, j)
+            if j < 0:
+                return
+            i = end
+
+    def vectorized(self):
+        """Tabla NumPy para el motor vectorizado (requiere numpy), creada una vez."""
+        if self._vectorized is None:
+            try:
+                from .vectorized import VectorizedDFA
+            except ImportError:
+                raise ValueError("El motor vectorizado requiere NumPy (pip install numpy)")
+            self._vectorized = VectorizedDFA(self)
+        return self._vectorized
+
+    def prefix_cache(self, checkpoint: Optional[int] = None, max_nodes: Optional[int] = None):
+        """Trie de prefijos de este autómata (ver prefixcache.py), creado una vez.
+
+        Si se piden otros parámetros que los del trie existente, se reemplaza.
+        """
+        from .prefixcache import DEFAULT_CHECKPOINT, DEFAULT_MAX_NODES, PrefixCache
+        checkpoint = checkpoint or DEFAULT_CHECKPOINT
+        max_nodes = max_nodes or DEFAULT_MAX_NODES
+        cache = self._prefix
+        if cache is None or cache.checkpoint != checkpoint or cache.max_nodes != max_nodes:
+            cache = self._prefix = PrefixCache(self, checkpoint, max_nodes)
+        return cache
+
+    def live_offsets(self) -> set:
+        """Desplazamientos de los estados desde los que se alcanza algún final."""
+        n = self.n_symbols
+        table = self.table
+        reverse: dict = {}
+        for i in range(len(self.states)):
+            for j in range(n):
+                t = table[i * n + j]
+                if t != TRAP:
+                    reverse.setdefault(t, []).append(i * n)
+        live = {i * n for i in range(len(self.states)) if self.is_final(i * n)}
+        stack = list(live)
+        while stack:
+            for s in reverse.get(stack.pop(), ()):
+                if s not in live:
+                    live.add(s)
+                    stack.append(s)
+        return live
+
+    def state_of(self, offset: int) -> str:
+        """Nombre del estado correspondiente a un desplazamiento de fila."""
+        return self.states[offset // self.n_symbols]
+
+    def is_final(self, offset: int) -> bool:
+        i = offset // self.n_symbols
+        return bool(self.finals[i >> 3] >> (i & 7) & 1)
+
+    def simulate(self, word: str) -> tuple[bool, List[str]]:
+        """Simula sobre la tabla; mismos resultados y marcadores que ``DFA.simulate``."""
+        ok, path, _ = self.trace(word)
+        return (ok, path)
+
+    def trace(self, word: str) -> tuple[bool, List[str], Optional[int]]:
+        """Como ``simulate`` y además la posición del fallo (None si se consumió todo).
+
+        Ante un fallo el último elemento de la ruta es el marcador, que es
+        también el motivo que devuelve ``accepts``.
+        """
+        if self.trie_children is not None:
+            return self._trace_tokens(word)
+        table = self.table
+        symbol_index = self.symbol_index
+        states = self.states
+        n = self.n_symbols
+
+        current = self.start
+        path = [states[current // n]]
+
+        for i, ch in enumerate(word):
+            j = symbol_index.get(ch)
+            if j is None:
+                # símbolo no reconocido => rechazo inmediato
+                return (False, path + [f"#ERR:unknown_symbol_{ch}_at_pos_{i}"], i)
+
+            nxt = table[current + j]
+            if nxt == TRAP:
+                # Transición no definida - AFD incompleto
+                return (False, path + [f"#TRAP:no_transition_from_{states[current // n]}_with_{ch}"], i)
+
+            current = nxt
+            path.append(states[current // n])
+
+        return (self.is_final(current), path, None)
+
+    def _trace_tokens(self, word: str) -> tuple[bool, List[str], Optional[int]]:
+        """Como ``simulate`` pero avanzando por símbolos del tokenizador."""
+        table = self.table
+        states = self.states
+        n = self.n_symbols
+
+        current = self.start
+        path = [states[current // n]]
+        for i, j in self.tokens(word):
+            if j < 0:
+                return (False, path + [f"#ERR:unknown_symbol_{word[i]}_at_pos_{i}"], i)
+            nxt = table[current + j]
+            if nxt == TRAP:
+                return (False, path + [f"#TRAP:no_transition_from_{states[current // n]}_with_{self.symbols[j]}"], i)
+            current = nxt
+            path.append(states[current // n])
+        return (self.is_final(current), path, None)
+
+    def run(self, word: str) -> tuple[int, int]:
+        """Recorre la palabra sin construir trayectoria.
+
+        Devuelve (desplazamiento_del_estado, posición). Si la palabra se
+        consumió completa, la posición es ``len(word)``; si no, es el índice
+        del símbolo desconocido o sin transición.
+        """
+        if self.trie_children is not None:
+            return self._run_tokens(word)
+        table = self.table
+        get = self.symbol_index.get
+        current = self.start
+        for i, ch in enumerate(word):
+            j = get(ch)
+            if j is None:
+                return (current, i)
+            nxt = table[current + j]
+            if nxt == TRAP:
+                return (current, i)
+            current = nxt
+        return (current, len(word))
+
+    def _run_tokens(self, word: str) -> tuple[int, int]:
+        table = self.table
+        current = self.start
+        for i, j in self.tokens(word):
+            if j < 0:
+                return (current, i)
+            nxt = table[current + j]
+            if nxt == TRAP:
+                return (current, i)
+            current = nxt
+        return (current, len(word))
+
+    def accepts(self, word: str) -> tuple[bool, Optional[str], Optional[int]]:
+        """Devuelve (acepta, motivo_de_fallo, posición_del_fallo) sin trayectoria."""
+        return self.outcome(word, *self.run(word))
+
+    def outcome(self, word: str, current: int, pos: int) -> tuple[bool, Optional[str], Optional[int]]:
+        """Resultado de ``accepts`` a partir de lo que devolvió ``run``."""
+        if pos == len(word):
+            return (self.is_final(current), None, None)
+        if self.trie_children is None:
+            symbol = word[pos] if word[pos] in self.symbol_index else None
+        else:
+            # Volver a tokenizar desde la posición del fallo
+            _, j = next(self.tokens(word, pos))
+            symbol = self.symbols[j] if j >= 0 else None
+        if symbol is None:
+            return (False, f"#ERR:unknown_symbol_{word[pos]}_at_pos_{pos}", pos)
+        return (False, f"#TRAP:no_transition_from_{self.state_of(current)}_with_{symbol}", pos)
+
+    def check_words(self, words: Iterable[str], max_length: int = 10000,
+                    include_path: bool = False) -> List[tuple]:
+        """Verifica varias palabras; una tupla (acepta, motivo, posición[, ruta]) por palabra."""
+        rows: List[tuple] = []
+        for word in words:
+            if len(word) > max_length:
+                marker = f"#ERR:word_too_long_{len(word)}>_{max_length}"
+                rows.append((False, marker, None, [marker]) if include_path else (False, marker, None))
+                continue
+            if include_path:
+                # Una sola pasada: el motivo es el marcador final de la ruta
+                ok, path, position = self.trace(word)
+                rows.append((ok, None if position is None else path[-1], position, path))
+            else:
+                rows.append(self.accepts(word))
+        return rows
@@ -1,9 +1,24 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import Dict, Set, Tuple, List
+from itertools import count
+from typing import Dict, Set, Tuple, List, Optional
+from .compiled import TRAP, CompiledDFA
 
 Transition = Dict[Tuple[str, str], str]
 
+# Atributos cuya reasignación cambia el autómata
+_DEFINITION_FIELDS = frozenset({"name", "states", "alphabet", "start", "finals", "delta"})
+# Atributos que un AFD leído de la caché construye recién al usarlos
+_LAZY_FIELDS = ("states", "alphabet", "finals", "delta")
+
+# Límites de un AFD válido
+MAX_STATES = 1000
+MAX_SYMBOLS = 100
+
+# Versiones únicas en el proceso: (nombre, versión) identifica un AFD aunque
+# se vuelva a crear con el mismo nombre (p.ej. tras /admin/reset)
+_versions = count(1)
+
 @dataclass
 class DFA:
     name: str
@@ -12,6 +27,121 @@ class DFA:
     start: str | None = None
     finals: Set[str] = field(default_factory=set)
     delta: Transition = field(default_factory=dict)
+    _compiled: Optional[CompiledDFA] = field(default=None, init=False, repr=False, compare=False)
+    _version: int = field(default_factory=lambda: next(_versions), init=False, repr=False, compare=False)
+    _validated_version: int = field(default=-1, init=False, repr=False, compare=False)
+
+    def __getattr__(self, key):
+        # Solo se llama si el atributo falta: AFD creado con ``from_compiled``
+        # que todavía no necesitó sus conjuntos ni su delta
+        if key in _LAZY_FIELDS:
+            compiled = self.__dict__.get("_compiled")
+            if compiled is not None:
+                self._materialize(compiled)
+                return self.__dict__[key]
+        raise AttributeError(key)
+
+    def _materialize(self, compiled: CompiledDFA) -> None:
+        """Construye desde la tabla los atributos aún ausentes, sin cambiar la versión."""
+        d = self.__dict__
+        n = compiled.n_symbols
+        states = compiled.states
+        if "states" not in d:
+            d["states"] = set(states)
+        if "alphabet" not in d:
+            d["alphabet"] = set(compiled.symbols)
+        if "finals" not in d:
+            d["finals"] = {s for i, s in enumerate(states) if compiled.is_final(i * n)}
+        if "delta" not in d:
+            delta = {}
+            for i, s in enumerate(states):
+                row = i * n
+                for j, a in enumerate(compiled.symbols):
+                    t = compiled.table[row + j]
+                    if t >= 0:
+                        delta[(s, a)] = states[t // n]
+            d["delta"] = delta
+
+    def __setattr__(self, key, value) -> None:
+        object.__setattr__(self, key, value)
+        if key in _DEFINITION_FIELDS:
+            self.invalidate()
+
+    @property
+    def version(self) -> int:
+        """Versión del AFD; cambia (a un valor nunca usado) en cada modificación."""
+        return self._version
+
+    @property
+    def state_count(self) -> int:
+        """Cantidad de estados, sin construir los conjuntos diferidos."""
+        states = self.__dict__.get("states")
+        return len(states) if states is not None else len(self._compiled.states)
+
+    @classmethod
+    def from_compiled(cls, compiled: CompiledDFA) -> "DFA":
+        """Reconstruye el AFD desde su forma compilada, que queda asociada.
+
+        La forma compilada solo se genera a partir de AFDs válidos, por lo que
+        el resultado se considera ya validado. Los conjuntos y delta se
+        construyen recién cuando se usan (merge, minimize, info): simular solo
+        necesita la tabla, que puede ser una vista sobre la caché mapeada.
+        """
+        dfa = cls.__new__(cls)
+        d = dfa.__dict__
+        d["name"] = compiled.name
+        d["start"] = compiled.state_of(compiled.start)
+        d["_compiled"] = compiled
+        d["_version"] = next(_versions)
+        d["_validated_version"] = d["_version"]
+        return dfa
+
+    def copy(self) -> "DFA":
+        """Copia independiente (conjuntos y delta propios) con versión nueva.
+
+        Si el original está validado la copia también; la forma compilada es
+        inmutable, así que se comparte hasta que la copia se modifique.
+        """
+        if self._validated_version == self._version and not all(f in self.__dict__ for f in _LAZY_FIELDS):
+            # Sin conjuntos construidos: la copia también los difiere
+            return DFA.from_compiled(self._compiled)
+        dfa = DFA(
+            name=self.name,
+            states=set(self.states),
+            alphabet=set(self.alphabet),
+            start=self.start,
+            finals=set(self.finals),
+            delta=dict(self.delta),
+        )
+        if self._validated_version == self._version:
+            dfa.__dict__["_compiled"] = self._compiled
+            dfa.__dict__["_validated_version"] = dfa._version
+        return dfa
+
+    def compile(self) -> CompiledDFA:
+        """Devuelve la forma compilada (tabla entera), construyéndola una sola vez."""
+        if self._compiled is None:
+            self._compiled = CompiledDFA(self)
+        return self._compiled
+
+    def invalidate(self) -> None:
+        """Marca el AFD como modificado: requiere revalidar y recompilar.
+
+        Las reasignaciones de atributos lo llaman solas; quien modifique los
+        conjuntos en sitio (``dfa.delta[k] = v``) debe llamarlo explícitamente.
+        """
+        d = self.__dict__
+        compiled = d.get("_compiled")
+        if compiled is not None:
+            # Lo diferido se construye antes de soltar la tabla de la que sale
+            self._materialize(compiled)
+        d["_version"] = next(_versions)
+        d["_compiled"] = None
+
+    def ensure_valid(self) -> None:
+        """Valida solo si el AFD cambió desde la última validación exitosa."""
+        if self._validated_version != self._version:
+            self.validate()
 
     def validate(self) -> None:
         if not self.name:
@@ -20,16 +150,16 @@ class DFA:
             raise ValueError(f"{self.name}: nombre debe ser alfanumérico (se permiten _ y -).")
         if not self.states:
             raise ValueError(f"{self.name}: conjunto de estados vacío.")
-        if len(self.states) > 1000:  # Límite razonable
-            raise ValueError(f"{self.name}: demasiados estados (máximo 1000).")
+        if len(self.states) > MAX_STATES:
+            raise ValueError(f"{self.name}: demasiados estados (máximo {MAX_STATES}).")
         if self.start is None or self.start not in self.states:
             raise ValueError(f"{self.name}: estado inicial inválido o ausente.")
         if not self.finals.issubset(self.states):
             raise ValueError(f"{self.name}: estados finales deben pertenecer a los estados.")
         if not self.alphabet:
             raise ValueError(f"{self.name}: alfabeto vacío.")
-        if len(self.alphabet) > 100:  # Límite razonable
-            raise ValueError(f"{self.name}: alfabeto demasiado grande (máximo 100 símbolos).")
+        if len(self.alphabet) > MAX_SYMBOLS:
+            raise ValueError(f"{self.name}: alfabeto demasiado grande (máximo {MAX_SYMBOLS} símbolos).")
         
         # Validar nombres de estados y símbolos
         for state in self.states:
@@ -39,13 +169,7 @@ class DFA:
             if not symbol or not isinstance(symbol, str) or len(symbol) > 10:
                 raise ValueError(f"{self.name}: símbolo inválido: {symbol}")
         
-        # Determinismo: no puede haber dos transiciones para (estado, símbolo)
-        seen = set()
-        for key in self.delta.keys():
-            if key in seen:
-                s, a = key
-                raise ValueError(f"{self.name}: transición duplicada para ({s},{a}).")
-            seen.add(key)
+        # Determinismo: delta es un dict, así que (estado, símbolo) ya es único
         
         # Validar todas las transiciones usan estados/símbolos válidos
         for (s, a), t in self.delta.items():
@@ -57,16 +181,35 @@ class DFA:
         # Verificar completitud opcional (función de transición total)
         self._check_completeness_warning()
 
-        # Verificar completitud opcional (función de transición total)
-        self._check_completeness_warning()
+        self.__dict__["_validated_version"] = self._version
+
+    def missing_transitions(self) -> int:
+        """Cantidad de pares (estado, símbolo) sin transición.
+
+        Con el AFD validado todas las claves de delta son pares válidos, así
+        que el contador es |Q|·|Σ| - |delta| en O(1); si no, se recorre delta.
+        """
+        total = len(self.states) * len(self.alphabet)
+        if self._validated_version == self._version:
+            return total - len(self.delta)
+        return total - sum(
+            1 for s, a in self.delta if s in self.states and a in self.alphabet
+        )
 
     def _check_completeness_warning(self) -> None:
         """Verifica si el AFD es completo (función de transición total)"""
+        # delta ya fue verificado: basta comparar tamaños antes de listar faltantes
+        if len(self.delta) == len(self.states) * len(self.alphabet):
+            return
         missing = []
         for state in self.states:
             for symbol in self.alphabet:
                 if (state, symbol) not in self.delta:
                     missing.append(f"({state},{symbol})")
+                    if len(missing) > 5:
+                        break
+            if len(missing) > 5:
+                break
         if missing:
             import warnings
             warnings.warn(
@@ -77,15 +220,11 @@ class DFA:
 
     def is_complete(self) -> bool:
         """Verifica si el AFD tiene función de transición total"""
-        for state in self.states:
-            for symbol in self.alphabet:
-                if (state, symbol) not in self.delta:
-                    return False
-        return True
+        return self.missing_transitions() == 0
 
     def simulate(self, word: str, max_length: int = 10000) -> tuple[bool, List[str]]:
         """Devuelve (acepta, trayectoria_de_estados)."""
-        self.validate()
+        self.ensure_valid()
         
         # Validación de entrada
         if not isinstance(word, str):
@@ -93,35 +232,43 @@ class DFA:
         if len(word) > max_length:
             return (False, [f"#ERR:word_too_long_{len(word)}>_{max_length}"])
         
-        current = self.start
-        path = [current]
-        
-        for i, ch in enumerate(word):
-            if ch not in self.alphabet:
-                # símbolo no reconocido => rechazo inmediato
-                return (False, path + [f"#ERR:unknown_symbol_{ch}_at_pos_{i}"])
-            
-            nxt = self.delta.get((current, ch))
-            if nxt is None:
-                # Transición no definida - AFD incompleto
-                return (False, path + [f"#TRAP:no_transition_from_{current}_with_{ch}"])
-            
-            current = nxt
-            path.append(current)
-            
-            # Protección contra loops infinitos (aunque no debería pasar en AFD)
-            if len(path) > max_length + 1:
-                return (False, path + ["#ERR:simulation_too_long"])
-        
-        return (current in self.finals, path)
+        return self.compile().simulate(word)
+
+    def accepts(self, word: str, max_length: int = 10000) -> tuple[bool, Optional[str], Optional[int]]:
+        """Modo solo-aceptación: (acepta, motivo_de_fallo, posición) sin trayectoria."""
+        self.ensure_valid()
+
+        if not isinstance(word, str):
+            return (False, "#ERR:input_not_string", None)
+        if len(word) > max_length:
+            return (False, f"#ERR:word_too_long_{len(word)}>_{max_length}", None)
+
+        return self.compile().accepts(word)
+
+    def stepper(self) -> "Stepper":
+        """Simulación incremental: alimentar la palabra por partes con ``feed``."""
+        self.ensure_valid()
+        return Stepper(self.compile())
+
+    def scanner(self, longest: bool = False, max_match: Optional[int] = None):
+        """Escáner de subcadenas aceptadas en textos grandes (ver scan.py)."""
+        from .scan import DEFAULT_MAX_MATCH, Scanner
+        self.ensure_valid()
+        return Scanner(self.compile(), longest=longest, max_match=max_match or DEFAULT_MAX_MATCH)
 
     def merge(self, other: "DFA") -> None:
-        """Regla del enunciado: si el nombre ya existe, AGREGAR información."""
+        """Regla del enunciado: si el nombre ya existe, AGREGAR información.
+
+        Solo se verifica lo que ``other`` agrega (estados, símbolos y
+        transiciones nuevas); si este AFD ya estaba validado, el resultado
+        queda validado sin recorrer de nuevo todo el autómata. Ante un
+        error no se modifica nada.
+        """
         if self.name != other.name:
             raise ValueError("Solo se pueden fusionar AFDs con el mismo nombre")
         
-        # Validar que el otro DFA sea válido antes del merge
-        other.validate()
+        # Validar que el otro DFA sea válido antes del merge (no repite si ya lo está)
+        other.ensure_valid()
         
         # Verificar compatibilidad de estados iniciales
         if self.start is not None and other.start is not None and self.start != other.start:
@@ -129,48 +276,281 @@ class DFA:
                 f"{self.name}: conflicto en estado inicial: {self.start} vs {other.start}"
             )
         
-        # Unión de estados/alfabeto/finales
-        old_states_count = len(self.states)
-        old_alphabet_count = len(self.alphabet)
-        
-        self.states |= other.states
-        self.alphabet |= other.alphabet
-        self.finals |= other.finals
-        
-        # Si other tiene start definido y nosotros no, lo tomamos
-        if other.start and not self.start:
-            self.start = other.start
-        elif other.start and self.start:
-            # Ya verificamos que sean iguales arriba
-            pass
+        # Delta a agregar: other es válido, así que sus estados, símbolos y
+        # transiciones ya están verificados; falta el cruce con este AFD
+        new_states = other.states - self.states
+        new_symbols = other.alphabet - self.alphabet
+        if len(self.states) + len(new_states) > MAX_STATES:
+            raise ValueError(
+                f"{self.name}: demasiados estados después del merge: {len(self.states) + len(new_states)}"
+            )
+        if len(self.alphabet) + len(new_symbols) > MAX_SYMBOLS:
+            raise ValueError(
+                f"{self.name}: alfabeto demasiado grande después del merge: "
+                f"{len(self.alphabet) + len(new_symbols)}"
+            )
         
         # Unir transiciones, respetando determinismo
         conflicts = []
+        new_delta = {}
         for k, v in other.delta.items():
-            if k in self.delta and self.delta[k] != v:
+            current = self.delta.get(k)
+            if current is None:
+                new_delta[k] = v
+            elif current != v:
                 s, a = k
-                conflicts.append(f"({s},{a}): {self.delta[k]} vs {v}")
-            else:
-                self.delta[k] = v
+                conflicts.append(f"({s},{a}): {current} vs {v}")
         
         if conflicts:
             raise ValueError(
                 f"{self.name}: conflictos deterministas en transiciones: {', '.join(conflicts)}"
             )
         
-        # Verificar límites después del merge
-        if len(self.states) > 1000:
-            raise ValueError(f"{self.name}: demasiados estados después del merge: {len(self.states)}")
-        if len(self.alphabet) > 100:
-            raise ValueError(f"{self.name}: alfabeto demasiado grande después del merge: {len(self.alphabet)}")
+        was_valid = self._validated_version == self._version
+        missing = self.missing_transitions() if was_valid else None
+        
+        # Aplicar el delta (los conjuntos se modifican en sitio: invalidar)
+        self.states |= new_states
+        self.alphabet |= new_symbols
+        self.finals |= other.finals
+        self.delta.update(new_delta)
+        # Si other tiene start definido y nosotros no, lo tomamos
+        if other.start and not self.start:
+            self.start = other.start
+        self.invalidate()
+        
+        if was_valid:
+            # Contador incremental: cada estado nuevo agrega |Σ| pares, cada
+            # símbolo nuevo |Q| pares (sin contar dos veces el cruce)
+            missing += (len(new_states) * len(self.alphabet)
+                        + len(new_symbols) * (len(self.states) - len(new_states))
+                        - len(new_delta))
+            self.__dict__["_validated_version"] = self._version
+            if missing:
+                import warnings
+                warnings.warn(
+                    f"{self.name}: AFD incompleto. Transiciones faltantes: {missing}",
+                    UserWarning
+                )
         
         # Log informativo sobre el merge
         import warnings
-        new_states = len(self.states) - old_states_count
-        new_symbols = len(self.alphabet) - old_alphabet_count
-        if new_states > 0 or new_symbols > 0:
+        if new_states or new_symbols:
             warnings.warn(
-                f"{self.name}: merge completado - agregados {new_states} estados, "
-                f"{new_symbols} símbolos, {len(other.delta)} transiciones",
+                f"{self.name}: merge completado - agregados {len(new_states)} estados, "
+                f"{len(new_symbols)} símbolos, {len(new_delta)} transiciones",
                 UserWarning
             )
+
+    def reachable_states(self) -> Set[str]:
+        """Estados alcanzables desde el inicial."""
+        if self.start is None:
+            return set()
+        by_state: Dict[str, List[str]] = {}
+        for (s, _a), t in self.delta.items():
+            by_state.setdefault(s, []).append(t)
+        seen = {self.start}
+        stack = [self.start]
+        while stack:
+            for t in by_state.get(stack.pop(), ()):
+                if t not in seen:
+                    seen.add(t)
+                    stack.append(t)
+        return seen
+
+    def minimize(self, validate: bool = True) -> "DFA":
+        """Devuelve un AFD mínimo equivalente (Hopcroft), sin estados inalcanzables.
+
+        Cada clase de equivalencia se nombra con el menor de sus estados. Si el
+        AFD es incompleto se usa un estado trampa implícito que no aparece en
+        el resultado, igual que las clases equivalentes a él. Con
+        ``validate=False`` no se exigen los límites de tamaño (p.ej. para un
+        producto que solo entra en ellos una vez minimizado); el llamador
+        valida el resultado.
+        """
+        if validate:
+            self.ensure_valid()
+        states = sorted(self.reachable_states())
+        symbols = sorted(self.alphabet)
+        index = {s: i for i, s in enumerate(states)}
+        n = len(states)
+        trap = n  # estado trampa implícito (solo se usa si hace falta)
+
+        delta = [[trap] * len(symbols) for _ in range(n)]
+        incomplete = False
+        for i, s in enumerate(states):
+            for j, a in enumerate(symbols):
+                t = self.delta.get((s, a))
+                if t is None:
+                    incomplete = True
+                else:
+                    delta[i][j] = index[t]
+        total = n + 1 if incomplete else n
+        if incomplete:
+            delta.append([trap] * len(symbols))
+
+        # Transiciones inversas: inverse[j][t] = estados que llegan a t con el símbolo j
+        inverse = [[[] for _ in range(total)] for _ in symbols]
+        for s in range(total):
+            for j, t in enumerate(delta[s]):
+                inverse[j][t].append(s)
+
+        finals = {index[f] for f in self.finals if f in index}
+        partition = [b for b in (finals, set(range(total)) - finals) if b]
+        block_of = [0] * total
+        for b, block in enumerate(partition):
+            for s in block:
+                block_of[s] = b
+        work = {min(range(len(partition)), key=lambda b: len(partition[b]))}
+
+        while work:
+            splitter = partition[work.pop()]
+            for j in range(len(symbols)):
+                pre = {s for t in splitter for s in inverse[j][t]}
+                if not pre:
+                    continue
+                touched: Dict[int, Set[int]] = {}
+                for s in pre:
+                    touched.setdefault(block_of[s], set()).add(s)
+                for b, inside in touched.items():
+                    if len(inside) == len(partition[b]):
+                        continue
+                    outside = partition[b] - inside
+                    partition[b] = inside
+                    new = len(partition)
+                    partition.append(outside)
+                    for s in outside:
+                        block_of[s] = new
+                    if b in work:
+                        work.add(new)
+                    else:
+                        work.add(b if len(inside) <= len(outside) else new)
+
+        # Clases equivalentes a la trampa (salvo la del inicial) se descartan
+        start_block = block_of[index[self.start]]
+        dropped = block_of[trap] if incomplete and block_of[trap] != start_block else None
+        names = {}
+        for b, block in enumerate(partition):
+            real = [s for s in block if s != trap]
+            if b != dropped and real:
+                names[b] = states[min(real)]
+
+        result = DFA(name=self.name)
+        result.states = set(names.values())
+        result.alphabet = set(self.alphabet)
+        result.start = names[start_block]
+        result.finals = {names[block_of[f]] for f in finals}
+        result.delta = {
+            (names[b], symbols[j]): names[block_of[t]]
+            for b in names
+            for j, t in enumerate(delta[index[names[b]]])
+            if t != trap and block_of[t] in names
+        }
+        return result
+
+class Stepper:
+    """Estado de una simulación que avanza a medida que llegan símbolos.
+
+    ``feed`` puede recibir la palabra partida en cualquier punto: el costo
+    total es lineal en su longitud y ``result()`` coincide con
+    ``DFA.accepts`` sobre todo lo recibido. Con símbolos de varios
+    caracteres, el final de un fragmento que aún puede extenderse a un
+    símbolo más largo queda pendiente hasta el siguiente ``feed``.
+    """
+
+    __slots__ = ("compiled", "current", "position", "reason", "fail_position", "_pending")
+
+    def __init__(self, compiled: CompiledDFA) -> None:
+        self.compiled = compiled
+        self.current = compiled.start
+        self.position = 0            # caracteres recibidos
+        self.reason: Optional[str] = None
+        self.fail_position: Optional[int] = None
+        self._pending = ""           # solo con símbolos multicarácter
+
+    @property
+    def alive(self) -> bool:
+        return self.reason is None
+
+    @property
+    def state(self) -> str:
+        return self.compiled.state_of(self.current)
+
+    def feed(self, chunk: str) -> "Stepper":
+        base = self.position - len(self._pending)
+        self.position += len(chunk)
+        if self.reason is not None:
+            return self
+        if self.compiled.trie_children is None:
+            self._feed_chars(chunk, base)
+        else:
+            text = self._pending + chunk
+            self._pending = text[self._feed_tokens(text, base, final=False):]
+        return self
+
+    def _fail(self, pos: int, symbol: Optional[str], ch: str) -> None:
+        if symbol is None:
+            self.reason = f"#ERR:unknown_symbol_{ch}_at_pos_{pos}"
+        else:
+            self.reason = f"#TRAP:no_transition_from_{self.state}_with_{symbol}"
+        self.fail_position = pos
+        self._pending = ""
+
+    def _feed_chars(self, chunk: str, base: int) -> None:
+        compiled = self.compiled
+        table = compiled.table
+        get = compiled.symbol_index.get
+        current = self.current
+        for i, ch in enumerate(chunk):
+            j = get(ch)
+            nxt = TRAP if j is None else table[current + j]
+            if nxt == TRAP:
+                self.current = current
+                self._fail(base + i, None if j is None else ch, ch)
+                return
+            current = nxt
+        self.current = current
+
+    def _feed_tokens(self, text: str, base: int, final: bool) -> int:
+        """Consume tokens completos de ``text``; devuelve cuántos caracteres consumió."""
+        compiled = self.compiled
+        children = compiled.trie_children
+        terminal = compiled.trie_symbol
+        table = compiled.table
+        n = len(text)
+        i = 0
+        while i < n:
+            node, j, end, k = 0, -1, i, i
+            while k < n:
+                nxt = children[node].get(text[k])
+                if nxt is None:
+                    break
+                node = nxt
+                k += 1
+                if terminal[node] >= 0:
+                    j, end = terminal[node], k
+            if k == n and children[node] and not final:
+                # Un fragmento posterior podría completar un símbolo más largo
+                return i
+            if j < 0:
+                self._fail(base + i, None, text[i])
+                return n
+            nxt = table[self.current + j]
+            if nxt == TRAP:
+                self._fail(base + i, compiled.symbols[j], text[i])
+                return n
+            self.current = nxt
+            i = end
+        return n
+
+    def result(self) -> tuple[bool, Optional[str], Optional[int]]:
+        """(acepta, motivo_de_fallo, posición) si la palabra terminara aquí."""
+        if self._pending and self.reason is None:
+            # Resolver lo pendiente sobre una copia: luego puede llegar más texto
+            probe = Stepper(self.compiled)
+            probe.current = self.current
+            probe._feed_tokens(self._pending, self.position - len(self._pending), final=True)
+            return probe.result()
+        if self.reason is not None:
+            return (False, self.reason, self.fail_position)
+        return (self.compiled.is_final(self.current), None, None)
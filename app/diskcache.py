@@ -0,0 +1,230 @@
+from __future__ import annotations
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import sys
+import zlib
+from .compiled import CompiledDFA
+from .dfa import DFA
+
+logger = logging.getLogger(__name__)
+
+# Caché en disco de autómatas compilados.
+#
+# Cada archivo fuente se guarda ya compilado en ``<dir>/<sha256>.afdc``, con
+# la clave igual al hash del contenido, de modo que volver a cargar el mismo
+# texto no requiere parsear ni validar. Formato (little endian):
+#
+#   cabecera:  b"AFDC" | versión u16 | cantidad u32
+#   por AFD:   nombre | |Q| u32 | |Σ| u32 | inicial u32
+#              |Q| estados | |Σ| símbolos (cadenas: longitud u16 + UTF-8)
+#              tabla |Q|·|Σ| int32 (desplazamientos de fila, -1 = trampa)
+#              bitmap de finales ((|Q|+7)//8 bytes)
+#   cola:      CRC32 u32 de todo lo anterior
+#
+# ``journal.txt`` registra en orden las cargas aplicadas al store para
+# reconstruirlo al reiniciar:
+#   load <sha256> <0|1 minimizar> <origen>
+#   minimize <nombre>
+#
+# Al reiniciar el journal (clear/reset) se borran los archivos compilados que
+# ya no referencia, para que la caché no crezca con cada carga distinta.
+
+MAGIC = b"AFDC"
+FORMAT_VERSION = 1
+SUFFIX = ".afdc"
+_HEADER = struct.Struct("<4sHI")
+_COUNTS = struct.Struct("<III")
+_STR_LEN = struct.Struct("<H")
+_CRC = struct.Struct("<I")
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def _pack_str(value: str) -> bytes:
+    raw = value.encode("utf-8")
+    return _STR_LEN.pack(len(raw)) + raw
+
+def encode(dfas: Iterable[DFA]) -> bytes:
+    """Serializa las formas compiladas de ``dfas`` al formato binario."""
+    dfas = list(dfas)
+    parts = [_HEADER.pack(MAGIC, FORMAT_VERSION, len(dfas))]
+    for dfa in dfas:
+        compiled = dfa.compile()
+        table = compiled.table
+        if sys.byteorder != "little":
+            table = array("i", table)
+            table.byteswap()
+        parts.append(_pack_str(compiled.name))
+        parts.append(_COUNTS.pack(len(compiled.states), compiled.n_symbols,
+                                  compiled.start // compiled.n_symbols))
+        parts.extend(_pack_str(s) for s in compiled.states)
+        parts.extend(_pack_str(a) for a in compiled.symbols)
+        parts.append(table.tobytes())
+        parts.append(bytes(compiled.finals))
+    body = b"".join(parts)
+    return body + _CRC.pack(zlib.crc32(body))
+
+def decode(buf, zero_copy: bool = False) -> Dict[str, DFA]:
+    """Reconstruye los AFDs de un buffer; ValueError si está corrupto o es de otra versión.
+
+    Con ``zero_copy`` las tablas son vistas sobre ``buf`` en lugar de copias
+    (solo en máquinas little endian); ``buf`` debe seguir abierto mientras se usen.
+    """
+    with memoryview(buf) as view:
+        if len(view) < _HEADER.size + _CRC.size:
+            raise ValueError("caché truncada")
+        (crc,) = _CRC.unpack(view[-_CRC.size:])
+        # Las vistas se liberan al salir para poder cerrar el mmap
+        with view[:-_CRC.size] as body:
+            if zlib.crc32(body) != crc:
+                raise ValueError("CRC inválido")
+            return _decode_body(body, zero_copy and sys.byteorder == "little")
+
+def _decode_body(body: memoryview, zero_copy: bool = False) -> Dict[str, DFA]:
+    magic, version, count = _HEADER.unpack_from(body, 0)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError("formato de caché desconocido")
+    pos = _HEADER.size
+
+    def read_str() -> str:
+        nonlocal pos
+        (length,) = _STR_LEN.unpack_from(body, pos)
+        pos += _STR_LEN.size
+        value = str(body[pos:pos + length], "utf-8")
+        pos += length
+        return value
+
+    dfas: Dict[str, DFA] = {}
+    try:
+        for _ in range(count):
+            name = read_str()
+            n_states, n_symbols, start = _COUNTS.unpack_from(body, pos)
+            pos += _COUNTS.size
+            states = [read_str() for _ in range(n_states)]
+            symbols = [read_str() for _ in range(n_symbols)]
+            size = n_states * n_symbols * 4
+            if zero_copy:
+                table = body[pos:pos + size].cast("i")
+            else:
+                table = array("i")
+                table.frombytes(body[pos:pos + size])
+                if sys.byteorder != "little":
+                    table.byteswap()
+            pos += size
+            nbytes = (n_states + 7) // 8
+            finals = bytearray(body[pos:pos + nbytes])
+            pos += nbytes
+            if len(table) != n_states * n_symbols or len(finals) != nbytes or start >= n_states:
+                raise ValueError("tablas truncadas")
+            compiled = CompiledDFA.from_tables(name, states, symbols, start, table, finals)
+            dfas[name] = DFA.from_compiled(compiled)
+    except (struct.error, UnicodeDecodeError, IndexError) as e:
+        raise ValueError(f"caché corrupta: {e}")
+    if pos != len(body):
+        raise ValueError("datos sobrantes en la caché")
+    return dfas
+
+class CompiledCache:
+    """Directorio de autómatas compilados por hash de contenido, más el journal del store."""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self.journal_path = os.path.join(directory, "journal.txt")
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, digest + SUFFIX)
+
+    def exists(self, digest: str) -> bool:
+        return os.path.exists(self._path(digest))
+
+    def read(self, digest: str, shared: bool = False) -> Optional[Dict[str, DFA]]:
+        """AFDs cacheados para ``digest`` o None si no existen o están corruptos.
+
+        Con ``shared`` el mapeo queda abierto y las tablas apuntan a él: los
+        procesos que leen el mismo archivo comparten esas páginas.
+        """
+        path = self._path(digest)
+        try:
+            with open(path, "rb") as f:
+                if shared:
+                    # Las vistas de las tablas mantienen vivo el mapeo
+                    return decode(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), zero_copy=True)
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return decode(mm)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Caché descartada {path}: {e}")
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            return None
+
+    def write(self, digest: str, dfas: Iterable[DFA]) -> None:
+        """Escribe la caché de forma atómica (archivo temporal + rename)."""
+        path = self._path(digest)
+        tmp = path + ".tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(encode(dfas))
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"No se pudo escribir la caché {path}: {e}")
+
+    def prune(self, keep: Iterable[str] = ()) -> int:
+        """Borra los archivos compilados cuyo hash no está en ``keep``; devuelve cuántos."""
+        keep = {digest + SUFFIX for digest in keep}
+        removed = 0
+        try:
+            names = os.listdir(self.directory)
+        except OSError as e:
+            logger.warning(f"No se pudo listar la caché {self.directory}: {e}")
+            return 0
+        for name in names:
+            if name.endswith(SUFFIX) and name not in keep:
+                try:
+                    # Los procesos que aún lo tengan mapeado conservan sus páginas
+                    os.unlink(os.path.join(self.directory, name))
+                    removed += 1
+                except OSError as e:
+                    logger.warning(f"No se pudo borrar {name} de la caché: {e}")
+        return removed
+
+    def read_journal(self) -> List[Tuple[str, ...]]:
+        return self.read_journal_from(0)[0]
+
+    def read_journal_from(self, offset: int) -> Tuple[List[Tuple[str, ...]], int]:
+        """Entradas completas desde el byte ``offset`` y el desplazamiento donde terminan."""
+        try:
+            with open(self.journal_path, "rb") as f:
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:
+            return [], 0
+        # Una línea sin salto final todavía se está escribiendo
+        end = data.rfind(b"\n") + 1
+        entries = [tuple(line.split(" ", 3))
+                   for line in data[:end].decode("utf-8").split("\n") if line.strip()]
+        return entries, offset + end
+
+    def append_journal(self, *entry: str) -> None:
+        try:
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                f.write(" ".join(entry) + "\n")
+        except OSError as e:
+            logger.warning(f"No se pudo actualizar el journal de la caché: {e}")
+
+    def reset_journal(self) -> None:
+        try:
+            os.unlink(self.journal_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"No se pudo reiniciar el journal de la caché: {e}")
@@ -0,0 +1,139 @@
+from __future__ import annotations
+from typing import Optional
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+
+# Logging asíncrono para la API.
+#
+# Los handlers de la raíz se reemplazan por un ``QueueHandler``: el hilo que
+# atiende la petición solo encola el registro (sin formatear el mensaje) y un
+# ``QueueListener`` en segundo plano lo formatea y lo escribe. Las líneas por
+# petición (endpoints y middleware) pasan además por ``log_sampled``, que no
+# hace nada si el nivel está desactivado y registra solo una fracción
+# ``AFD_LOG_SAMPLE_RATE`` de las llamadas; las palabras van envueltas en
+# ``Truncated`` y se recortan a ``AFD_LOG_WORD_MAX`` caracteres solo si el
+# registro llega a formatearse.
+
+LOG_LEVEL = os.getenv("AFD_LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("AFD_LOG_FORMAT", "text")  # text o json
+LOG_SAMPLE_RATE = float(os.getenv("AFD_LOG_SAMPLE_RATE", "1.0"))
+LOG_WORD_MAX = int(os.getenv("AFD_LOG_WORD_MAX", "64"))
+LOG_QUEUE_SIZE = int(os.getenv("AFD_LOG_QUEUE_SIZE", "10000"))
+
+# Atributos propios de LogRecord: el resto viene de ``extra=`` y va al JSON
+_RECORD_FIELDS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_handler: Optional[logging.Handler] = None
+
+class JsonFormatter(logging.Formatter):
+    """Una línea JSON por registro, con los campos pasados en ``extra``."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_FIELDS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Encola el registro tal cual: el mensaje se formatea en el hilo del listener.
+
+    Con la cola llena el registro se descarta (y se cuenta) en lugar de
+    bloquear la petición.
+    """
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+def truncate(word: str, limit: Optional[int] = None) -> str:
+    """Palabra recortada para el log (con su largo real si se recortó)."""
+    limit = LOG_WORD_MAX if limit is None else limit
+    if len(word) <= limit:
+        return word
+    return f"{word[:limit]}...({len(word)})"
+
+class Truncated:
+    """Palabra para ``log_sampled``: se recorta recién al formatear el mensaje."""
+
+    __slots__ = ("word",)
+
+    def __init__(self, word: str) -> None:
+        self.word = word
+
+    def __str__(self) -> str:
+        return truncate(self.word)
+
+def log_sampled(logger: logging.Logger, msg: str, *args, level: int = logging.INFO,
+                rate: Optional[float] = None, **extra) -> None:
+    """Registra ``msg`` (formato %) en una fracción ``rate`` de las llamadas.
+
+    Si el nivel está desactivado o la llamada no sale sorteada no se
+    construye el registro ni se formatea nada.
+    """
+    if not logger.isEnabledFor(level):
+        return
+    rate = LOG_SAMPLE_RATE if rate is None else rate
+    if rate < 1.0 and random.random() >= rate:
+        return
+    logger.log(level, msg, *args, extra=extra or None)
+
+def configure_logging(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT,
+                      stream=None) -> logging.handlers.QueueListener:
+    """Instala la cola en la raíz y arranca el listener (una sola vez por proceso)."""
+    global _listener, _handler
+    if _listener is not None:
+        return _listener
+    if fmt not in ("text", "json"):
+        raise ValueError(f"AFD_LOG_FORMAT debe ser text o json, no {fmt}")
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(JsonFormatter() if fmt == "json" else
+                         logging.Formatter("%(asctime)s %(levelname)s:%(name)s:%(message)s"))
+    log_queue: queue.Queue = queue.Queue(LOG_QUEUE_SIZE)
+    root = logging.getLogger()
+    for old in list(root.handlers):
+        # Los handlers de captura de pytest se conservan
+        if type(old) in (logging.StreamHandler, logging.FileHandler):
+            root.removeHandler(old)
+    _handler = _DeferredQueueHandler(log_queue)
+    root.addHandler(_handler)
+    root.setLevel(level)
+    _listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    return _listener
+
+def stop_logging() -> None:
+    """Vacía la cola, detiene el listener y quita la cola de la raíz."""
+    global _listener, _handler
+    if _listener is not None:
+        logging.getLogger().removeHandler(_handler)
+        _listener.stop()
+        _listener = _handler = None
+
+def dropped_records() -> int:
+    """Registros descartados por cola llena desde que se configuró el logging."""
+    return _handler.dropped if _handler is not None else 0
@@ -0,0 +1,231 @@
+from __future__ import annotations
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import threading
+
+# Métricas en formato de exposición de texto de Prometheus para /metrics.
+#
+# Cada hilo acumula en su propio fragmento (``threading.local``), así que
+# registrar una observación no toma locks: es una búsqueda en un dict y unas
+# sumas. Solo al leer /metrics se recorren y suman los fragmentos de todos
+# los hilos. Con varios workers de uvicorn cada proceso expone sus propias
+# cifras (Prometheus las agrega por instancia).
+
+Labels = Tuple[str, ...]
+
+# Buckets fijos (límite superior inclusivo; +Inf se agrega al exponer)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIMULATION_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.01, 0.1)
+LENGTH_BUCKETS = (0, 1, 4, 16, 64, 256, 1024, 4096, 10000)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._local = threading.local()
+        self._shards: List[dict] = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        shard = getattr(self._local, "values", None)
+        if shard is None:
+            shard = self._local.values = {}
+            # Solo la primera observación de cada hilo toma el lock
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def _collect(self) -> Dict[Labels, list]:
+        with self._shards_lock:
+            shards = list(self._shards)
+        total: Dict[Labels, list] = {}
+        for shard in shards:
+            # dict(...) copia en C: no se ve un dict a medio modificar
+            for key, values in dict(shard).items():
+                acc = total.get(key)
+                if acc is None:
+                    total[key] = list(values)
+                else:
+                    for i, v in enumerate(values):
+                        acc[i] += v
+        return total
+
+    def reset(self) -> None:
+        with self._shards_lock:
+            for shard in self._shards:
+                shard.clear()
+
+    def expose(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        shard = self._shard()
+        cell = shard.get(labels)
+        if cell is None:
+            shard[labels] = [amount]
+        else:
+            cell[0] += amount
+
+    def value(self, *labels: str) -> float:
+        return self._collect().get(labels, [0])[0]
+
+    def expose(self) -> List[str]:
+        lines = super().expose()
+        for key, (value,) in sorted(self._collect().items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}")
+        return lines
+
+class Histogram(_Metric):
+    """Histograma con buckets fijos: conteo por bucket, suma y cantidad."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def _cell(self, labels: Labels) -> list:
+        shard = self._shard()
+        cell = shard.get(labels)
+        if cell is None:
+            # [bucket_0 .. bucket_n-1, +Inf, suma, cantidad]
+            cell = shard[labels] = [0] * (len(self.buckets) + 3)
+        return cell
+
+    def observe(self, value: float, *labels: str) -> None:
+        cell = self._cell(labels)
+        cell[bisect_left(self.buckets, value)] += 1
+        cell[-2] += value
+        cell[-1] += 1
+
+    def observe_many(self, values: Iterable[float], *labels: str) -> None:
+        """Varias observaciones con una sola búsqueda de la celda."""
+        cell = self._cell(labels)
+        buckets = self.buckets
+        total = n = 0
+        for value in values:
+            cell[bisect_left(buckets, value)] += 1
+            total += value
+            n += 1
+        cell[-2] += total
+        cell[-1] += n
+
+    def observe_mean(self, total: float, count: int, *labels: str) -> None:
+        """``count`` observaciones que suman ``total``, todas en el bucket del promedio.
+
+        Para lotes en los que solo se mide el tiempo del lote completo.
+        """
+        if count <= 0:
+            return
+        cell = self._cell(labels)
+        cell[bisect_left(self.buckets, total / count)] += count
+        cell[-2] += total
+        cell[-1] += count
+
+    def snapshot(self, *labels: str) -> Optional[dict]:
+        cell = self._collect().get(labels)
+        if cell is None:
+            return None
+        return {"count": cell[-1], "sum": cell[-2], "buckets": cell[:-2]}
+
+    def expose(self) -> List[str]:
+        lines = super().expose()
+        bounds = self.buckets + (float("inf"),)
+        for key, cell in sorted(self._collect().items()):
+            cumulative = 0
+            for bound, count in zip(bounds, cell):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(cell[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {cell[-1]}")
+        return lines
+
+class Gauge:
+    """Valor calculado al exponer (p.ej. tamaño del store)."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+
+    def expose_values(self, values: Dict[Labels, float]) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in sorted(values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}")
+        return lines
+
+REQUESTS = Counter("afd_http_requests_total", "Peticiones HTTP atendidas", ("route", "method", "status"))
+REQUEST_SECONDS = Histogram("afd_http_request_duration_seconds", "Latencia de las peticiones HTTP",
+                            ("route", "method"))
+SIMULATION_SECONDS = Histogram("afd_simulation_seconds",
+                               "Tiempo de simulación por palabra y autómata (en lotes, el promedio del lote)",
+                               ("automata",), buckets=SIMULATION_BUCKETS)
+WORD_LENGTH = Histogram("afd_word_length", "Largo de las palabras verificadas por autómata",
+                        ("automata",), buckets=LENGTH_BUCKETS)
+CHECK_RESULTS = Counter("afd_check_results_total", "Palabras aceptadas y rechazadas por autómata",
+                        ("automata", "result"))
+PARSE_SECONDS = Histogram("afd_parse_seconds", "Tiempo de parseo y carga de archivos de autómatas",
+                          ("source",))
+PARSE_BYTES = Counter("afd_parse_bytes_total", "Bytes de archivos de autómatas parseados", ("source",))
+STORE_AUTOMATA = Gauge("afd_store_automata", "Autómatas residentes en el store")
+STORE_STATES = Gauge("afd_store_states", "Estados de los autómatas residentes", ("form",))
+
+RECORDED = (REQUESTS, REQUEST_SECONDS, SIMULATION_SECONDS, WORD_LENGTH, CHECK_RESULTS,
+            PARSE_SECONDS, PARSE_BYTES)
+
+def record_checks(automata: str, seconds: float, lengths: Sequence[int], accepted: int) -> None:
+    """Registra un lote de verificaciones contra ``automata`` que tomó ``seconds`` en total.
+
+    Los endpoints por lotes (/check/batch, /check/stream, /check/all) llaman
+    una vez por lote o fragmento, no por palabra.
+    """
+    count = len(lengths)
+    if not count:
+        return
+    SIMULATION_SECONDS.observe_mean(seconds, count, automata)
+    WORD_LENGTH.observe_many(lengths, automata)
+    if accepted:
+        CHECK_RESULTS.inc(automata, "accepted", amount=accepted)
+    if count > accepted:
+        CHECK_RESULTS.inc(automata, "rejected", amount=count - accepted)
+
+def render(snapshot) -> str:
+    """Texto de /metrics: métricas acumuladas y tamaño de ``snapshot`` (StoreSnapshot)."""
+    lines: List[str] = []
+    for metric in RECORDED:
+        lines.extend(metric.expose())
+    lines.extend(STORE_AUTOMATA.expose_values({(): len(snapshot.dfas)}))
+    # state_count no materializa los AFDs leídos de la caché
+    lines.extend(STORE_STATES.expose_values({
+        ("original",): sum(d.state_count for d in snapshot.dfas.values()),
+        ("minimized",): sum(d.state_count for d in snapshot.minimized.values()),
+    }))
+    return "\n".join(lines) + "\n"
+
+def reset() -> None:
+    for metric in RECORDED:
+        metric.reset()
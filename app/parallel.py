@@ -0,0 +1,88 @@
+from __future__ import annotations
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+import atexit
+from .compiled import CompiledDFA
+from .dfa import DFA
+
+# Verificación por lotes repartida en un ProcessPoolExecutor.
+#
+# Cada tarea viaja con (nombre, versión) y, solo si el worker aún no la tiene,
+# con la tabla compilada. El worker guarda la última versión de cada autómata;
+# si recibe una tarea sin tabla para una versión desconocida responde ``None``
+# y el proceso principal la reenvía con la tabla. Así cada worker recibe cada
+# autómata una sola vez en lugar de en cada fragmento.
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# Caché del lado del worker: nombre -> (versión, tabla compilada)
+_worker_cache: Dict[str, Tuple[int, CompiledDFA]] = {}
+
+def _check_chunk(name: str, version: int, compiled: Optional[CompiledDFA],
+                 words: List[str], max_length: int, include_path: bool) -> Optional[List[tuple]]:
+    cached = _worker_cache.get(name)
+    if cached is None or cached[0] != version:
+        if compiled is None:
+            return None
+        cached = _worker_cache[name] = (version, compiled)
+    return cached[1].check_words(words, max_length, include_path)
+
+_pools: Dict[int, ProcessPoolExecutor] = {}
+
+def get_pool(workers: int) -> ProcessPoolExecutor:
+    """Devuelve (creándolo una vez) el pool de procesos con ``workers`` procesos."""
+    pool = _pools.get(workers)
+    if pool is None:
+        pool = _pools[workers] = ProcessPoolExecutor(max_workers=workers)
+    return pool
+
+def shutdown_pools() -> None:
+    """Cierra todos los pools creados por este módulo."""
+    while _pools:
+        _, pool = _pools.popitem()
+        pool.shutdown(wait=True, cancel_futures=True)
+
+atexit.register(shutdown_pools)
+
+def _chunked(words: Iterable[str], size: int) -> Iterator[List[str]]:
+    it = iter(words)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+def check_words_parallel(dfa: DFA, words: Iterable[str], max_length: int = 10000,
+                         include_path: bool = False, workers: int = 2,
+                         chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[tuple]:
+    """Verifica ``words`` en paralelo y entrega las filas en el orden de entrada.
+
+    Consume ``words`` de forma perezosa con a lo sumo ``2·workers`` fragmentos
+    en vuelo, por lo que sirve también para entradas que no caben en memoria.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size debe ser positivo")
+    dfa.ensure_valid()
+    compiled = dfa.compile()
+    name, version = dfa.name, dfa.version
+    pool = get_pool(workers)
+
+    def submit(chunk: List[str], payload: Optional[CompiledDFA] = None) -> Future:
+        return pool.submit(_check_chunk, name, version, payload, chunk, max_length, include_path)
+
+    def resolve(chunk: List[str], future: Future) -> List[tuple]:
+        rows = future.result()
+        if rows is None:
+            # El worker no tenía esta versión: reenviar con la tabla
+            rows = submit(chunk, compiled).result()
+        return rows
+
+    pending: Deque[Tuple[List[str], Future]] = deque()
+    for chunk in _chunked(words, chunk_size):
+        pending.append((chunk, submit(chunk)))
+        if len(pending) >= 2 * workers:
+            yield from resolve(*pending.popleft())
+    while pending:
+        yield from resolve(*pending.popleft())
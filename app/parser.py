@@ -1,5 +1,7 @@
 from __future__ import annotations
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional, Union
+import codecs
+import hashlib
 import re
 from .dfa import DFA
 
@@ -15,13 +17,20 @@ from .dfa import DFA
 MAX_LINE_LENGTH = 10000
 MAX_ITEMS_PER_LINE = 1000
 MAX_FILE_SIZE = 1024 * 1024  # 1MB
+MAX_LINES = 10000
+
+# Patrones precompilados (nombres e identificadores comparten alfabeto)
+_SAFE_RE = re.compile(r'^[a-zA-Z0-9_-]+$')
+
+# Tamaño de lectura al parsear archivos desde disco
+READ_CHUNK_SIZE = 64 * 1024
 
 def sanitize_name(name: str) -> str:
     """Sanitiza y valida nombres de autómatas"""
     if not name or len(name) > 100:
         raise ValueError(f"Nombre inválido: longitud debe ser 1-100 caracteres")
     # Solo permitir alfanuméricos, guiones y guiones bajos
-    if not re.match(r'^[a-zA-Z0-9_-]+$', name):
+    if not _SAFE_RE.match(name):
         raise ValueError(f"Nombre inválido: {name}. Solo se permiten letras, números, _ y -")
     return name.strip()
 
@@ -30,7 +39,7 @@ def sanitize_identifier(identifier: str, max_len: int = 50) -> str:
     if not identifier or len(identifier) > max_len:
         raise ValueError(f"Identificador inválido: longitud debe ser 1-{max_len}")
     # Permitir más caracteres para símbolos pero restringir caracteres peligrosos
-    if not re.match(r'^[a-zA-Z0-9_-]+$', identifier):
+    if not _SAFE_RE.match(identifier):
         raise ValueError(f"Identificador inválido: {identifier}")
     return identifier.strip()
 
@@ -38,131 +47,195 @@ def parse_line(line: str) -> tuple[int, str, List[str]]:
     line = line.strip()
     if not line or line.startswith("#"):
         raise ValueError("Línea vacía/comentario")
-    
+
     if len(line) > MAX_LINE_LENGTH:
         raise ValueError(f"Línea demasiado larga: {len(line)} > {MAX_LINE_LENGTH}")
-    
-    try:
-        parts = line.split(":", 2)  # Limitar splits para evitar problemas
-        if len(parts) != 3:
-            raise ValueError(f"Formato inválido: se esperan exactamente 2 ':' en la línea")
-        
-        head, name, info = parts
-    except ValueError:
+
+    parts = line.split(":", 2)  # Limitar splits para evitar problemas
+    if len(parts) != 3:
         raise ValueError(f"Formato inválido: {line}")
-    
+    head, name, info = parts
+
     try:
         idinfo = int(head)
-        if idinfo not in [1, 2, 3, 4, 5]:
-            raise ValueError(f"IdInfo debe ser 1-5, recibido: {idinfo}")
     except ValueError:
         raise ValueError(f"IdInfo inválido: {head}")
-    
+    if idinfo not in (1, 2, 3, 4, 5):
+        raise ValueError(f"IdInfo inválido: {head}")
+
     # Sanitizar nombre
     name = sanitize_name(name)
-    
+
     # Procesar información con límites
-    items = [x.strip() for x in info.split(";") if x.strip()]
+    items = [x.strip() for x in info.split(";")]
+    items = [x for x in items if x]
     if len(items) > MAX_ITEMS_PER_LINE:
         raise ValueError(f"Demasiados elementos en línea: {len(items)} > {MAX_ITEMS_PER_LINE}")
-    
+
     return idinfo, name, items
 
-def parse_file(filepath: str) -> Dict[str, DFA]:
-    import os
-    
-    # Verificar tamaño del archivo
-    if os.path.getsize(filepath) > MAX_FILE_SIZE:
-        raise ValueError(f"Archivo demasiado grande: {os.path.getsize(filepath)} bytes > {MAX_FILE_SIZE}")
-    
-    dfas: Dict[str, DFA] = {}
-    line_count = 0
-    
-    with open(filepath, "r", encoding="utf-8") as f:
-        for line_num, raw in enumerate(f, 1):
-            line_count += 1
-            if line_count > 10000:  # Límite de líneas
-                raise ValueError("Archivo tiene demasiadas líneas (máximo 10000)")
-            
-            raw = raw.strip()
-            if not raw or raw.startswith("#"):
-                continue
-                
+class StreamParser:
+    """Parser incremental: recibe fragmentos de texto o bytes y construye los AFDs.
+
+    Se alimenta con ``feed`` (p.ej. con cada fragmento de un ``UploadFile``)
+    y se termina con ``close``, que valida y devuelve los AFDs. No necesita
+    el contenido completo en memoria ni archivos temporales, y calcula el
+    hash SHA-256 del contenido para la caché compilada.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = MAX_FILE_SIZE,
+                 max_lines: Optional[int] = MAX_LINES) -> None:
+        self.max_bytes = max_bytes
+        self.max_lines = max_lines
+        self.dfas: Dict[str, DFA] = {}
+        self.size = 0
+        self.line_num = 0
+        self._pending = ""
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._hash = hashlib.sha256()
+        # Identificadores ya sanitizados: los estados se repiten en cada transición
+        self._identifiers: Dict[str, str] = {}
+
+    @property
+    def digest(self) -> str:
+        return self._hash.hexdigest()
+
+    def feed(self, chunk: Union[bytes, str]) -> None:
+        if isinstance(chunk, str):
+            data = chunk.encode("utf-8")
+            text = chunk
+        else:
+            data = chunk
+            text = None
+        self.size += len(data)
+        if self.max_bytes is not None and self.size > self.max_bytes:
+            raise ValueError(f"Archivo demasiado grande: más de {self.max_bytes} bytes")
+        self._hash.update(data)
+        if text is None:
+            text = self._decoder.decode(data)
+
+        lines = (self._pending + text).split("\n")
+        self._pending = lines.pop()
+        for raw in lines:
+            self._line(raw)
+
+    def close(self) -> Dict[str, DFA]:
+        tail = self._pending + self._decoder.decode(b"", final=True)
+        self._pending = ""
+        if tail:
+            self._line(tail)
+
+        # Validar todos los DFAs
+        for name, dfa in self.dfas.items():
             try:
-                idinfo, name, items = parse_line(raw)
+                dfa.validate()
             except ValueError as e:
-                raise ValueError(f"Error en línea {line_num}: {e}")
+                raise ValueError(f"Error validando DFA {name}: {e}")
+        return self.dfas
 
-            # Obtener o crear DFA
-            if name not in dfas:
-                dfas[name] = DFA(name=name)
-            dfa = dfas[name]
+    def _identifier(self, token: str) -> str:
+        ident = self._identifiers.get(token)
+        if ident is None:
+            ident = self._identifiers[token] = sanitize_identifier(token)
+        return ident
 
-            try:
-                if idinfo == 1:
-                    # estados
-                    states_str = ",".join(items)
-                    for st in states_str.split(","):
+    def _line(self, raw: str) -> None:
+        self.line_num += 1
+        line_num = self.line_num
+        if self.max_lines is not None and line_num > self.max_lines:  # Límite de líneas
+            raise ValueError(f"Archivo tiene demasiadas líneas (máximo {self.max_lines})")
+
+        raw = raw.strip()
+        if not raw or raw.startswith("#"):
+            return
+
+        try:
+            idinfo, name, items = parse_line(raw)
+        except ValueError as e:
+            raise ValueError(f"Error en línea {line_num}: {e}")
+
+        # Obtener o crear DFA
+        dfa = self.dfas.get(name)
+        if dfa is None:
+            dfa = self.dfas[name] = DFA(name=name)
+
+        try:
+            if idinfo == 1:
+                # estados
+                for item in items:
+                    for st in item.split(","):
                         st = st.strip()
                         if st:
-                            dfa.states.add(sanitize_identifier(st))
-                            
-                elif idinfo == 2:
-                    # alfabeto
-                    alphabet_str = ",".join(items)
-                    for s in alphabet_str.split(","):
+                            dfa.states.add(self._identifier(st))
+
+            elif idinfo == 2:
+                # alfabeto
+                for item in items:
+                    for s in item.split(","):
                         s = s.strip()
                         if s:
                             # Los símbolos pueden ser más flexibles pero limitados
                             if len(s) > 10:
                                 raise ValueError(f"Símbolo demasiado largo: {s}")
                             dfa.alphabet.add(s)
-                            
-                elif idinfo == 3:
-                    # inicial (solo 1 esperado)
-                    if len(items) != 1:
-                        raise ValueError("Se esperaba exactamente un estado inicial")
-                    initial = sanitize_identifier(items[0])
-                    dfa.start = initial
-                    
-                elif idinfo == 4:
-                    # finales
-                    finals_str = ",".join(items)
-                    for st in finals_str.split(","):
+
+            elif idinfo == 3:
+                # inicial (solo 1 esperado)
+                if len(items) != 1:
+                    raise ValueError("Se esperaba exactamente un estado inicial")
+                dfa.start = self._identifier(items[0])
+
+            elif idinfo == 4:
+                # finales
+                for item in items:
+                    for st in item.split(","):
                         st = st.strip()
                         if st:
-                            dfa.finals.add(sanitize_identifier(st))
-                            
-                elif idinfo == 5:
-                    # transiciones: cada item: qI,a,qF
-                    for triple in items:
-                        parts = [p.strip() for p in triple.split(",")]
-                        if len(parts) != 3:
-                            raise ValueError(f"Transición inválida: {triple} (se esperan 3 elementos)")
-                        
-                        s, a, t = parts
-                        s = sanitize_identifier(s)
-                        t = sanitize_identifier(t)
-                        
-                        # El símbolo 'a' puede ser más flexible
-                        if not a or len(a) > 10:
-                            raise ValueError(f"Símbolo de transición inválido: {a}")
-                        
-                        if (s, a) in dfa.delta and dfa.delta[(s, a)] != t:
-                            raise ValueError(
-                                f"Conflicto determinista en {name} para ({s},{a}): "
-                                f"ya existe {dfa.delta[(s, a)]}, se intenta agregar {t}"
-                            )
-                        dfa.delta[(s, a)] = t
-                        
-            except ValueError as e:
-                raise ValueError(f"Error procesando {name} en línea {line_num}: {e}")
+                            dfa.finals.add(self._identifier(st))
+
+            elif idinfo == 5:
+                # transiciones: cada item: qI,a,qF
+                delta = dfa.delta
+                for triple in items:
+                    parts = triple.split(",")
+                    if len(parts) != 3:
+                        raise ValueError(f"Transición inválida: {triple} (se esperan 3 elementos)")
+
+                    s = self._identifier(parts[0].strip())
+                    a = parts[1].strip()
+                    t = self._identifier(parts[2].strip())
+
+                    # El símbolo 'a' puede ser más flexible
+                    if not a or len(a) > 10:
+                        raise ValueError(f"Símbolo de transición inválido: {a}")
+
+                    previous = delta.get((s, a))
+                    if previous is not None and previous != t:
+                        raise ValueError(
+                            f"Conflicto determinista en {name} para ({s},{a}): "
+                            f"ya existe {previous}, se intenta agregar {t}"
+                        )
+                    delta[(s, a)] = t
 
-    # Validar todos los DFAs
-    for name, dfa in dfas.items():
-        try:
-            dfa.validate()
         except ValueError as e:
-            raise ValueError(f"Error validando DFA {name}: {e}")
-    
-    return dfas
+            raise ValueError(f"Error procesando {name} en línea {line_num}: {e}")
+        finally:
+            # Los conjuntos se modificaron en sitio: forzar revalidación
+            dfa.invalidate()
+
+def parse_stream(chunks: Iterable[Union[bytes, str]], max_bytes: Optional[int] = MAX_FILE_SIZE) -> Dict[str, DFA]:
+    """Parsea cualquier iterable de fragmentos (bytes o texto) en una sola pasada."""
+    parser = StreamParser(max_bytes=max_bytes)
+    for chunk in chunks:
+        parser.feed(chunk)
+    return parser.close()
+
+def parse_file(filepath: str) -> Dict[str, DFA]:
+    import os
+
+    # Verificar tamaño del archivo
+    if os.path.getsize(filepath) > MAX_FILE_SIZE:
+        raise ValueError(f"Archivo demasiado grande: {os.path.getsize(filepath)} bytes > {MAX_FILE_SIZE}")
+
+    with open(filepath, "rb") as f:
+        return parse_stream(iter(lambda: f.read(READ_CHUNK_SIZE), b""))
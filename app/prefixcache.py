@@ -0,0 +1,114 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, List, Sequence
+import os
+from .compiled import TRAP
+
+if TYPE_CHECKING:
+    from .compiled import CompiledDFA
+
+# Memoización de estados por prefijo para entradas con prefijos largos en
+# común (líneas de log, identificadores jerárquicos, rutas).
+#
+# Trie acotado cuyos nodos son *checkpoints* cada ``checkpoint`` caracteres:
+# el hijo de un nodo se indexa por el siguiente tramo de ``checkpoint``
+# caracteres y guarda el estado alcanzado al final de ese tramo. Una palabra
+# nueva desciende por el trie comparando tramos completos (hash de un slice,
+# en C) y retoma la simulación desde el checkpoint más profundo encontrado;
+# los tramos que recorre a mano se agregan como checkpoints nuevos.
+#
+# Al llegar a ``max_nodes`` el trie se vacía y vuelve a llenarse con los
+# prefijos más recientes. Solo se aplica a alfabetos de un carácter: con
+# símbolos multicarácter un token puede cruzar el borde de un tramo.
+
+DEFAULT_CHECKPOINT = int(os.getenv("AFD_PREFIX_CHECKPOINT", "16"))
+DEFAULT_MAX_NODES = int(os.getenv("AFD_PREFIX_MAX_NODES", "100000"))
+
+class PrefixCache:
+    """Trie de checkpoints (tramo -> [estado, hijos]) sobre un ``CompiledDFA``."""
+
+    def __init__(self, compiled: "CompiledDFA", checkpoint: int = DEFAULT_CHECKPOINT,
+                 max_nodes: int = DEFAULT_MAX_NODES) -> None:
+        if checkpoint < 1 or max_nodes < 1:
+            raise ValueError("checkpoint y max_nodes deben ser positivos")
+        self.compiled = compiled
+        self.checkpoint = checkpoint
+        self.max_nodes = max_nodes
+        self.clear()
+
+    def clear(self) -> None:
+        self._root: dict = {}
+        self.nodes = 0
+        self.resumed_chars = 0
+        self.walked_chars = 0
+
+    def run(self, word: str) -> tuple[int, int]:
+        """Igual que ``CompiledDFA.run`` pero retomando desde el prefijo cacheado."""
+        compiled = self.compiled
+        if compiled.trie_children is not None:
+            return compiled.run(word)
+        c = self.checkpoint
+        n = len(word)
+        children = self._root
+        current = compiled.start
+        i = 0
+        while i + c <= n:
+            node = children.get(word[i:i + c])
+            if node is None:
+                break
+            current, children = node
+            i += c
+        self.resumed_chars += i
+
+        table = compiled.table
+        get = compiled.symbol_index.get
+        start = i
+        while i < n:
+            end = min(i + c, n)
+            for k in range(i, end):
+                j = get(word[k])
+                if j is None:
+                    self.walked_chars += k - start
+                    return (current, k)
+                nxt = table[current + j]
+                if nxt == TRAP:
+                    self.walked_chars += k - start
+                    return (current, k)
+                current = nxt
+            if end - i == c and children is not None:
+                if self.nodes >= self.max_nodes:
+                    # Lleno: empezar de nuevo con los prefijos recientes
+                    self._root = {}
+                    self.nodes = 0
+                    children = None
+                else:
+                    node = [current, {}]
+                    children[word[i:end]] = node
+                    children = node[1]
+                    self.nodes += 1
+            i = end
+        self.walked_chars += n - start
+        return (current, n)
+
+    def accepts(self, word: str):
+        return self.compiled.outcome(word, *self.run(word))
+
+    def check_words(self, words: Sequence[str], max_length: int = 10000) -> List[tuple]:
+        """Equivalente de ``CompiledDFA.check_words`` (sin rutas) con memoización."""
+        rows: List[tuple] = []
+        for word in words:
+            if len(word) > max_length:
+                rows.append((False, f"#ERR:word_too_long_{len(word)}>_{max_length}", None))
+            else:
+                rows.append(self.accepts(word))
+        return rows
+
+    def stats(self) -> dict:
+        total = self.resumed_chars + self.walked_chars
+        return {
+            "checkpoint": self.checkpoint,
+            "nodes": self.nodes,
+            "max_nodes": self.max_nodes,
+            "resumed_chars": self.resumed_chars,
+            "walked_chars": self.walked_chars,
+            "resumed_ratio": self.resumed_chars / total if total else None
+        }
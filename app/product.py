@@ -0,0 +1,147 @@
+from __future__ import annotations
+from itertools import product as iproduct
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import os
+from .compiled import TRAP
+from .dfa import MAX_STATES, DFA
+
+# Operaciones booleanas entre AFDs por construcción de producto perezosa.
+#
+# En lugar de armar las |Q1|·|Q2| parejas de estados se recorren solo las
+# alcanzables desde la pareja inicial, sobre la unión de los alfabetos. Cada
+# pareja se codifica como un entero (fila_1 + 1) + (fila_2 + 1)·(|Q1| + 1),
+# donde 0 representa la trampa implícita de un componente, y recibe un
+# índice nuevo la primera vez que aparece. Las parejas que ya no pueden
+# aceptar según la operación (p.ej. en una intersección, cuando un
+# componente cayó en la trampa) no se exploran, y al final se descartan los
+# estados desde los que ningún final es alcanzable.
+#
+# El complemento es el caso de un solo operando: la trampa implícita pasa a
+# ser un estado final explícito. Es relativo al alfabeto del autómata.
+#
+# Con símbolos multicarácter la palabra se tokeniza con el alfabeto unión,
+# que puede cortar distinto que el de cada operando por separado.
+#
+# Sin minimizar, el resultado debe respetar el límite de estados de un AFD,
+# así que la exploración se corta en MAX_STATES parejas. Al minimizar, el
+# producto intermedio puede crecer hasta MAX_PRODUCT_PAIRS: solo el AFD
+# mínimo tiene que entrar en el límite.
+
+# Parejas exploradas como máximo antes de abandonar la construcción (al minimizar)
+MAX_PRODUCT_PAIRS = int(os.getenv("AFD_PRODUCT_MAX_PAIRS", "100000"))
+
+OPERATIONS: Dict[str, Tuple[int, Callable[..., bool]]] = {
+    "union": (2, lambda a, b: a or b),
+    "intersection": (2, lambda a, b: a and b),
+    "difference": (2, lambda a, b: a and not b),
+    "complement": (1, lambda a: not a),
+}
+
+def combine(op: str, operands: Sequence[DFA], name: str, max_pairs: Optional[int] = None,
+            minimize: bool = False) -> DFA:
+    """AFD ``name`` que reconoce la operación ``op`` sobre ``operands``.
+
+    Con ``minimize`` el resultado se minimiza antes de validarlo.
+    """
+    if op not in OPERATIONS:
+        raise ValueError(f"Operación desconocida: {op} (use {', '.join(OPERATIONS)})")
+    arity, accept = OPERATIONS[op]
+    if len(operands) != arity:
+        raise ValueError(f"{op} requiere {arity} autómata(s), se recibieron {len(operands)}")
+    if max_pairs is None:
+        max_pairs = MAX_PRODUCT_PAIRS if minimize else MAX_STATES
+    for dfa in operands:
+        dfa.ensure_valid()
+    compiled = [dfa.compile() for dfa in operands]
+    symbols = sorted(set().union(*(c.symbols for c in compiled)))
+    # columns[k][j]: columna del símbolo j en el operando k (-1 si no está)
+    columns = [[c.symbol_index.get(a, -1) for a in symbols] for c in compiled]
+    # Código = suma de (fila + 1)·mult[k]; fila -1 es la trampa
+    mult = [1]
+    for c in compiled[:-1]:
+        mult.append(mult[-1] * (len(c.states) + 1))
+
+    def decode(code: int) -> List[int]:
+        return [(code // m) % (len(c.states) + 1) - 1 for c, m in zip(compiled, mult)]
+
+    def finals_of(rows: List[int]) -> List[bool]:
+        return [r >= 0 and c.is_final(r * c.n_symbols) for c, r in zip(compiled, rows)]
+
+    # Una pareja con estos componentes en la trampa ¿puede aún aceptar?
+    alive_by_mask = []
+    for mask in range(1 << arity):
+        alive_by_mask.append(any(
+            accept(*(False if mask >> k & 1 else v for k, v in enumerate(values)))
+            for values in iproduct((False, True), repeat=arity)
+        ))
+
+    start_rows = [c.start // c.n_symbols for c in compiled]
+    start = sum((r + 1) * m for r, m in zip(start_rows, mult))
+    index = {start: 0}
+    order = [start]
+    rows_table: List[List[int]] = []
+    finals: List[bool] = []
+    i = 0
+    while i < len(order):
+        rows = decode(order[i])
+        finals.append(accept(*finals_of(rows)))
+        targets = []
+        for j in range(len(symbols)):
+            code = 0
+            mask = 0
+            for k, c in enumerate(compiled):
+                col = columns[k][j]
+                t = TRAP if rows[k] < 0 or col < 0 else c.table[rows[k] * c.n_symbols + col]
+                if t == TRAP:
+                    mask |= 1 << k
+                else:
+                    code += (t // c.n_symbols + 1) * mult[k]
+            if not alive_by_mask[mask]:
+                targets.append(TRAP)
+                continue
+            target = index.get(code)
+            if target is None:
+                if len(order) >= max_pairs:
+                    raise ValueError(
+                        f"{name}: el producto supera {max_pairs} parejas de estados alcanzables"
+                        + ("" if minimize else " (minimizar permite productos intermedios mayores)")
+                    )
+                target = index[code] = len(order)
+                order.append(code)
+            targets.append(target)
+        rows_table.append(targets)
+        i += 1
+
+    # Quitar los estados muertos (ningún final alcanzable), salvo el inicial
+    reverse: Dict[int, List[int]] = {}
+    for s, targets in enumerate(rows_table):
+        for t in targets:
+            if t != TRAP:
+                reverse.setdefault(t, []).append(s)
+    live = {s for s, f in enumerate(finals) if f}
+    stack = list(live)
+    while stack:
+        for s in reverse.get(stack.pop(), ()):
+            if s not in live:
+                live.add(s)
+                stack.append(s)
+    keep = sorted(live | {0})
+    names = {s: f"p{i}" for i, s in enumerate(keep)}
+
+    result = DFA(
+        name=name,
+        states={names[s] for s in keep},
+        alphabet=set(symbols),
+        start=names[0],
+        finals={names[s] for s in keep if finals[s]},
+        delta={
+            (names[s], symbols[j]): names[t]
+            for s in keep
+            for j, t in enumerate(rows_table[s])
+            if t != TRAP and t in live
+        },
+    )
+    if minimize:
+        result = result.minimize(validate=False)
+    result.validate()
+    return result
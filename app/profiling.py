@@ -0,0 +1,249 @@
+from __future__ import annotations
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+import cProfile
+import functools
+import inspect
+import marshal
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+
+# Perfilado opcional de peticiones.
+#
+# Una petición se perfila si trae la cabecera ``X-Profile: 1`` o
+# ``?profile=1`` (con ``AFD_PROFILE_REQUESTS=1``, el valor por defecto) o,
+# en los endpoints marcados como muestreables (/check y /upload), con
+# probabilidad ``AFD_PROFILE_SAMPLE_RATE`` (0 por defecto). El middleware
+# marca la petición en una ``ContextVar`` que llega al hilo del threadpool
+# donde corre el endpoint, y ``profiled`` perfila solo ese hilo.
+#
+# Hasta Python 3.11 cProfile se engancha con ``sys.setprofile`` y ve solo el
+# hilo que lo activó. Desde 3.12 usa ``sys.monitoring``, que es global al
+# proceso: el perfil mezclaría lo que corre en los demás hilos del
+# threadpool. Ahí se usa ``_ThreadProfile``, más lento pero limitado al hilo
+# de la petición porque ``sys.setprofile`` sigue siendo por hilo.
+#
+# Las estadísticas de todas las peticiones perfiladas se acumulan en un
+# ``pstats.Stats`` para /admin/profile. Solo un perfil está activo a la vez:
+# una petición que llega mientras otra se perfila corre sin perfilar.
+
+PROFILE_REQUESTS = os.getenv("AFD_PROFILE_REQUESTS", "1") == "1"
+PROFILE_SAMPLE_RATE = float(os.getenv("AFD_PROFILE_SAMPLE_RATE", "0"))
+
+_requested: ContextVar[bool] = ContextVar("profile_requested", default=False)
+
+# cProfile limitado al hilo que lo activa (antes de sys.monitoring)
+_CPROFILE_PER_THREAD = sys.version_info < (3, 12)
+
+_Key = Tuple[str, int, str]
+
+class _ThreadProfile:
+    """Perfil determinista del hilo actual con ``sys.setprofile``.
+
+    Expone ``enable``, ``disable`` y ``create_stats``/``stats`` como
+    cProfile, así que ``pstats.Stats`` lo acepta igual.
+    """
+
+    def __init__(self) -> None:
+        # Pila de llamadas abiertas: [clave, marco, es_C, inicio, tiempo_en_hijas]
+        self._stack: List[list] = []
+        # clave -> [llamadas primitivas, llamadas, tottime, cumtime, {llamadora: [...]}]
+        self._raw: Dict[_Key, list] = {}
+        self._open: Dict[_Key, int] = {}  # activaciones en curso (recursión)
+        self.stats: dict = {}
+
+    def enable(self) -> None:
+        sys.setprofile(self._dispatch)
+
+    def disable(self) -> None:
+        sys.setprofile(None)
+
+    def _dispatch(self, frame, event: str, arg) -> None:
+        now = time.perf_counter()
+        if event == "call":
+            code = frame.f_code
+            self._push((code.co_filename, code.co_firstlineno, code.co_name), frame, False, now)
+        elif event == "c_call":
+            name = getattr(arg, "__qualname__", None) or repr(arg)
+            module = getattr(arg, "__module__", None)
+            label = f"<built-in method {module}.{name}>" if module else f"<built-in method {name}>"
+            self._push(("~", 0, label), frame, True, now)
+        elif event == "return":
+            self._pop(frame, False, now)
+        else:  # c_return, c_exception
+            self._pop(frame, True, now)
+
+    def _push(self, key: _Key, frame, is_c: bool, now: float) -> None:
+        self._stack.append([key, frame, is_c, now, 0.0])
+        self._open[key] = self._open.get(key, 0) + 1
+
+    def _pop(self, frame, is_c: bool, now: float) -> None:
+        stack = self._stack
+        # Marcos que se abrieron antes de activar el perfil (o corrutinas
+        # suspendidas al cortar la pila) no tienen entrada: se ignoran
+        if not any(entry[1] is frame and entry[2] == is_c for entry in reversed(stack)):
+            return
+        while True:
+            key, top, top_c, start, children = stack.pop()
+            self._open[key] -= 1
+            elapsed = now - start
+            caller = stack[-1][0] if stack else None
+            if stack:
+                stack[-1][4] += elapsed
+            outermost = self._open[key] == 0
+            row = self._raw.setdefault(key, [0, 0, 0.0, 0.0, {}])
+            row[0] += outermost
+            row[1] += 1
+            row[2] += elapsed - children
+            row[3] += elapsed if outermost else 0.0
+            if caller is not None:
+                edge = row[4].setdefault(caller, [0, 0, 0.0, 0.0])
+                edge[0] += 1
+                edge[1] += outermost
+                edge[2] += elapsed - children
+                edge[3] += elapsed if outermost else 0.0
+            if top is frame and top_c == is_c:
+                return
+
+    def create_stats(self) -> None:
+        self.stats = {
+            key: (cc, nc, tt, ct, {caller: tuple(edge) for caller, edge in callers.items()})
+            for key, (cc, nc, tt, ct, callers) in self._raw.items()
+        }
+
+class ProfileAggregator:
+    """Estadísticas acumuladas de las peticiones perfiladas."""
+
+    def __init__(self, sample_rate: float = PROFILE_SAMPLE_RATE,
+                 allow_requests: bool = PROFILE_REQUESTS) -> None:
+        self.set_sample_rate(sample_rate)
+        self.allow_requests = allow_requests
+        self._active = threading.Lock()  # perfil en curso
+        self._lock = threading.Lock()    # acumulado
+        self.reset()
+
+    def set_sample_rate(self, rate: float) -> None:
+        if not 0.0 <= rate <= 1.0:
+            raise ValueError("La tasa de muestreo debe estar entre 0 y 1")
+        self.sample_rate = rate
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats: Optional[pstats.Stats] = None
+            self.by_endpoint: Dict[str, int] = {}
+            self.skipped = 0
+
+    def request(self, requested: bool) -> None:
+        """Marca la petición actual para perfilar (desde el middleware)."""
+        _requested.set(requested and self.allow_requests)
+
+    def should_profile(self, sampled: bool) -> bool:
+        if _requested.get():
+            return True
+        return sampled and self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def _start(self):
+        if not self._active.acquire(blocking=False):
+            with self._lock:
+                self.skipped += 1
+            return None
+        if _CPROFILE_PER_THREAD:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:  # otra herramienta de perfilado activa
+                self._active.release()
+                return None
+            return profile
+        if sys.getprofile() is not None:  # no pisar otro perfil de este hilo
+            self._active.release()
+            return None
+        profile = _ThreadProfile()
+        profile.enable()
+        return profile
+
+    def _finish(self, profile, endpoint: str) -> None:
+        profile.disable()
+        self._active.release()
+        with self._lock:
+            if self._stats is None:
+                self._stats = pstats.Stats(profile)
+            else:
+                self._stats.add(profile)
+            self.by_endpoint[endpoint] = self.by_endpoint.get(endpoint, 0) + 1
+
+    def top(self, limit: int = 20, sort: str = "cumulative") -> List[dict]:
+        """Funciones más costosas según ``sort`` (cumulative, tottime o ncalls)."""
+        if sort not in ("cumulative", "tottime", "ncalls"):
+            raise ValueError("sort debe ser cumulative, tottime o ncalls")
+        with self._lock:
+            if self._stats is None:
+                return []
+            rows = list(self._stats.stats.items())
+        index = {"ncalls": 1, "tottime": 2, "cumulative": 3}[sort]
+        rows.sort(key=lambda item: item[1][index], reverse=True)
+        return [
+            {
+                "function": f"{filename}:{line}({name})",
+                "primitive_calls": cc,
+                "calls": nc,
+                "tottime": tt,
+                "cumtime": ct,
+                "percall": ct / nc if nc else 0.0
+            }
+            for (filename, line, name), (cc, nc, tt, ct, _) in rows[:limit]
+        ]
+
+    def dump(self) -> Optional[bytes]:
+        """Estadísticas en el formato de ``pstats`` (se leen con ``pstats.Stats(archivo)``).
+
+        None si aún no se perfiló nada: ``pstats`` no lee un volcado vacío.
+        """
+        with self._lock:
+            return marshal.dumps(self._stats.stats) if self._stats is not None else None
+
+    def summary(self) -> dict:
+        with self._lock:
+            total = self._stats.total_tt if self._stats is not None else 0.0
+            return {
+                "profiled_requests": sum(self.by_endpoint.values()),
+                "by_endpoint": dict(self.by_endpoint),
+                "skipped_concurrent": self.skipped,
+                "total_seconds": total,
+                "sample_rate": self.sample_rate,
+                "request_flag_enabled": self.allow_requests
+            }
+
+    def profiled(self, endpoint: str, sampled: bool = False) -> Callable:
+        """Decorador de endpoints (síncronos o async) que los perfila si corresponde."""
+        def decorator(fn: Callable) -> Callable:
+            if inspect.iscoroutinefunction(fn):
+                @functools.wraps(fn)
+                async def async_wrapper(*args, **kwargs):
+                    # Un perfil en el hilo del event loop incluye lo que corra
+                    # en otras tareas mientras este endpoint espera
+                    profile = self._start() if self.should_profile(sampled) else None
+                    try:
+                        return await fn(*args, **kwargs)
+                    finally:
+                        if profile is not None:
+                            self._finish(profile, endpoint)
+                return async_wrapper
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                profile = self._start() if self.should_profile(sampled) else None
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    if profile is not None:
+                        self._finish(profile, endpoint)
+            return wrapper
+        return decorator
+
+# Singleton para la API
+profiler = ProfileAggregator()
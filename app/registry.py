@@ -0,0 +1,85 @@
+from __future__ import annotations
+from contextlib import contextmanager
+from typing import Iterator, Tuple
+import mmap
+import os
+import struct
+import threading
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - sin flock (Windows) no hay varios workers
+    fcntl = None
+
+# Registro compartido entre procesos (p.ej. varios workers de uvicorn).
+#
+# Los workers comparten el directorio de la caché compilada (diskcache.py):
+# el journal describe qué cargas y minimizaciones forman el store, y cada
+# ``.afdc`` se mapea en memoria, así que las tablas de transición viven en
+# el page cache del sistema una sola vez para todos los procesos. Este
+# módulo agrega dos archivos:
+#
+#   generation:     16 bytes mapeados en memoria: generación u64 | época u64
+#   registry.lock:  flock exclusivo para los escritores entre procesos
+#
+# Cada escritura al journal incrementa la generación; reiniciar el journal
+# (clear/reset) incrementa además la época. Los lectores comparan el par con
+# el último que aplicaron (una lectura de 16 bytes) y, si cambió, reproducen
+# las entradas nuevas del journal o, si cambió la época, el journal entero.
+
+_COUNTER = struct.Struct("<QQ")
+
+class SharedRegistry:
+    """Contador de generación y lock entre procesos sobre un directorio compartido."""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock_path = os.path.join(directory, "registry.lock")
+        # flock no es reentrante dentro del proceso: se cuenta el anidamiento
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        path = os.path.join(directory, "generation")
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size < _COUNTER.size:
+                os.ftruncate(fd, _COUNTER.size)
+            self._counter = mmap.mmap(fd, _COUNTER.size)
+        finally:
+            os.close(fd)
+
+    def read(self) -> Tuple[int, int]:
+        """(generación, época) publicadas por el último escritor."""
+        return _COUNTER.unpack_from(self._counter, 0)
+
+    def bump(self, reset: bool = False) -> Tuple[int, int]:
+        """Publica una escritura; con ``reset`` el journal se reinició. Requiere ``locked``."""
+        generation, epoch = self.read()
+        generation += 1
+        if reset:
+            epoch += 1
+        _COUNTER.pack_into(self._counter, 0, generation, epoch)
+        return generation, epoch
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        """Lock exclusivo entre procesos; reentrante para el hilo que lo tiene."""
+        with self._thread_lock:
+            if self._depth or fcntl is None:
+                self._depth += 1
+                try:
+                    yield
+                finally:
+                    self._depth -= 1
+                return
+            with open(self._lock_path, "a") as f:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                self._depth += 1
+                try:
+                    yield
+                finally:
+                    self._depth -= 1
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def close(self) -> None:
+        self._counter.close()
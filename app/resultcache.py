@@ -0,0 +1,73 @@
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Hashable, Optional
+import threading
+
+# Caché de resultados de /check para tráfico repetitivo.
+#
+# La clave incluye la versión del AFD (ver DFA.version), que cambia con cada
+# merge y es única en el proceso, así que un autómata fusionado, limpiado o
+# recargado nunca devuelve resultados viejos: sus entradas simplemente dejan
+# de consultarse y salen por LRU.
+
+# Sobrecosto aproximado por entrada (clave, tupla y nodo del OrderedDict)
+ENTRY_OVERHEAD = 200
+
+class ResultCache:
+    """LRU acotada por cantidad de entradas y por bytes aproximados."""
+
+    def __init__(self, max_entries: int, max_bytes: int) -> None:
+        if max_entries < 1 or max_bytes < 1:
+            raise ValueError("Los límites de la caché de resultados deben ser positivos")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[tuple]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: tuple, size: int) -> None:
+        size += ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else None
+            }
@@ -0,0 +1,152 @@
+from __future__ import annotations
+from typing import Iterator, List, Optional, Tuple
+import codecs
+import mmap
+import os
+import re
+from .compiled import TRAP, CompiledDFA
+
+# Modo búsqueda: usar un AFD como escáner sobre un texto grande.
+#
+# Para cada posición de inicio se simula el autómata hacia adelante y se
+# reportan las subcadenas aceptadas (todas o solo la más larga por inicio).
+# Dos podas evitan trabajo inútil:
+#   - la simulación se corta al llegar a un estado desde el que ningún final
+#     es alcanzable (solo queda la trampa);
+#   - los inicios se saltan en C con una clase de caracteres de regex que
+#     contiene solo los primeros caracteres que llevan a un estado vivo.
+# Las coincidencias vacías (inicial final) no se reportan y su largo se
+# acota con ``max_match`` para que la memoria del escaneo de archivos sea
+# constante: el archivo mapeado se decodifica por ventanas que se solapan en
+# ``max_match`` caracteres. Las posiciones son índices de carácter (iguales a
+# los de byte si el texto es ASCII).
+
+DEFAULT_MAX_MATCH = int(os.getenv("AFD_SCAN_MAX_MATCH", "4096"))
+WINDOW_CHARS = 1024 * 1024
+
+Match = Tuple[int, int]
+
+class Scanner:
+    """Busca subcadenas aceptadas por un ``CompiledDFA`` en un texto."""
+
+    def __init__(self, compiled: CompiledDFA, longest: bool = False,
+                 max_match: int = DEFAULT_MAX_MATCH) -> None:
+        if max_match < 1:
+            raise ValueError("max_match debe ser positivo")
+        self.compiled = compiled
+        self.longest = longest
+        self.max_match = max_match
+        n = compiled.n_symbols
+        q = len(compiled.states)
+        self.finals = {i * n for i in range(q) if compiled.is_final(i * n)}
+        self.live = compiled.live_offsets()
+        # Primeros caracteres de símbolos que desde el inicial llevan a un estado vivo
+        first = {a[0] for j, a in enumerate(compiled.symbols)
+                 if compiled.table[compiled.start + j] in self.live}
+        self.first_re = re.compile("[" + "".join(re.escape(c) for c in sorted(first)) + "]") if first else None
+
+    def scan(self, text: str, base: int = 0, starts_end: Optional[int] = None) -> Iterator[Match]:
+        """Genera (inicio, fin) de las coincidencias que empiezan antes de ``starts_end``."""
+        if self.first_re is None:
+            return
+        if starts_end is None:
+            starts_end = len(text)
+        if self.compiled.trie_children is not None:
+            yield from self._scan_tokens(text, base, starts_end)
+            return
+        compiled = self.compiled
+        table = compiled.table
+        get = compiled.symbol_index.get
+        start = compiled.start
+        finals, live = self.finals, self.live
+        longest, max_match = self.longest, self.max_match
+        size = len(text)
+        for m in self.first_re.finditer(text, 0, starts_end):
+            i = m.start()
+            current = start
+            best = -1
+            for k in range(i, min(size, i + max_match)):
+                j = get(text[k])
+                if j is None:
+                    break
+                current = table[current + j]
+                if current not in live:
+                    break
+                if current in finals:
+                    if longest:
+                        best = k + 1
+                    else:
+                        yield (base + i, base + k + 1)
+            if best > 0:
+                yield (base + i, base + best)
+
+    def _scan_tokens(self, text: str, base: int, starts_end: int) -> Iterator[Match]:
+        compiled = self.compiled
+        table = compiled.table
+        symbols = compiled.symbols
+        finals, live = self.finals, self.live
+        for m in self.first_re.finditer(text, 0, starts_end):
+            i = m.start()
+            limit = i + self.max_match
+            current = compiled.start
+            best = -1
+            for pos, j in compiled.tokens(text, i):
+                end = pos + len(symbols[j]) if j >= 0 else pos
+                if j < 0 or end > limit:
+                    break
+                current = table[current + j]
+                if current not in live:
+                    break
+                if current in finals:
+                    if self.longest:
+                        best = end
+                    else:
+                        yield (base + i, base + end)
+            if best > 0:
+                yield (base + i, base + best)
+
+    def scan_file(self, path: str, window: int = WINDOW_CHARS,
+                  stats: Optional[dict] = None, with_text: bool = False) -> Iterator[tuple]:
+        """Escanea un archivo UTF-8 mapeado en memoria con memoria acotada.
+
+        Con ``with_text`` cada coincidencia incluye su texto (inicio, fin,
+        texto). Si se pasa ``stats`` se completa con ``bytes`` y ``chars``
+        procesados.
+        """
+        if stats is None:
+            stats = {}
+        stats["bytes"] = stats["chars"] = 0
+        if os.path.getsize(path) == 0:
+            return
+        overlap = self.max_match
+        window = max(window, 2 * overlap)
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            total = len(mm)
+            carry = ""       # cola de la ventana anterior (inicios aún no escaneados)
+            base = 0         # posición absoluta del primer carácter de ``carry``
+            pos = 0
+            while pos < total:
+                chunk = mm[pos:pos + window]
+                pos += len(chunk)
+                text = carry + decoder.decode(chunk, final=pos >= total)
+                stats["bytes"] = pos
+                last = pos >= total
+                # Solo los inicios cuya coincidencia más larga cabe en la ventana
+                cut = len(text) if last else max(0, len(text) - overlap)
+                for start, end in self.scan(text, base, cut):
+                    yield (start, end, text[start - base:end - base]) if with_text else (start, end)
+                if last:
+                    stats["chars"] = base + len(text)
+                    return
+                carry = text[cut:]
+                base += cut
+
+    def matches(self, text: str, limit: Optional[int] = None) -> List[Match]:
+        """Lista de coincidencias de ``text`` (a lo sumo ``limit``)."""
+        out: List[Match] = []
+        for match in self.scan(text):
+            if limit is not None and len(out) >= limit:
+                break
+            out.append(match)
+        return out
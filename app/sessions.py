@@ -0,0 +1,134 @@
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Callable
+import os
+import secrets
+import threading
+import time
+from .dfa import DFA, Stepper
+
+# Sesiones de simulación incremental para /sessions.
+#
+# Cada sesión guarda un ``Stepper`` sobre la versión del autómata vigente al
+# abrirla, así que un merge posterior no altera una palabra a medio recibir.
+# Las sesiones viven en memoria del proceso (con varios workers el balanceador
+# debe enviar cada sesión siempre al mismo). Las inactivas por más de ``ttl``
+# segundos se eliminan y, si se supera ``max_sessions``, se descarta la usada
+# hace más tiempo.
+
+SESSION_TTL = float(os.getenv("AFD_SESSION_TTL", "300"))
+MAX_SESSIONS = int(os.getenv("AFD_MAX_SESSIONS", "10000"))
+
+class Session:
+    __slots__ = ("id", "automata", "version", "stepper", "created", "last_used", "seconds")
+
+    def __init__(self, session_id: str, dfa: DFA, now: float) -> None:
+        self.id = session_id
+        self.automata = dfa.name
+        self.version = dfa.version
+        self.stepper: Stepper = dfa.stepper()
+        self.created = now
+        self.last_used = now
+        self.seconds = 0.0  # tiempo de simulación acumulado en feed
+
+    def status(self) -> dict:
+        stepper = self.stepper
+        accepted, reason, position = stepper.result()
+        return {
+            "session_id": self.id,
+            "automata": self.automata,
+            "version": self.version,
+            "length": stepper.position,
+            "state": stepper.state,
+            "alive": stepper.alive,
+            "accepted": accepted,
+            "reason": reason,
+            "position": position
+        }
+
+class SessionManager:
+    """Sesiones por id en orden de último uso (LRU) con expiración por inactividad."""
+
+    def __init__(self, ttl: float = SESSION_TTL, max_sessions: int = MAX_SESSIONS,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        if ttl <= 0 or max_sessions < 1:
+            raise ValueError("ttl y max_sessions deben ser positivos")
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._clock = clock
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.expired = 0
+        self.evicted = 0
+
+    def _purge(self, now: float) -> None:
+        # Las menos recientes están al principio: se corta en la primera vigente
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if now - session.last_used < self.ttl:
+                break
+            self._sessions.popitem(last=False)
+            self.expired += 1
+
+    def open(self, dfa: DFA) -> Session:
+        now = self._clock()
+        session = Session(secrets.token_urlsafe(12), dfa, now)
+        with self._lock:
+            self._purge(now)
+            while len(self._sessions) >= self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evicted += 1
+            self._sessions[session.id] = session
+        return session
+
+    def get(self, session_id: str) -> Session:
+        now = self._clock()
+        with self._lock:
+            self._purge(now)
+            session = self._sessions.get(session_id)
+            if session is None:
+                raise KeyError(f"No existe la sesión (o expiró): {session_id}")
+            session.last_used = now
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def feed(self, session_id: str, symbols: str) -> dict:
+        """Avanza la sesión con ``symbols`` y devuelve su estado."""
+        session = self.get(session_id)
+        # El Stepper no es seguro entre hilos: alimentar y leer bajo el lock
+        with self._lock:
+            t0 = time.perf_counter()
+            session.stepper.feed(symbols)
+            session.seconds += time.perf_counter() - t0
+            return session.status()
+
+    def status(self, session_id: str) -> dict:
+        session = self.get(session_id)
+        with self._lock:
+            return session.status()
+
+    def close(self, session_id: str) -> dict:
+        """Cierra la sesión y devuelve su estado final con ``simulation_seconds``."""
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is None:
+                raise KeyError(f"No existe la sesión (o expiró): {session_id}")
+            return {**session.status(), "simulation_seconds": session.seconds}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._sessions.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._purge(self._clock())
+            return {
+                "active": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "ttl_seconds": self.ttl,
+                "expired": self.expired,
+                "evicted": self.evicted
+            }
+
+# Singleton para la API
+sessions = SessionManager()
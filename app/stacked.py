@@ -0,0 +1,78 @@
+from __future__ import annotations
+from array import array
+from typing import Dict, List, Sequence
+from .compiled import TRAP, CompiledDFA
+
+# Clasificación de una palabra contra muchos autómatas en una sola pasada.
+#
+# Las tablas de los autómatas de símbolos de un carácter se apilan en una
+# sola tabla plana sobre la unión de sus alfabetos: la fila global de cada
+# estado es (base del autómata + índice del estado) y las celdas guardan
+# desplazamientos globales, así que avanzar todos los autómatas es una suma
+# y un acceso por autómata activo. Los símbolos ajenos a un autómata y las
+# transiciones a estados muertos (desde los que ningún final es alcanzable)
+# se marcan como ``TRAP``: ese autómata sale de la lista de activos en ese
+# momento y la pasada termina cuando no queda ninguno.
+#
+# Los autómatas con símbolos multicarácter tokenizan la palabra cada uno a
+# su manera y se verifican por separado.
+
+class StackedDFA:
+    """Tabla apilada de varios ``CompiledDFA`` para ``classify``."""
+
+    def __init__(self, compiled: Sequence[CompiledDFA]) -> None:
+        stacked = [c for c in compiled if c.trie_children is None]
+        self.others: List[CompiledDFA] = [c for c in compiled if c.trie_children is not None]
+        self.names: List[str] = [c.name for c in stacked]
+        chars = sorted({a for c in stacked for a in c.symbols})
+        self.char_index: Dict[str, int] = {a: j for j, a in enumerate(chars)}
+        width = self.width = len(chars)
+
+        bases = []
+        rows = 0
+        for c in stacked:
+            bases.append(rows)
+            rows += len(c.states)
+        self.table = array("i", [TRAP]) * (rows * width)
+        self.finals = bytearray((rows + 7) // 8)
+        self.owner = array("i", [0]) * rows
+        self.starts: List[int] = []
+        for k, (c, base) in enumerate(zip(stacked, bases)):
+            n = c.n_symbols
+            live = c.live_offsets()
+            columns = [self.char_index[a] for a in c.symbols]
+            for i in range(len(c.states)):
+                row = (base + i) * width
+                self.owner[base + i] = k
+                if c.is_final(i * n):
+                    self.finals[(base + i) >> 3] |= 1 << ((base + i) & 7)
+                for j, col in enumerate(columns):
+                    t = c.table[i * n + j]
+                    if t != TRAP and t in live:
+                        self.table[row + col] = (base + t // n) * width
+            if c.start in live:
+                self.starts.append((base + c.start // n) * width)
+
+    def classify(self, word: str) -> List[str]:
+        """Nombres (ordenados) de los autómatas que aceptan ``word``."""
+        table = self.table
+        get = self.char_index.get
+        active = self.starts
+        for ch in word:
+            j = get(ch)
+            if j is None:
+                active = []
+                break
+            active = [t for c in active if (t := table[c + j]) != TRAP]
+            if not active:
+                break
+        width = self.width
+        finals = self.finals
+        accepted = []
+        for c in active:
+            row = c // width
+            if finals[row >> 3] >> (row & 7) & 1:
+                accepted.append(self.names[self.owner[row]])
+        accepted.extend(c.name for c in self.others if c.accepts(word)[0])
+        accepted.sort()
+        return accepted
@@ -1,31 +1,320 @@
 from __future__ import annotations
-from typing import Dict, List
+from contextlib import contextmanager
+from types import MappingProxyType
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional
 from .dfa import DFA
-from .parser import parse_file
+from .diskcache import CompiledCache, content_hash
+from .parser import MAX_FILE_SIZE, StreamParser, parse_file, parse_stream
+from .parallel import DEFAULT_CHUNK_SIZE, check_words_parallel
+from .product import combine
+from .registry import SharedRegistry
+from .resultcache import ResultCache
+from .stacked import StackedDFA
 import os
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
+# Tablas apiladas que se conservan para classify
+MAX_STACKED_TABLES = 8
+
+class StoreSnapshot:
+    """Estado inmutable del store en una generación dada.
+
+    Los escritores nunca modifican una instantánea publicada: construyen una
+    nueva (copiando solo los AFDs que cambian) y la publican con una única
+    asignación, así que los lectores ven siempre un estado completo y
+    consistente sin tomar locks.
+    """
+
+    __slots__ = ("generation", "dfas", "minimized")
+
+    def __init__(self, generation: int, dfas: Dict[str, DFA], minimized: Dict[str, DFA]) -> None:
+        self.generation = generation
+        # Originales tal como se cargaron/fusionaron
+        self.dfas: Mapping[str, DFA] = MappingProxyType(dfas)
+        # Formas minimizadas usadas para simular
+        self.minimized: Mapping[str, DFA] = MappingProxyType(minimized)
+
 class AutomataStore:
-    def __init__(self) -> None:
-        self._dfas: Dict[str, DFA] = {}
+    def __init__(self, cache_dir: Optional[str] = None, shared: bool = False,
+                 result_cache_entries: int = 0,
+                 result_cache_bytes: int = 16 * 1024 * 1024) -> None:
+        self._snapshot = StoreSnapshot(0, {}, {})
+        # Solo serializa a los escritores entre sí; las lecturas no lo toman
+        self._write_lock = threading.RLock()
         self._default_file = "/app/data/automatas.txt"
+        # Caché en disco opcional de autómatas compilados (ver diskcache.py)
+        self._cache = CompiledCache(cache_dir) if cache_dir else None
+        # Registro entre procesos sobre el mismo directorio (ver registry.py)
+        if shared and self._cache is None:
+            raise ValueError("El registro compartido requiere cache_dir")
+        self._registry = SharedRegistry(cache_dir) if shared else None
+        # (generación, época) del registro ya aplicadas y fin del journal leído
+        self._seen = (0, 0)
+        self._journal_offset = 0
+        # Caché LRU opcional de resultados de check (0 entradas = desactivada)
+        self._results = (ResultCache(result_cache_entries, result_cache_bytes)
+                         if result_cache_entries > 0 else None)
+        # Tablas apiladas de classify por conjunto de (nombre, versión)
+        self._stacked: Dict[tuple, StackedDFA] = {}
+
+    def snapshot(self) -> StoreSnapshot:
+        """Instantánea actual; sigue siendo válida aunque luego se publique otra.
+
+        Con registro compartido antes se comprueba (leyendo 16 bytes) si otro
+        proceso publicó cambios; solo en ese caso se sincroniza.
+        """
+        if self._registry is not None and self._registry.read() != self._seen:
+            with self._write_lock, self._registry.locked():
+                self._sync_locked()
+        return self._snapshot
+
+    def _publish(self, dfas: Dict[str, DFA], minimized: Dict[str, DFA]) -> None:
+        self._snapshot = StoreSnapshot(self._snapshot.generation + 1, dfas, minimized)
+
+    @contextmanager
+    def _writing(self, sync: bool = True) -> Iterator[None]:
+        """Serializa a los escritores (hilos y, con registro, procesos).
+
+        Con registro compartido primero se aplica lo publicado por otros
+        procesos, para fusionar sobre el estado más reciente.
+        """
+        with self._write_lock:
+            if self._registry is None:
+                yield
+                return
+            with self._registry.locked():
+                if sync:
+                    self._sync_locked()
+                yield
+
+    def _sync_locked(self) -> None:
+        """Reproduce las entradas del journal que otros procesos agregaron."""
+        seen = self._registry.read()
+        if seen == self._seen:
+            return
+        current = self._snapshot
+        if seen[1] != self._seen[1]:
+            # El journal se reinició (clear/reset): reconstruir desde cero
+            offset, dfas, minimized = 0, {}, {}
+        else:
+            offset, dfas, minimized = self._journal_offset, dict(current.dfas), dict(current.minimized)
+        entries, end = self._cache.read_journal_from(offset)
+        try:
+            self._replay(entries, dfas, minimized)
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"No se pudo sincronizar con el registro compartido: {e}")
+        else:
+            self._publish(dfas, minimized)
+            logger.info(f"Store sincronizado con la generación {seen[0]} del registro compartido")
+        self._seen, self._journal_offset = seen, end
+
+    def _journal(self, *entry: str) -> None:
+        """Agrega una entrada al journal y, con registro, la anuncia a los demás procesos."""
+        if self._cache is None:
+            return
+        self._cache.append_journal(*entry)
+        if self._registry is not None:
+            self._seen = self._registry.bump()
+            self._journal_offset = self._cache.read_journal_from(self._journal_offset)[1]
+
+    def _journal_reset(self, keep: Iterable[str] = ()) -> None:
+        """Vacía el journal y borra de la caché lo que no esté en ``keep``."""
+        if self._cache is None:
+            return
+        self._cache.reset_journal()
+        removed = self._cache.prune(keep)
+        if removed:
+            logger.info(f"Caché compilada: {removed} archivo(s) sin referencias borrados")
+        self._journal_offset = 0
+        if self._registry is not None:
+            self._seen = self._registry.bump(reset=True)
+
+    @property
+    def cache_dir(self) -> Optional[str]:
+        return self._cache.directory if self._cache is not None else None
 
-    def load_from_file(self, path: str) -> List[str]:
-        parsed = parse_file(path)
+    @property
+    def shared(self) -> bool:
+        return self._registry is not None
+
+    def _parse_cached(self, path: str) -> tuple[Dict[str, DFA], Optional[str]]:
+        """Parsea ``path`` o lo lee de la caché compilada si su contenido no cambió."""
+        if self._cache is None:
+            return parse_file(path), None
+        if os.path.getsize(path) > MAX_FILE_SIZE:
+            raise ValueError(f"Archivo demasiado grande: {os.path.getsize(path)} bytes > {MAX_FILE_SIZE}")
+        with open(path, "rb") as f:
+            data = f.read()
+        digest = content_hash(data)
+        parsed = self._cache.read(digest, shared=self.shared)
+        if parsed is None:
+            parsed = parse_stream([data])
+            self._cache.write(digest, parsed.values())
+        else:
+            logger.info(f"Autómatas de {path} leídos de la caché compilada")
+        return parsed, digest
+
+    def load_from_file(self, path: str, minimize: bool = False) -> List[str]:
+        """Carga/fusiona los autómatas del archivo.
+
+        Con ``minimize`` (o si el autómata ya estaba minimizado) se guarda
+        además su forma mínima, que es la que se usa para simular.
+        """
+        parsed, digest = self._parse_cached(path)
+        return self._commit(parsed, digest, path, minimize)
+
+    def load_parsed(self, parser: StreamParser, source: str, minimize: bool = False) -> List[str]:
+        """Carga los AFDs de un ``StreamParser`` ya alimentado (p.ej. desde /upload)."""
+        parsed = parser.close()
+        if self._cache is not None and not self._cache.exists(parser.digest):
+            # Antes de fusionar: la caché guarda el contenido de la fuente, no el merge
+            self._cache.write(parser.digest, parsed.values())
+        return self._commit(parsed, parser.digest, source, minimize)
+
+    def _commit(self, parsed: Dict[str, DFA], digest: Optional[str], source: str,
+                minimize: bool, replace: bool = False) -> List[str]:
+        with self._writing():
+            loaded = self._apply(parsed, minimize, replace)
+            if self._cache is not None and digest is not None and not self._cache.exists(digest):
+                # Un clear/reset concurrente pudo borrarlo entre la escritura y el lock
+                self._cache.write(digest, parsed.values())
+            if replace:
+                # El archivo recién cargado es lo único que el journal nuevo referencia
+                self._journal_reset(keep=(digest,))
+            # El origen va al final de la línea del journal: sin saltos de línea
+            self._journal("load", digest, str(int(minimize)), " ".join(source.split()))
+        return loaded
+
+    def _merge_into(self, dfas: Dict[str, DFA], minimized: Dict[str, DFA],
+                    parsed: Dict[str, DFA], minimize: bool) -> List[str]:
+        """Fusiona ``parsed`` en los diccionarios de trabajo de una instantánea nueva.
+
+        Los AFDs existentes no se modifican: se fusiona sobre una copia.
+        """
         loaded: List[str] = []
         for name, newdfa in parsed.items():
-            if name in self._dfas:
-                self._dfas[name].merge(newdfa)
+            if name in dfas:
+                merged = dfas[name].copy()
+                merged.merge(newdfa)
+                dfas[name] = merged
             else:
-                self._dfas[name] = newdfa
+                dfas[name] = newdfa
             loaded.append(name)
-        # validar tras merges
-        for dfa in self._dfas.values():
-            dfa.validate()
+        # Revalidar solo lo cargado: el costo escala con la carga, no con el store
+        for name in loaded:
+            dfas[name].ensure_valid()
+        for name in loaded:
+            if minimize or name in minimized:
+                minimized[name] = dfas[name].minimize()
+        # compilar antes de publicar: los lectores reciben tablas listas
+        for name in loaded:
+            (minimized.get(name) or dfas[name]).compile()
         return loaded
 
+    def _apply(self, parsed: Dict[str, DFA], minimize: bool, replace: bool = False) -> List[str]:
+        """Fusiona ``parsed`` en una nueva instantánea y la publica.
+
+        Un error a mitad de la carga no deja nada publicado. Con ``replace``
+        la instantánea nueva parte vacía. Debe llamarse dentro de ``_writing``.
+        """
+        current = self._snapshot
+        dfas = {} if replace else dict(current.dfas)
+        minimized = {} if replace else dict(current.minimized)
+        loaded = self._merge_into(dfas, minimized, parsed, minimize)
+        self._publish(dfas, minimized)
+        return loaded
+
+    def _replay(self, entries, dfas: Dict[str, DFA], minimized: Dict[str, DFA],
+                check_default: bool = False) -> None:
+        """Aplica entradas del journal sobre los diccionarios de trabajo."""
+        for entry in entries:
+            if entry[0] == "load":
+                _, digest, minimize, source = entry
+                if check_default and source == self._default_file:
+                    with open(source, "rb") as f:
+                        if content_hash(f.read()) != digest:
+                            raise ValueError(f"{source} cambió desde la última ejecución")
+                parsed = self._cache.read(digest, shared=self.shared)
+                if parsed is None:
+                    raise ValueError(f"falta la caché {digest}")
+                self._merge_into(dfas, minimized, parsed, minimize == "1")
+            elif entry[0] == "combine":
+                # Las entradas se parten en 4 campos: los operandos van en el último
+                _, op, name, rest = entry
+                minimize, *operands = rest.split()
+                self._combine_into(dfas, minimized, op, operands, name, minimize == "1")
+            elif entry[0] == "minimize":
+                name = entry[1]
+                if name not in dfas:
+                    raise KeyError(f"No existe el autómata: {name}")
+                minimized[name] = dfas[name].minimize()
+                minimized[name].compile()
+            else:
+                raise ValueError(f"entrada desconocida en el journal: {entry[0]}")
+
+    def _combine_into(self, dfas: Dict[str, DFA], minimized: Dict[str, DFA], op: str,
+                      operands: List[str], name: str, minimize: bool) -> None:
+        if name in dfas:
+            raise ValueError(f"Ya existe el autómata: {name}")
+        missing = [o for o in operands if o not in dfas]
+        if missing:
+            raise KeyError(f"No existe el autómata: {missing[0]}")
+        # Se opera sobre la forma usada para simular: la mínima tiene menos parejas.
+        # Con ``minimize`` se guarda el producto ya minimizado: el límite de
+        # estados aplica al AFD mínimo y no al producto intermedio
+        result = combine(op, [minimized.get(o) or dfas[o] for o in operands], name,
+                         minimize=minimize)
+        self._merge_into(dfas, minimized, {name: result}, minimize)
+
+    def combine(self, op: str, operands: List[str], name: str, minimize: bool = False) -> dict:
+        """Crea ``name`` como unión, intersección, diferencia o complemento de autómatas residentes."""
+        with self._writing():
+            current = self._snapshot
+            dfas, minimized = dict(current.dfas), dict(current.minimized)
+            self._combine_into(dfas, minimized, op, operands, name, minimize)
+            self._publish(dfas, minimized)
+            self._journal("combine", op, name, str(int(minimize)), *operands)
+        result = dfas[name]
+        return {
+            "name": name,
+            "operation": op,
+            "operands": list(operands),
+            "states": len(result.states),
+            "alphabet_size": len(result.alphabet),
+            "transitions": len(result.delta),
+            "minimization": self.minimization_stats(name)
+        }
+
+    def minimize(self, name: str) -> dict:
+        """Minimiza un autómata residente y devuelve las cifras antes/después."""
+        with self._writing():
+            current = self._snapshot
+            original = self._lookup(current, name)
+            minimized = original.minimize()
+            minimized.compile()
+            self._publish(dict(current.dfas), {**current.minimized, name: minimized})
+            self._journal("minimize", name)
+        return self.minimization_stats(name)
+
+    def minimization_stats(self, name: str) -> Optional[dict]:
+        """Cifras de la minimización de ``name`` o None si no está minimizado."""
+        snapshot = self.snapshot()
+        original = self._lookup(snapshot, name)
+        minimized = snapshot.minimized.get(name)
+        if minimized is None:
+            return None
+        return {
+            "name": name,
+            "states_before": len(original.states),
+            "reachable_states": len(original.reachable_states()),
+            "states_after": len(minimized.states),
+            "transitions_before": len(original.delta),
+            "transitions_after": len(minimized.delta)
+        }
+
     def _load_default_automatas(self):
         """Carga autómatas por defecto desde data/automatas.txt solo al inicio"""
         try:
@@ -38,13 +327,46 @@ class AutomataStore:
             logger.error(f"Error cargando autómatas por defecto: {e}")
         return False
 
+    def _restore_from_cache(self) -> bool:
+        """Reconstruye el store desde el journal de la caché sin parsear texto.
+
+        Si el archivo por defecto cambió o falta alguna entrada de la caché,
+        se descarta el journal y se vuelve a cargar desde texto. Debe
+        llamarse dentro de ``_writing``.
+        """
+        entries, end = self._cache.read_journal_from(0)
+        if not entries:
+            return False
+        dfas: Dict[str, DFA] = {}
+        minimized: Dict[str, DFA] = {}
+        try:
+            self._replay(entries, dfas, minimized, check_default=True)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Caché compilada obsoleta o corrupta ({e}); se recarga desde texto")
+            self._publish({}, {})
+            self._journal_reset()
+            return False
+        self._publish(dfas, minimized)
+        self._journal_offset = end
+        if self._registry is not None:
+            self._seen = self._registry.read()
+        logger.info(f"Store restaurado desde la caché compilada: {self.list()}")
+        return True
+
     def initialize(self):
         """Inicializa el store cargando solo autómatas por defecto una vez"""
         try:
-            # Solo cargar autómatas por defecto al inicio del servidor
-            if self._load_default_automatas():
-                logger.info("Store inicializado con autómatas por defecto")
-                return
+            # Con registro compartido el primer worker en llegar carga y los
+            # demás restauran lo que ese publicó
+            with self._writing(sync=False):
+                # Arranque en caliente: restaurar lo cargado antes del reinicio
+                if self._cache is not None and self._restore_from_cache():
+                    return
+                
+                # Solo cargar autómatas por defecto al inicio del servidor
+                if self._load_default_automatas():
+                    logger.info("Store inicializado con autómatas por defecto")
+                    return
             
             logger.info("Store inicializado vacío - no hay autómatas disponibles")
             
@@ -54,7 +376,11 @@ class AutomataStore:
     def clear_all(self):
         """Limpia todos los autómatas de la memoria"""
         try:
-            self._dfas.clear()
+            with self._writing():
+                self._publish({}, {})
+                self._journal_reset()
+                if self._results is not None:
+                    self._results.clear()
             logger.info("Todos los autómatas limpiados de memoria")
         except Exception as e:
             logger.error(f"Error limpiando autómatas: {e}")
@@ -62,29 +388,190 @@ class AutomataStore:
     def reset_to_defaults(self):
         """Resetea a los autómatas por defecto"""
         try:
-            self.clear_all()
-            self._load_default_automatas()
+            # Una sola publicación: los lectores nunca ven el store vacío a mitad del reset
+            with self._writing():
+                if os.path.exists(self._default_file):
+                    parsed, digest = self._parse_cached(self._default_file)
+                    self._commit(parsed, digest, self._default_file, False, replace=True)
+                    # Las versiones nuevas ya no coinciden; se libera la memoria
+                    if self._results is not None:
+                        self._results.clear()
+                else:
+                    self.clear_all()
             logger.info("Store reseteado a autómatas por defecto")
         except Exception as e:
             logger.error(f"Error reseteando a defaults: {e}")
 
     def list(self) -> List[str]:
-        return sorted(self._dfas.keys())
+        return sorted(self.snapshot().dfas.keys())
 
-    def get(self, name: str) -> DFA:
-        if name not in self._dfas:
+    def versions(self) -> dict:
+        """Generación de la instantánea actual y versión de cada autómata."""
+        snapshot = self.snapshot()
+        return {
+            "generation": snapshot.generation,
+            "automata": {
+                name: {
+                    "version": dfa.version,
+                    "minimized_version": snapshot.minimized[name].version
+                    if name in snapshot.minimized else None
+                }
+                for name, dfa in sorted(snapshot.dfas.items())
+            }
+        }
+
+    @staticmethod
+    def _lookup(snapshot: StoreSnapshot, name: str) -> DFA:
+        dfa = snapshot.dfas.get(name)
+        if dfa is None:
             raise KeyError(f"No existe el autómata: {name}")
-        return self._dfas[name]
+        return dfa
+
+    def get(self, name: str) -> DFA:
+        """AFD usado para simular (la forma minimizada si existe)."""
+        # Una sola lectura de la instantánea: original y minimizado coinciden
+        snapshot = self.snapshot()
+        original = self._lookup(snapshot, name)
+        return snapshot.minimized.get(name) or original
+
+    def get_original(self, name: str) -> DFA:
+        """AFD tal como fue cargado/fusionado, sin minimizar."""
+        return self._lookup(self.snapshot(), name)
 
-    def check(self, name: str, word: str, max_length: int = 10000) -> dict:
+    def result_cache_stats(self) -> Optional[dict]:
+        """Aciertos/fallos de la caché de resultados o None si está desactivada."""
+        return self._results.stats() if self._results is not None else None
+
+    @staticmethod
+    def _accepts(dfa: DFA, word: str, max_length: int, prefix_cache: bool) -> tuple:
+        if prefix_cache and isinstance(word, str) and len(word) <= max_length:
+            dfa.ensure_valid()
+            return dfa.compile().prefix_cache().accepts(word)
+        return dfa.accepts(word, max_length=max_length)
+
+    def _cached_result(self, dfa: DFA, word: str, max_length: int, include_path: bool,
+                       prefix_cache: bool = False) -> tuple:
+        # Las palabras demasiado largas no se simulan: no vale la pena cachearlas
+        if self._results is None or len(word) > max_length:
+            if include_path:
+                return dfa.simulate(word, max_length=max_length)
+            return self._accepts(dfa, word, max_length, prefix_cache)
+        key = (dfa.name, dfa.version, include_path, word)
+        value = self._results.get(key)
+        if value is None:
+            if include_path:
+                ok, path = dfa.simulate(word, max_length=max_length)
+                value = (ok, tuple(path))
+                size = len(word) + sum(len(p) for p in path)
+            else:
+                value = self._accepts(dfa, word, max_length, prefix_cache)
+                size = len(word) + len(value[1] or "")
+            self._results.put(key, value, size)
+        return value
+
+    def check(self, name: str, word: str, max_length: int = 10000,
+              include_path: bool = True, prefix_cache: bool = False) -> dict:
+        """Verifica una palabra.
+
+        Con ``prefix_cache`` (solo sin trayectoria) la simulación retoma desde
+        el estado memorizado para el prefijo más largo ya visto.
+        """
         dfa = self.get(name)
-        ok, path = dfa.simulate(word, max_length=max_length)
+        if prefix_cache and include_path:
+            raise ValueError("La memoización por prefijos no construye rutas (use include_path=false)")
+        if not include_path:
+            ok, reason, position = self._cached_result(dfa, word, max_length, False, prefix_cache)
+            return {
+                "automata": name,
+                "word": word,
+                "accepted": ok,
+                "reason": reason,
+                "position": position
+            }
+        ok, path = self._cached_result(dfa, word, max_length, True)
         return {
             "automata": name,
             "word": word,
             "accepted": ok,
-            "path": path
+            "path": list(path)
+        }
+
+    def check_many(self, name: str, words: List[str], max_length: int = 10000,
+                   include_path: bool = False, workers: int = 1,
+                   chunk_size: int = DEFAULT_CHUNK_SIZE, vectorized: bool = False,
+                   prefix_cache: bool = False) -> dict:
+        """Verifica una lista de palabras resolviendo el autómata una sola vez.
+
+        Con ``vectorized`` se usa el motor NumPy (todas las palabras avanzan
+        juntas); con ``prefix_cache`` cada palabra retoma desde el prefijo
+        memorizado más largo; con ``workers > 1`` los fragmentos de
+        ``chunk_size`` palabras se reparten en un pool de procesos. Devuelve
+        los resultados en columnas paralelas a ``words``.
+        """
+        dfa = self.get(name)
+        dfa.ensure_valid()
+        if vectorized:
+            if include_path:
+                raise ValueError("El motor vectorizado no construye rutas (use include_path=false)")
+            rows = dfa.compile().vectorized().check_words(words, max_length)
+        elif prefix_cache:
+            if include_path:
+                raise ValueError("La memoización por prefijos no construye rutas (use include_path=false)")
+            rows = dfa.compile().prefix_cache().check_words(words, max_length)
+        elif workers > 1 and len(words) > chunk_size:
+            rows = list(check_words_parallel(
+                dfa, words, max_length=max_length, include_path=include_path,
+                workers=workers, chunk_size=chunk_size
+            ))
+        else:
+            rows = dfa.compile().check_words(words, max_length, include_path)
+
+        accepted = [row[0] for row in rows]
+        result = {
+            "automata": name,
+            "count": len(words),
+            "accepted_count": sum(accepted),
+            "accepted": accepted,
+            "reason": [row[1] for row in rows],
+            "position": [row[2] for row in rows]
+        }
+        if include_path:
+            result["path"] = [row[3] for row in rows]
+        return result
+
+    def _stacked_for(self, dfas: List[DFA]) -> StackedDFA:
+        key = tuple((dfa.name, dfa.version) for dfa in dfas)
+        stacked = self._stacked.get(key)
+        if stacked is None:
+            for dfa in dfas:
+                dfa.ensure_valid()
+            stacked = StackedDFA([dfa.compile() for dfa in dfas])
+            # Las versiones viejas nunca vuelven a pedirse: vaciar al llenarse
+            if len(self._stacked) >= MAX_STACKED_TABLES:
+                self._stacked = {}
+            self._stacked[key] = stacked
+        return stacked
+
+    def classify(self, word: str, names: Optional[List[str]] = None,
+                 max_length: int = 10000) -> dict:
+        """Autómatas (de ``names`` o todos) que aceptan ``word``, en una sola pasada."""
+        if len(word) > max_length:
+            raise ValueError(f"Palabra demasiado larga: {len(word)} > {max_length}")
+        snapshot = self.snapshot()
+        selected = sorted(set(names)) if names is not None else sorted(snapshot.dfas)
+        dfas = [snapshot.minimized.get(name) or self._lookup(snapshot, name) for name in selected]
+        return {
+            "word": word,
+            "accepted": self._stacked_for(dfas).classify(word),
+            "checked": len(dfas)
         }
 
-# Singleton sencillo para API/CLI
-store = AutomataStore()
+# Singleton sencillo para API/CLI (AFD_CACHE_DIR activa la caché en disco y
+# AFD_SHARED_REGISTRY=1 la comparte entre workers de uvicorn;
+# AFD_RESULT_CACHE_ENTRIES > 0 activa la caché de resultados de check)
+store = AutomataStore(
+    cache_dir=os.getenv("AFD_CACHE_DIR"),
+    shared=os.getenv("AFD_SHARED_REGISTRY", "0") == "1",
+    result_cache_entries=int(os.getenv("AFD_RESULT_CACHE_ENTRIES", "0")),
+    result_cache_bytes=int(os.getenv("AFD_RESULT_CACHE_BYTES", str(16 * 1024 * 1024)))
+)
@@ -0,0 +1,141 @@
+from __future__ import annotations
+from typing import AsyncIterable, AsyncIterator, List, Optional
+import json
+import time
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+from . import metrics
+from .store import AutomataStore
+
+# Formato de entrada de /check/stream:
+#   - con ``automata`` fijo: una palabra por línea (texto plano)
+#   - sin ``automata``: un registro NDJSON por línea {"automata": ..., "word": ...}
+# Salida: un objeto JSON por línea de entrada, en el mismo orden.
+#
+# La verificación no corre en el event loop: las líneas de cada fragmento
+# recibido (hasta STREAM_BATCH_LINES) se verifican juntas en el threadpool,
+# así un flujo largo no bloquea al resto de las peticiones del worker.
+
+STREAM_BATCH_LINES = 1000
+
+class DuplexStreamingResponse(StreamingResponse):
+    """StreamingResponse que lee el cuerpo de la petición mientras responde.
+
+    La implementación base escucha ``http.disconnect`` en paralelo y compite
+    con ``request.stream()`` por los mensajes de ``receive``; aquí el único
+    consumidor es el propio generador, que detecta la desconexión al leer.
+    """
+
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+async def iter_line_batches(chunks: AsyncIterable[bytes], max_line_length: int,
+                            max_lines: int = STREAM_BATCH_LINES) -> AsyncIterator[List[Optional[str]]]:
+    """Divide un flujo de bytes en líneas sin acumular el cuerpo completo.
+
+    Entrega las líneas completas de cada fragmento recibido en listas de a lo
+    sumo ``max_lines``. Las líneas que superan ``max_line_length`` bytes se
+    descartan y se entregan como ``None`` para que el llamador reporte el error.
+    """
+    buffer = b""
+    overflow = False
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        parts = chunk.split(b"\n")
+        parts[0] = buffer + parts[0]
+        buffer = parts.pop()
+        batch: List[Optional[str]] = []
+        for line in parts:
+            if overflow or len(line) > max_line_length:
+                overflow = False
+                batch.append(None)
+            else:
+                batch.append(line.rstrip(b"\r").decode("utf-8", errors="replace"))
+            if len(batch) >= max_lines:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+        if len(buffer) > max_line_length:
+            # Línea demasiado larga: descartar hasta el siguiente salto
+            buffer = b""
+            overflow = True
+    if overflow:
+        yield [None]
+    elif buffer:
+        yield [buffer.rstrip(b"\r").decode("utf-8", errors="replace")]
+
+async def iter_lines(chunks: AsyncIterable[bytes], max_line_length: int) -> AsyncIterator[Optional[str]]:
+    """Como ``iter_line_batches``, de a una línea."""
+    async for batch in iter_line_batches(chunks, max_line_length):
+        for line in batch:
+            yield line
+
+def _check_lines(store: AutomataStore, lines: List[Optional[str]], first_line: int,
+                 automata: Optional[str], max_length: int, include_path: bool,
+                 max_line_length: int, prefix_cache: bool) -> bytes:
+    """Resultados NDJSON de un lote de líneas (corre fuera del event loop)."""
+    out = []
+    # Métricas del lote por autómata: [segundos, largos, aceptadas]
+    batch_stats = {}
+    clock = time.perf_counter
+    for line_num, line in enumerate(lines, first_line):
+        try:
+            if line is None:
+                raise ValueError(f"Línea demasiado larga (máximo {max_line_length} bytes)")
+            if automata is not None:
+                name, word = automata, line
+            else:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError("Se esperaba un objeto {automata, word}")
+                name, word = record.get("automata"), record.get("word")
+                if not isinstance(name, str) or not isinstance(word, str):
+                    raise ValueError("Los campos 'automata' y 'word' deben ser texto")
+            t0 = clock()
+            result = store.check(name, word, max_length=max_length, include_path=include_path,
+                                 prefix_cache=prefix_cache)
+            stats = batch_stats.get(name)
+            if stats is None:
+                stats = batch_stats[name] = [0.0, [], 0]
+            stats[0] += clock() - t0
+            stats[1].append(len(word))
+            stats[2] += result["accepted"]
+        except KeyError as ke:
+            result = {"error": f"Autómata no encontrado: {ke}"}
+        except ValueError as e:
+            # json.JSONDecodeError también es ValueError
+            result = {"error": f"Error de validación: {e}"}
+        result["line"] = line_num
+        out.append(json.dumps(result, ensure_ascii=False))
+    for name, (seconds, lengths, accepted) in batch_stats.items():
+        metrics.record_checks(name, seconds, lengths, accepted)
+    return ("\n".join(out) + "\n").encode("utf-8") if out else b""
+
+async def check_stream(
+    store: AutomataStore,
+    chunks: AsyncIterable[bytes],
+    automata: Optional[str] = None,
+    max_length: int = 10000,
+    include_path: bool = False,
+    max_line_length: int = 64 * 1024,
+    prefix_cache: bool = False,
+) -> AsyncIterator[bytes]:
+    """Genera una línea NDJSON de resultado por cada línea de entrada."""
+    line_num = 1
+    async for batch in iter_line_batches(chunks, max_line_length):
+        data = await run_in_threadpool(
+            _check_lines, store, batch, line_num, automata, max_length, include_path,
+            max_line_length, prefix_cache
+        )
+        line_num += len(batch)
+        if data:
+            yield data
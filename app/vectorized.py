@@ -0,0 +1,134 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, List, Optional, Sequence
+import numpy as np
+
+if TYPE_CHECKING:
+    from .compiled import CompiledDFA
+
+# Motor vectorizado: avanza el estado de muchas palabras a la vez.
+#
+# Las palabras se codifican en una matriz (palabras × posiciones) de índices de
+# símbolo y en cada paso se indexa la tabla con la columna completa:
+#     estado = T[estado, codigos[:, k]]
+# La tabla tiene dos filas extra (TRAP: sin transición, ERR: símbolo
+# desconocido), absorbentes, y dos columnas extra (UNKNOWN y PAD). PAD es un
+# auto-lazo, así que las palabras cortas se rellenan sin alterar su resultado.
+# Con símbolos de varios caracteres las posiciones dejan de alinearse entre
+# palabras, así que en ese caso se delega en el motor escalar con tokenizador.
+
+# Celdas máximas de la matriz de códigos por bloque (~16MB con int32)
+MAX_BLOCK_CELLS = 4 * 1024 * 1024
+
+class VectorizedDFA:
+    """Tabla de transición en NumPy construida a partir de un ``CompiledDFA``."""
+
+    def __init__(self, compiled: "CompiledDFA") -> None:
+        self.compiled = compiled
+        q = len(compiled.states)
+        n = compiled.n_symbols
+        self.trap = q
+        self.err = q + 1
+        self.unknown = n
+        self.pad = n + 1
+
+        # Tabla de índices de estado (la compilada guarda desplazamientos de fila)
+        flat = np.frombuffer(compiled.table, dtype=np.int32).reshape(q, n)
+        table = np.empty((q + 2, n + 2), dtype=np.int32)
+        table[:q, :n] = np.where(flat < 0, self.trap, flat // max(n, 1))
+        table[:q, self.unknown] = self.err
+        table[:q, self.pad] = np.arange(q, dtype=np.int32)
+        table[self.trap, :] = self.trap
+        table[self.err, :] = self.err
+        self.table = table
+
+        finals = np.zeros(q + 2, dtype=bool)
+        for i in range(q):
+            finals[i] = compiled.is_final(i * n)
+        self.finals = finals
+
+        # Tabla de consulta punto de código -> índice de símbolo
+        single = {ord(a): j for a, j in compiled.symbol_index.items() if len(a) == 1}
+        size = max(single, default=0) + 1
+        lut = np.full(size, self.unknown, dtype=np.int32)
+        for cp, j in single.items():
+            lut[cp] = j
+        self.lut = lut
+
+    def encode(self, words: Sequence[str]) -> np.ndarray:
+        """Codifica palabras en una matriz de índices de símbolo rellenada con PAD."""
+        width = max((len(w) for w in words), default=0)
+        if width == 0:
+            return np.empty((len(words), 0), dtype=np.int32)
+        # Cada fila es la palabra en UTF-32, rellenada con ceros
+        cps = np.array(words, dtype=f"<U{width}").view(np.uint32).reshape(len(words), width)
+        size = len(self.lut)
+        codes = np.where(cps < size, self.lut[np.minimum(cps, size - 1)], self.unknown).astype(np.int32)
+        lengths = np.fromiter((len(w) for w in words), dtype=np.int64, count=len(words))
+        codes[np.arange(width) >= lengths[:, None]] = self.pad
+        return codes
+
+    def run(self, codes: np.ndarray):
+        """Avanza todas las filas; devuelve (estado_final, posición_fallo, estado_previo)."""
+        rows = codes.shape[0]
+        state = np.full(rows, self.compiled.start // max(self.compiled.n_symbols, 1), dtype=np.int32)
+        fail_pos = np.full(rows, -1, dtype=np.int64)
+        fail_from = np.zeros(rows, dtype=np.int32)
+        table = self.table
+        trap = self.trap
+        for k in range(codes.shape[1]):
+            nxt = table[state, codes[:, k]]
+            died = (nxt >= trap) & (state < trap)
+            if died.any():
+                fail_pos[died] = k
+                fail_from[died] = state[died]
+            state = nxt
+        return state, fail_pos, fail_from
+
+    def accepts_many(self, words: Sequence[str]) -> np.ndarray:
+        """Solo aceptación, como arreglo booleano paralelo a ``words``."""
+        if self.compiled.trie_children is not None:
+            return np.array([row[0] for row in self.compiled.check_words(words)], dtype=bool)
+        out = np.zeros(len(words), dtype=bool)
+        for lo, hi in self._blocks(words):
+            state, _, _ = self.run(self.encode(words[lo:hi]))
+            out[lo:hi] = self.finals[state]
+        return out
+
+    def check_words(self, words: Sequence[str], max_length: int = 10000) -> List[tuple]:
+        """Equivalente vectorizado de ``CompiledDFA.check_words`` (sin rutas)."""
+        if self.compiled.trie_children is not None:
+            return self.compiled.check_words(words, max_length)
+        rows: List[Optional[tuple]] = [None] * len(words)
+        index = []
+        for i, word in enumerate(words):
+            if len(word) > max_length:
+                rows[i] = (False, f"#ERR:word_too_long_{len(word)}>_{max_length}", None)
+            else:
+                index.append(i)
+        selected = [words[i] for i in index]
+
+        compiled = self.compiled
+        for lo, hi in self._blocks(selected):
+            block = selected[lo:hi]
+            state, fail_pos, fail_from = self.run(self.encode(block))
+            accepted = self.finals[state]
+            for k, word in enumerate(block):
+                pos = int(fail_pos[k])
+                if pos < 0:
+                    rows[index[lo + k]] = (bool(accepted[k]), None, None)
+                    continue
+                ch = word[pos]
+                if state[k] == self.err:
+                    reason = f"#ERR:unknown_symbol_{ch}_at_pos_{pos}"
+                else:
+                    reason = f"#TRAP:no_transition_from_{compiled.states[fail_from[k]]}_with_{ch}"
+                rows[index[lo + k]] = (False, reason, pos)
+        return rows
+
+    @staticmethod
+    def _blocks(words: Sequence[str]):
+        """Parte la entrada en bloques de filas para acotar la matriz de códigos."""
+        width = max((len(w) for w in words), default=1) or 1
+        step = max(1, MAX_BLOCK_CELLS // width)
+        for lo in range(0, len(words), step):
+            yield lo, min(lo + step, len(words))
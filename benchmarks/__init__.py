@@ -0,0 +1 @@
+"""Benchmarks de rendimiento del sistema AFD (ejecutar con ``python -m benchmarks.<modulo>``)."""
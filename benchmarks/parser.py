@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Mide el throughput del parser (MB/s) sobre archivos sintéticos grandes,
+alimentándolo por fragmentos como hace /upload.
+
+Uso: python -m benchmarks.parser [--automata N] [--states Q] [--symbols S]
+"""
+
+import argparse
+import os
+import tempfile
+
+from app.parser import StreamParser, parse_file, MAX_FILE_SIZE
+from benchmarks.suite import measure
+from benchmarks.synthetic import automata_text
+
+def parse_chunks(data: bytes, chunk_size: int) -> None:
+    parser = StreamParser(max_bytes=None, max_lines=None)
+    for i in range(0, len(data), chunk_size):
+        parser.feed(data[i:i + chunk_size])
+    parser.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--automata", type=int, default=40)
+    parser.add_argument("--states", type=int, default=500)
+    parser.add_argument("--symbols", type=int, default=20)
+    parser.add_argument("--chunk-size", type=int, default=64 * 1024)
+    args = parser.parse_args()
+
+    data = automata_text(args.automata, args.states, args.symbols).encode("utf-8")
+    mb = len(data) / (1024 * 1024)
+    t = measure(lambda: parse_chunks(data, args.chunk_size), 3, len(data))["best_s"]
+    print(f"StreamParser: {mb:.1f}MB en {t:.3f}s => {mb / t:.1f} MB/s")
+
+    # parse_file sobre un archivo dentro del límite de 1MB
+    small = automata_text(max(1, args.automata // 8), 200, 10).encode("utf-8")[:MAX_FILE_SIZE]
+    small = small[:small.rfind(b"\n1:")] + b"\n"  # cortar en un AFD completo
+    with tempfile.NamedTemporaryFile(suffix=".txt", delete=False) as f:
+        f.write(small)
+        path = f.name
+    try:
+        t = measure(lambda: parse_file(path), 1, len(small))["best_s"]
+        print(f"parse_file:   {len(small) / 1e6:.2f}MB en {t:.3f}s => {len(small) / (1024 * 1024) / t:.1f} MB/s")
+    finally:
+        os.unlink(path)
+
+if __name__ == "__main__":
+    main()
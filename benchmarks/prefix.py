@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Mide la memoización por prefijos sobre corpus con prefijos largos
+compartidos, para distintos espaciados de checkpoint. Cada espaciado se
+mide en frío (trie vacío al empezar cada corrida, el costo sobre un corpus
+nuevo) y en caliente (con los prefijos del corpus ya memorizados).
+
+Uso: python -m benchmarks.prefix [--words N] [--prefixes P] [--prefix-len L]
+                                 [--suffix-len S] [--checkpoints 8,16,32]
+"""
+
+import argparse
+
+from app.parser import parse_stream
+from benchmarks.suite import measure
+from benchmarks.synthetic import automaton_lines, prefixed_words
+
+SYMBOLS = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--words", type=int, default=50_000)
+    parser.add_argument("--prefixes", type=int, default=200)
+    parser.add_argument("--prefix-len", type=int, default=120)
+    parser.add_argument("--suffix-len", type=int, default=20)
+    parser.add_argument("--states", type=int, default=50)
+    parser.add_argument("--checkpoints", default="8,16,32")
+    parser.add_argument("--max-nodes", type=int, default=100_000)
+    args = parser.parse_args()
+
+    dfa = parse_stream(["\n".join(automaton_lines("PFX", args.states, len(SYMBOLS))) + "\n"])["PFX"]
+    compiled = dfa.compile()
+    words = prefixed_words(SYMBOLS, args.words, args.prefixes, args.prefix_len, args.suffix_len)
+
+    expected = compiled.check_words(words)
+    t_base = measure(lambda: compiled.check_words(words), 3, len(words))["best_s"]
+    print(f"{args.words} palabras, {args.prefixes} prefijos de {args.prefix_len} + sufijo <= {args.suffix_len}")
+    print(f"  {'sin memoización':<26} {t_base:8.3f}s  {args.words / t_base:12,.0f} palabras/s")
+    for checkpoint in (int(c) for c in args.checkpoints.split(",")):
+        cache = compiled.prefix_cache(checkpoint=checkpoint, max_nodes=args.max_nodes)
+
+        def cold():
+            cache.clear()
+            cache.check_words(words)
+
+        cache.clear()
+        assert cache.check_words(words) == expected
+        stats = cache.stats()
+        t_cold = measure(cold, 3, len(words))["best_s"]
+        t_warm = measure(lambda: cache.check_words(words), 3, len(words))["best_s"]
+        for label, t in (("frío", t_cold), ("caliente", t_warm)):
+            print(f"  {f'checkpoint {checkpoint} ({label})':<26} {t:8.3f}s  {args.words / t:12,.0f} palabras/s"
+                  f"  x{t_base / t:.1f}")
+        print(f"  {'':<26} nodos={stats['nodes']}  retomado en frío={stats['resumed_ratio']:.0%}")
+
+if __name__ == "__main__":
+    main()
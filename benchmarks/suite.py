@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Suite de benchmarks de los caminos críticos: parser, validación,
+simulación, merge, carga en el store y la API (en proceso).
+
+Genera autómatas sintéticos (hasta los límites de DFA.validate: 1000
+estados, 100 símbolos) y corpus de palabras, mide cada operación y guarda
+los resultados en JSON para comparar entre commits.
+
+Uso: python -m benchmarks.suite [--scale small|medium|large] [--output res.json]
+                                [--compare base.json] [--only nombre,...]
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime, timezone
+
+from app.parser import MAX_FILE_SIZE, parse_file, parse_stream
+from app.store import AutomataStore
+from benchmarks.synthetic import automata_text, automaton_lines, random_words
+
+# (estados, símbolos) del autómata grande, autómatas del archivo de carga,
+# palabras y largo máximo del corpus, peticiones a la API
+SCALES = {
+    "small": dict(states=100, symbols=10, automata=4, words=2_000, length=64, requests=200),
+    "medium": dict(states=500, symbols=50, automata=8, words=10_000, length=128, requests=500),
+    "large": dict(states=1000, symbols=100, automata=8, words=50_000, length=256, requests=1_000),
+}
+
+def measure(fn, repeat=5, ops=1):
+    """Ejecuta ``fn`` varias veces; tiempos en segundos y operaciones por segundo."""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    best = min(times)
+    return {
+        "best_s": best,
+        "median_s": statistics.median(times),
+        "runs": repeat,
+        "ops": ops,
+        "ops_per_s": ops / best if best else None,
+    }
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _load_file_text(cfg):
+    """Texto con varios AFDs que entra en el límite de parse_file/load_from_file."""
+    states, symbols = cfg["states"], min(cfg["symbols"], 36)
+    while True:
+        text = automata_text(cfg["automata"], states, symbols)
+        if len(text.encode("utf-8")) <= MAX_FILE_SIZE or states <= 10:
+            return text
+        states = int(states * 0.8)
+
+def benchmarks(cfg):
+    """Genera los datos y devuelve {nombre: (función, operaciones)}."""
+    big_text = "\n".join(automaton_lines("BIG", cfg["states"], cfg["symbols"])) + "\n"
+    big = parse_stream([big_text], max_bytes=None)["BIG"]
+    compiled = big.compile()
+    words = random_words(compiled.symbols, cfg["words"], 0, cfg["length"])
+
+    # Dos mitades del mismo autómata para el merge
+    half_a, half_b = parse_stream([big_text], max_bytes=None)["BIG"], big.copy()
+    items = sorted(big.delta.items())
+    half_a.delta = dict(items[:len(items) // 2])
+    half_b.delta = dict(items[len(items) // 2:])
+    half_a.validate()
+    half_b.validate()
+
+    load_text = _load_file_text(cfg)
+    fd, path = tempfile.mkstemp(suffix=".txt")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(load_text)
+
+    def revalidate():
+        big.invalidate()
+        big.validate()
+
+    def merge_halves():
+        merged = half_a.copy()
+        merged.merge(half_b)
+
+    def load_store():
+        AutomataStore().load_from_file(path)
+
+    cases = {
+        "parse_file": (lambda: parse_file(path), len(load_text.encode("utf-8"))),
+        "parse_stream_max_automaton": (lambda: parse_stream([big_text], max_bytes=None),
+                                       len(big_text.encode("utf-8"))),
+        "dfa_validate": (revalidate, 1),
+        "dfa_simulate": (lambda: [big.simulate(w) for w in words], len(words)),
+        "dfa_accepts": (lambda: [big.accepts(w) for w in words], len(words)),
+        "dfa_merge": (merge_halves, 1),
+        "store_load_from_file": (load_store, 1),
+    }
+    cases.update(_api_benchmarks(cfg, load_text, words[:cfg["requests"]]))
+    return cases, path
+
+def _api_benchmarks(cfg, load_text, words):
+    """Peticiones a la app FastAPI en proceso (sin red), si está disponible."""
+    try:
+        from fastapi.testclient import TestClient
+        from app.api import app
+        from app.store import store
+    except ImportError as e:
+        print(f"API omitida: {e}", file=sys.stderr)
+        return {}
+    client = TestClient(app)
+    store.clear_all()
+    body = load_text.encode("utf-8")
+    client.post("/upload", files={"file": ("bench.txt", body, "text/plain")})
+    name = store.list()[0]
+    api_words = random_words(store.get(name).compile().symbols, len(words), 0, 32, seed=1)
+
+    def check():
+        for w in api_words:
+            client.post("/check", json={"automata": name, "word": w, "include_path": False})
+
+    def check_path():
+        for w in api_words:
+            client.post("/check", json={"automata": name, "word": w})
+
+    def upload():
+        store.clear_all()
+        client.post("/upload", files={"file": ("bench.txt", body, "text/plain")})
+
+    return {
+        "api_check": (check, len(api_words)),
+        "api_check_path": (check_path, len(api_words)),
+        "api_upload": (upload, len(body)),
+    }
+
+def compare(current, base):
+    """Imprime la variación de cada benchmark respecto a una corrida anterior."""
+    print(f"\nComparación con {base.get('commit') or 'base'} ({base.get('scale')}):")
+    for name, res in current["results"].items():
+        previous = base.get("results", {}).get(name)
+        if not previous:
+            print(f"  {name:<28} (nuevo)")
+            continue
+        speedup = previous["best_s"] / res["best_s"] if res["best_s"] else float("inf")
+        label = "más rápido" if speedup > 1.05 else "más lento" if speedup < 0.95 else "igual"
+        print(f"  {name:<28} x{speedup:5.2f}  {label}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", help="Nombres de benchmarks separados por coma")
+    parser.add_argument("--output", "-o", help="Archivo JSON de resultados")
+    parser.add_argument("--compare", help="JSON de una corrida anterior para comparar")
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")  # avisos de completitud/merge del autómata sintético
+    logging.disable(logging.INFO)  # la API registra cada petición
+    cfg = SCALES[args.scale]
+    cases, path = benchmarks(cfg)
+    selected = set(args.only.split(",")) if args.only else None
+
+    results = {}
+    try:
+        for name, (fn, ops) in cases.items():
+            if selected and name not in selected:
+                continue
+            results[name] = measure(fn, args.repeat, ops)
+            r = results[name]
+            print(f"  {name:<28} {r['best_s'] * 1000:10.2f} ms  {r['ops_per_s']:14,.0f} ops/s")
+    finally:
+        os.unlink(path)
+
+    output = {
+        "commit": _commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scale": args.scale,
+        "config": cfg,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(output, f, indent=2)
+        print(f"Resultados guardados en {args.output}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(output, json.load(f))
+
+if __name__ == "__main__":
+    main()
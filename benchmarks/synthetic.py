@@ -0,0 +1,46 @@
+"""
+Generadores de autómatas y corpus sintéticos para los benchmarks.
+"""
+
+import random
+from typing import List
+
+def automaton_lines(name: str, n_states: int, n_symbols: int, seed: int = 0,
+                    transitions_per_line: int = 200) -> List[str]:
+    """Líneas en el formato del enunciado para un AFD completo aleatorio"""
+    rng = random.Random(seed)
+    states = [f"q{i}" for i in range(n_states)]
+    symbols = [f"s{j}" if n_symbols > 36 else "0123456789abcdefghijklmnopqrstuvwxyz"[j]
+               for j in range(n_symbols)]
+    lines = [
+        f"1:{name}:{','.join(states)}",
+        f"2:{name}:{','.join(symbols)}",
+        f"3:{name}:q0",
+        f"4:{name}:{','.join(s for s in states if rng.random() < 0.3) or 'q0'}",
+    ]
+    triples = [f"{s},{a},{rng.choice(states)}" for s in states for a in symbols]
+    for i in range(0, len(triples), transitions_per_line):
+        lines.append(f"5:{name}:{';'.join(triples[i:i + transitions_per_line])}")
+    return lines
+
+def automata_text(n_automata: int, n_states: int, n_symbols: int, seed: int = 0) -> str:
+    """Archivo con ``n_automata`` AFDs independientes"""
+    lines: List[str] = []
+    for k in range(n_automata):
+        lines.extend(automaton_lines(f"SYN{k}", n_states, n_symbols, seed + k))
+        lines.append("")
+    return "\n".join(lines) + "\n"
+
+def random_words(symbols: str, count: int, min_len: int, max_len: int, seed: int = 0) -> List[str]:
+    """Palabras aleatorias sobre ``symbols`` (símbolos de un carácter)"""
+    rng = random.Random(seed)
+    return ["".join(rng.choice(symbols) for _ in range(rng.randint(min_len, max_len)))
+            for _ in range(count)]
+
+def prefixed_words(symbols: str, count: int, n_prefixes: int, prefix_len: int,
+                   suffix_len: int, seed: int = 0) -> List[str]:
+    """Corpus con prefijos largos compartidos (estilo líneas de log)"""
+    rng = random.Random(seed)
+    prefixes = random_words(symbols, n_prefixes, prefix_len, prefix_len, seed)
+    return [rng.choice(prefixes) + "".join(rng.choice(symbols) for _ in range(rng.randint(0, suffix_len)))
+            for _ in range(count)]
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Compara el motor vectorizado (NumPy) con la simulación escalar sobre
+lotes de palabras binarias de igual longitud.
+
+Uso: python -m benchmarks.vectorized [--words N] [--length L]
+"""
+
+import argparse
+import random
+
+from app.dfa import DFA
+from benchmarks.suite import measure
+
+def even_ones() -> DFA:
+    """AFD estilo BIN01: acepta cadenas binarias con cantidad par de unos"""
+    return DFA(
+        name="BIN01",
+        states={"par", "impar"},
+        alphabet={"0", "1"},
+        start="par",
+        finals={"par"},
+        delta={
+            ("par", "0"): "par", ("par", "1"): "impar",
+            ("impar", "0"): "impar", ("impar", "1"): "par",
+        },
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--words", type=int, default=100_000)
+    parser.add_argument("--length", type=int, default=32)
+    args = parser.parse_args()
+
+    random.seed(42)
+    words = ["".join(random.choice("01") for _ in range(args.length)) for _ in range(args.words)]
+    dfa = even_ones()
+    dfa.validate()
+    compiled = dfa.compile()
+    vector = compiled.vectorized()
+
+    engines = [
+        ("DFA.simulate", lambda: [dfa.simulate(w)[0] for w in words]),
+        ("escalar (check_words)", lambda: [row[0] for row in compiled.check_words(words)]),
+        ("vectorizado (NumPy)", lambda: vector.accepts_many(words).tolist()),
+    ]
+    # Los tres motores deben coincidir antes de medirlos
+    expected = engines[0][1]()
+    assert all(fn() == expected for _, fn in engines[1:])
+
+    print(f"{args.words} palabras de longitud {args.length}")
+    times = {name: measure(fn, 3, len(words))["best_s"] for name, fn in engines}
+    t_simulate = times["DFA.simulate"]
+    for name, t in times.items():
+        print(f"  {name:<24} {t:8.3f}s  {args.words / t:12,.0f} palabras/s  x{t_simulate / t:.1f}")
+
+if __name__ == "__main__":
+    main()
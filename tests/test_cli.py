@@ -0,0 +1,58 @@
+"""
+Tests para la verificación masiva de archivos desde el CLI
+"""
+import io
+import struct
+import sys
+import pytest
+from app import cli
+from app.cli import check_file
+from app.store import AutomataStore
+
+@pytest.fixture
+def store(monkeypatch):
+    """Almacén propio del test en lugar del global del módulo."""
+    local = AutomataStore()
+    monkeypatch.setattr(cli, "store", local)
+    return local
+
+def test_check_file_csv_and_binary(tmp_path, store):
+    """CSV y binario con estado final coinciden con la verificación palabra a palabra"""
+    store.load_from_file("data/automatas.txt")
+    words = ["aba", "ab", "abx", "", "b"]
+    path = tmp_path / "words.txt"
+    path.write_bytes("\r\n".join(words).encode("utf-8"))
+
+    out = io.BytesIO()
+    assert check_file("AF04", str(path), out, final_state=True) == (5, 1)
+    lines = out.getvalue().decode("utf-8").splitlines()
+    assert lines[0] == "line,accepted,reason,final_state"
+    assert lines[1] == "1,1,,q1"
+    assert lines[3] == "3,0,#ERR:unknown_symbol_x_at_pos_2,"
+
+    out = io.BytesIO()
+    check_file("AF04", str(path), out, fmt="binary", final_state=True)
+    data = out.getvalue()
+    assert data[:6] == b"AFDR\x01\x01"
+    records = data[-5 * 5:]
+    rows = [struct.unpack_from("<Bi", records, 5 * k) for k in range(5)]
+    expected = [store.check("AF04", w, include_path=False)["accepted"] for w in words]
+    assert [bool(ok) for ok, _ in rows] == expected
+    assert rows[2][1] == -1
+
+def test_main_reports_errors_without_traceback(tmp_path, store, monkeypatch, capsys):
+    path = tmp_path / "words.txt"
+    path.write_text("ab\n", encoding="utf-8")
+
+    monkeypatch.setattr(sys, "argv", ["cli", "-f", "data/automatas.txt", "check", "AF99", "ab"])
+    with pytest.raises(SystemExit) as exc:
+        cli.main()
+    assert exc.value.code == 1
+    assert "Error: No existe el autómata: AF99" in capsys.readouterr().err
+
+    monkeypatch.setattr(sys, "argv", ["cli", "-f", "data/automatas.txt", "check-file", "AF04", str(path),
+                                      "--final-state", "--workers", "2"])
+    with pytest.raises(SystemExit) as exc:
+        cli.main()
+    assert exc.value.code == 1
+    assert "Error: --final-state no está disponible" in capsys.readouterr().err
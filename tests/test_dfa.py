@@ -8,3 +8,112 @@ def test_bin01_even_ones():
     assert bin01.simulate("11")[0] is True        # 2 unos => par
     assert bin01.simulate("10101")[0] is False    # 3 unos => impar
     assert bin01.simulate("101011")[0] is True    # 4 unos => par
+
+def test_compiled_simulation_matches_markers():
+    dfas = parse_file("data/automatas.txt")
+    af04 = dfas["AF04"]
+    compiled = af04.compile()
+    assert compiled is af04.compile()             # se construye una sola vez
+    assert af04.simulate("aba") == (True, ["q0", "q1", "q2", "q1"])
+    assert af04.simulate("bb") == (False, ["q0", "q2", "q0"])
+    ok, path = af04.simulate("abc")
+    assert not ok and path[-1] == "#ERR:unknown_symbol_c_at_pos_2"
+
+def test_minimize_af04():
+    dfas = parse_file("data/automatas.txt")
+    af04 = dfas["AF04"]
+    minimal = af04.minimize()
+    # q0 y q2 son equivalentes (no finales, mismas transiciones por clase)
+    assert minimal.states == {"q0", "q1"}
+    assert minimal.start == "q0" and minimal.finals == {"q1"}
+    for word in ["", "a", "b", "ab", "aba", "abba", "bbbab"]:
+        assert minimal.simulate(word)[0] == af04.simulate(word)[0]
+
+def test_minimize_prunes_unreachable_and_dead():
+    from app.dfa import DFA
+    dfa = DFA(name="test", states={"q0", "q1", "dead", "lost"}, alphabet={"a", "b"},
+              start="q0", finals={"q1"},
+              delta={("q0", "a"): "q1", ("q0", "b"): "dead", ("dead", "a"): "dead",
+                     ("lost", "a"): "q1"})
+    assert dfa.reachable_states() == {"q0", "q1", "dead"}
+    minimal = dfa.minimize()
+    assert minimal.states == {"q0", "q1"}
+    assert minimal.delta == {("q0", "a"): "q1"}
+
+def test_multichar_symbols_longest_match():
+    from app.dfa import DFA
+    dfa = DFA(name="multi", states={"q0", "q1", "q2"}, alphabet={"a", "ab", "10"},
+              start="q0", finals={"q2"},
+              delta={("q0", "a"): "q0", ("q0", "ab"): "q1", ("q1", "10"): "q2"})
+    compiled = dfa.compile()
+    tokens = [(i, compiled.symbols[j]) for i, j in compiled.tokens("aab10")]
+    assert tokens == [(0, "a"), (1, "ab"), (3, "10")]
+    assert dfa.simulate("aab10") == (True, ["q0", "q0", "q1", "q2"])
+    assert dfa.accepts("ab1") == (False, "#ERR:unknown_symbol_1_at_pos_2", 2)
+    assert dfa.accepts("ab10a") == (False, "#TRAP:no_transition_from_q2_with_a", 4)
+
+def test_prefix_cache_matches_plain_run():
+    import random
+    af04 = parse_file("data/automatas.txt")["AF04"]
+    compiled = af04.compile()
+    cache = compiled.prefix_cache(checkpoint=4, max_nodes=8)
+    rng = random.Random(1)
+    base = "abaabbab" * 3
+    words = [base[:rng.randint(0, len(base))] + "".join(rng.choice("abx") for _ in range(rng.randint(0, 6)))
+             for _ in range(300)]
+    for word in words + words:
+        assert cache.accepts(word) == compiled.accepts(word)
+    stats = cache.stats()
+    assert stats["resumed_chars"] > 0 and stats["nodes"] <= 8
+    # Otros parámetros reemplazan el trie
+    assert compiled.prefix_cache(checkpoint=8) is not cache
+
+def test_boolean_operations_product():
+    from itertools import product
+    from app.product import OPERATIONS, combine
+    import pytest
+    parsed = parse_file("data/automatas.txt")
+    af04, example = parsed["AF04"], parsed["EXAMPLE"]
+    words = ["".join(w) for n in range(6) for w in product("ab01", repeat=n)]
+    for op, (arity, accept) in OPERATIONS.items():
+        operands = [af04, example][:arity]
+        result = combine(op, operands, "R")
+        result.validate()
+        alphabet = set().union(*(d.alphabet for d in operands))
+        for word in words:
+            expected = set(word) <= alphabet and accept(*(d.accepts(word)[0] for d in operands))
+            assert result.accepts(word)[0] == expected, (op, word)
+    # Solo las parejas alcanzables y vivas: AF04 y EXAMPLE no comparten símbolos
+    assert len(combine("intersection", [af04, example], "R").states) == 1
+    with pytest.raises(ValueError, match="supera 2 parejas"):
+        combine("union", [af04, example], "R", max_pairs=2)
+
+def test_combine_minimizes_before_state_limit(tmp_path):
+    """Un producto de más de 1000 estados se acepta si su mínimo entra en el límite"""
+    import pytest
+    from app.dfa import DFA
+    from app.product import combine
+    from app.store import AutomataStore
+
+    def cycle(name, n):
+        states = {f"c{i}" for i in range(n)}
+        delta = {(f"c{i}", "a"): f"c{(i + 1) % n}" for i in range(n)}
+        return DFA(name=name, states=states, alphabet={"a"}, start="c0", finals=set(states), delta=delta)
+
+    a, b = cycle("A", 40), cycle("B", 39)
+    with pytest.raises(ValueError, match="supera 1000 parejas"):
+        combine("union", [a, b], "U")
+    assert len(combine("union", [a, b], "U", minimize=True).states) == 1
+
+    lines = []
+    for dfa in (a, b):
+        lines += [f"1:{dfa.name}:{','.join(sorted(dfa.states))}", f"2:{dfa.name}:a",
+                  f"3:{dfa.name}:c0", f"4:{dfa.name}:{','.join(sorted(dfa.finals))}",
+                  f"5:{dfa.name}:" + ";".join(f"{s},{x},{t}" for (s, x), t in dfa.delta.items())]
+    path = tmp_path / "cycles.txt"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    store = AutomataStore()
+    store.load_from_file(str(path))
+    stats = store.combine("union", ["A", "B"], "U", minimize=True)
+    assert stats["states"] == 1 and stats["minimization"]["states_after"] == 1
+    assert store.check("U", "a" * 2000, include_path=False)["accepted"]
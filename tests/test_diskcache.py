@@ -0,0 +1,106 @@
+"""
+Tests para la caché en disco de autómatas compilados
+"""
+import pickle
+import pytest
+from app.diskcache import CompiledCache, decode, encode
+from app.parser import parse_file
+from app.store import AutomataStore
+
+def _definition(dfa):
+    return (dfa.states, dfa.alphabet, dfa.start, dfa.finals, dfa.delta)
+
+def test_encode_decode_roundtrip():
+    """El formato binario reconstruye los mismos AFDs"""
+    dfas = parse_file("data/automatas.txt")
+    restored = decode(encode(dfas.values()))
+    assert set(restored) == set(dfas)
+    for name, dfa in dfas.items():
+        assert _definition(restored[name]) == _definition(dfa)
+        assert restored[name].simulate("aba") == dfa.simulate("aba")
+
+    # Los AFDs restaurados construyen sus conjuntos al usarlos: copias,
+    # merges y pickle siguen viendo la misma definición
+    restored = decode(encode(dfas.values()))
+    copy = restored["AF04"].copy()
+    copy.merge(parse_file("data/automatas.txt")["AF04"])
+    assert copy.version != restored["AF04"].version
+    assert _definition(pickle.loads(pickle.dumps(restored["AF04"]))) == _definition(dfas["AF04"])
+    assert _definition(restored["AF04"]) == _definition(dfas["AF04"])
+
+def test_decode_rejects_corruption():
+    """Un byte alterado invalida la caché"""
+    data = bytearray(encode(parse_file("data/automatas.txt").values()))
+    data[12] ^= 0xFF
+    with pytest.raises(ValueError):
+        decode(bytes(data))
+
+def test_store_warm_restart(tmp_path):
+    """El store se restaura desde la caché, incluidas las cargas posteriores"""
+    upload = tmp_path / "upload.txt"
+    upload.write_text("1:NEW:x,y\n2:NEW:0\n3:NEW:x\n4:NEW:y\n5:NEW:x,0,y\n")
+    cache_dir = str(tmp_path / "cache")
+
+    store = AutomataStore(cache_dir=cache_dir)
+    store._default_file = "data/automatas.txt"
+    store.initialize()
+    store.load_from_file(str(upload))
+
+    restarted = AutomataStore(cache_dir=cache_dir)
+    restarted._default_file = "data/automatas.txt"
+    restarted.initialize()
+    assert restarted.list() == ["AF04", "EXAMPLE", "NEW"]
+    assert restarted.check("NEW", "0")["accepted"] is True
+
+    # Tras limpiar, el reinicio vuelve a los autómatas por defecto y la
+    # caché ya no guarda archivos sin referencias
+    restarted.clear_all()
+    assert not list((tmp_path / "cache").glob("*.afdc"))
+    again = AutomataStore(cache_dir=cache_dir)
+    again._default_file = "data/automatas.txt"
+    again.initialize()
+    assert again.list() == ["AF04", "EXAMPLE"]
+    assert len(list((tmp_path / "cache").glob("*.afdc"))) == 1
+
+    # reset conserva solo el archivo por defecto, que el journal nuevo referencia
+    again.load_from_file(str(upload))
+    assert len(list((tmp_path / "cache").glob("*.afdc"))) == 2
+    again.reset_to_defaults()
+    assert len(list((tmp_path / "cache").glob("*.afdc"))) == 1
+    last = AutomataStore(cache_dir=cache_dir)
+    last._default_file = "data/automatas.txt"
+    last.initialize()
+    assert last.list() == ["AF04", "EXAMPLE"]
+    assert isinstance(again._cache, CompiledCache)
+
+def test_shared_registry_between_workers(tmp_path):
+    """Una carga en un worker es visible en los demás (registro compartido)"""
+    upload = tmp_path / "upload.txt"
+    upload.write_text("1:NEW:x,y\n2:NEW:0\n3:NEW:x\n4:NEW:y\n5:NEW:x,0,y\n")
+    cache_dir = str(tmp_path / "cache")
+
+    workers = []
+    for _ in range(2):
+        worker = AutomataStore(cache_dir=cache_dir, shared=True)
+        worker._default_file = "data/automatas.txt"
+        worker.initialize()
+        workers.append(worker)
+    a, b = workers
+    assert a.list() == b.list() == ["AF04", "EXAMPLE"]
+
+    a.load_from_file(str(upload))
+    assert b.check("NEW", "0")["accepted"] is True
+    # Las tablas leídas de la caché apuntan al archivo mapeado, sin copia
+    assert isinstance(b.get("NEW").compile().table, memoryview)
+
+    b.minimize("AF04")
+    assert len(a.get("AF04").states) == 2
+
+    a.combine("difference", ["AF04", "EXAMPLE"], "DIFF")
+    assert b.check("DIFF", "a")["accepted"] is True
+
+    a.clear_all()
+    assert b.list() == []
+    b.reset_to_defaults()
+    assert a.list() == ["AF04", "EXAMPLE"]
+    assert a.versions()["automata"].keys() == b.versions()["automata"].keys()
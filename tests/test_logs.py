@@ -0,0 +1,75 @@
+"""
+Tests para el logging asíncrono (cola, muestreo, recorte y formato JSON)
+"""
+import io
+import json
+import logging
+import logging.handlers
+import queue
+from app.logs import JsonFormatter, Truncated, _DeferredQueueHandler, log_sampled, truncate
+
+class _Counted:
+    """Argumento que cuenta cuántas veces se convierte a texto."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __str__(self):
+        self.calls += 1
+        return "x"
+
+def _pipeline(name, level=logging.INFO, maxsize=0):
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonFormatter())
+    log_queue = queue.Queue(maxsize)
+    queue_handler = _DeferredQueueHandler(log_queue)
+    logger = logging.getLogger(name)
+    logger.propagate = False
+    logger.setLevel(level)
+    logger.addHandler(queue_handler)
+    return logger, log_queue, queue_handler, handler, stream
+
+def test_queue_defers_formatting_to_listener():
+    """El hilo que registra solo encola; el listener formatea y escribe JSON"""
+    logger, log_queue, _, handler, stream = _pipeline("test.logs.deferred")
+    arg = _Counted()
+    log_sampled(logger, "palabra %s", arg, automata="AF04", accepted=True)
+    assert arg.calls == 0  # todavía sin formatear
+
+    listener = logging.handlers.QueueListener(log_queue, handler)
+    listener.start()
+    listener.stop()
+    entry = json.loads(stream.getvalue())
+    assert entry["message"] == "palabra x"
+    assert entry["automata"] == "AF04" and entry["accepted"] is True
+    assert entry["level"] == "INFO" and arg.calls == 1
+
+def test_sampling_level_and_full_queue():
+    logger, log_queue, queue_handler, _, _ = _pipeline("test.logs.sampling", maxsize=2)
+    for _ in range(100):
+        log_sampled(logger, "nunca", rate=0.0)
+        log_sampled(logger, "debug", level=logging.DEBUG)
+    assert log_queue.empty()
+
+    # Con la cola llena se descarta en lugar de bloquear
+    for _ in range(5):
+        log_sampled(logger, "sí", rate=1.0)
+    assert log_queue.qsize() == 2 and queue_handler.dropped == 3
+
+def test_truncate_word():
+    assert truncate("abc", 5) == "abc"
+    assert truncate("a" * 100, 4) == "aaaa...(100)"
+
+def test_truncated_word_is_lazy(monkeypatch):
+    """La palabra solo se recorta si el registro se formatea"""
+    calls = []
+    monkeypatch.setattr("app.logs.truncate", lambda word: calls.append(word) or word[:4])
+    logger, log_queue, _, _, _ = _pipeline("test.logs.truncated")
+    log_sampled(logger, "palabra %s", Truncated("a" * 100), rate=0.0)
+    log_sampled(logger, "palabra %s", Truncated("a" * 100), level=logging.DEBUG)
+    assert calls == [] and log_queue.empty()
+
+    log_sampled(logger, "palabra %s", Truncated("abcdef"))
+    assert calls == []
+    assert log_queue.get_nowait().getMessage() == "palabra abcd" and calls == ["abcdef"]
@@ -0,0 +1,86 @@
+"""
+Tests para las métricas de /metrics (formato de texto de Prometheus)
+"""
+import threading
+from app.metrics import Counter, Histogram, render
+from app.store import AutomataStore
+
+def test_metrics_aggregate_across_threads():
+    """Cada hilo acumula por separado y la exposición suma todos los fragmentos"""
+    requests = Counter("t_requests_total", "Peticiones", ("route",))
+    latency = Histogram("t_seconds", "Latencia", ("route",), buckets=(0.1, 1.0))
+
+    def work():
+        for _ in range(1000):
+            requests.inc("/check")
+            latency.observe(0.05, "/check")
+            latency.observe(0.5, "/check")
+            latency.observe(5.0, "/check")
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert requests.value("/check") == 4000
+    lines = latency.expose()
+    assert 't_seconds_bucket{route="/check",le="0.1"} 4000' in lines
+    assert 't_seconds_bucket{route="/check",le="1.0"} 8000' in lines
+    assert 't_seconds_bucket{route="/check",le="+Inf"} 12000' in lines
+    assert 't_seconds_count{route="/check"} 12000' in lines
+    assert requests.expose()[:2] == ["# HELP t_requests_total Peticiones",
+                                     "# TYPE t_requests_total counter"]
+
+    requests.reset()
+    assert requests.value("/check") == 0
+
+def test_render_includes_store_size():
+    store = AutomataStore()
+    store.load_from_file("data/automatas.txt")
+    text = render(store.snapshot())
+    assert "afd_store_automata 2\n" in text
+    assert 'afd_store_states{form="original"} 5\n' in text
+
+def test_render_keeps_cached_automata_lazy(tmp_path):
+    """Exponer el tamaño no construye delta ni conjuntos de los AFDs de la caché"""
+    cache_dir = str(tmp_path / "cache")
+    AutomataStore(cache_dir=cache_dir).load_from_file("data/automatas.txt")
+    restored = AutomataStore(cache_dir=cache_dir)
+    restored.load_from_file("data/automatas.txt")
+    snapshot = restored.snapshot()
+    text = render(snapshot)
+    assert 'afd_store_states{form="original"} 5\n' in text
+    assert all("delta" not in vars(d) and "states" not in vars(d) for d in snapshot.dfas.values())
+
+def test_record_checks_once_per_batch():
+    """Un lote se registra con una sola llamada: largos, aceptadas y tiempo promedio"""
+    import asyncio
+    from app import metrics
+    from app.streaming import check_stream
+
+    metrics.reset()
+    metrics.record_checks("T", 0.003, [1, 2, 100], accepted=2)
+    assert metrics.CHECK_RESULTS.value("T", "accepted") == 2
+    assert metrics.CHECK_RESULTS.value("T", "rejected") == 1
+    lengths = metrics.WORD_LENGTH.snapshot("T")
+    assert lengths["count"] == 3 and lengths["sum"] == 103
+    seconds = metrics.SIMULATION_SECONDS.snapshot("T")
+    assert seconds["count"] == 3 and abs(seconds["sum"] - 0.003) < 1e-12
+    # Las tres en el bucket del promedio (0.001)
+    assert seconds["buckets"][metrics.SIMULATION_BUCKETS.index(0.001)] == 3
+
+    store = AutomataStore()
+    store.load_from_file("data/automatas.txt")
+
+    async def chunks():
+        yield b"a\nab\naba\n"
+
+    async def run():
+        return [x async for x in check_stream(store, chunks(), automata="AF04")]
+
+    asyncio.run(run())
+    assert metrics.CHECK_RESULTS.value("AF04", "accepted") == 2
+    assert metrics.CHECK_RESULTS.value("AF04", "rejected") == 1
+    assert metrics.WORD_LENGTH.snapshot("AF04")["sum"] == 6
+    metrics.reset()
@@ -0,0 +1,33 @@
+"""
+Tests para la verificación por lotes en un pool de procesos
+"""
+from app.parallel import _check_chunk, _worker_cache, check_words_parallel
+from app.store import AutomataStore
+
+def test_parallel_batch_preserves_order():
+    """Los resultados en paralelo coinciden con los secuenciales y en orden"""
+    store = AutomataStore()
+    store.load_from_file("data/automatas.txt")
+
+    words = ["a", "ab", "abx", "", "bba", "aab" * 5] * 20
+    sequential = store.check_many("AF04", words)
+    parallel = store.check_many("AF04", words, workers=2, chunk_size=7)
+    assert parallel == sequential
+
+def test_worker_cache_by_version():
+    """El worker pide la tabla solo cuando no conoce la versión"""
+    store = AutomataStore()
+    store.load_from_file("data/automatas.txt")
+    dfa = store.get("AF04")
+    compiled = dfa.compile()
+
+    _worker_cache.pop("AF04", None)
+    assert _check_chunk("AF04", dfa.version, None, ["a"], 100, False) is None
+    assert _check_chunk("AF04", dfa.version, compiled, ["a"], 100, False) == [(True, None, None)]
+    assert _check_chunk("AF04", dfa.version, None, ["b"], 100, False) == [(False, None, None)]
+    # Una versión nueva invalida la caché del worker
+    dfa.invalidate()
+    assert _check_chunk("AF04", dfa.version, None, ["a"], 100, False) is None
+
+    rows = list(check_words_parallel(dfa, iter(["a", "b"] * 5), workers=2, chunk_size=3))
+    assert [r[0] for r in rows] == [True, False] * 5
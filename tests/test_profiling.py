@@ -0,0 +1,94 @@
+"""
+Tests para el perfilado opcional de peticiones
+"""
+import pstats
+import threading
+import pytest
+from app import profiling
+from app.parser import parse_file
+from app.profiling import ProfileAggregator
+
+@pytest.fixture(params=["cprofile", "setprofile"])
+def per_thread(request, monkeypatch):
+    """Corre el test con cProfile y con el perfil por ``sys.setprofile`` (3.12+)."""
+    if request.param == "setprofile":
+        monkeypatch.setattr(profiling, "_CPROFILE_PER_THREAD", False)
+    elif not profiling._CPROFILE_PER_THREAD:
+        pytest.skip("cProfile es global al proceso en esta versión")
+
+def test_profiled_endpoints_aggregate_stats(tmp_path, per_thread):
+    """Solo se perfila lo pedido o sorteado y el volcado se lee con pstats"""
+    profiler = ProfileAggregator(sample_rate=0.0)
+    assert profiler.dump() is None
+    af04 = parse_file("data/automatas.txt")["AF04"]
+
+    @profiler.profiled("/check", sampled=True)
+    def check(word):
+        return af04.simulate(word)
+
+    check("ab")
+    assert profiler.summary()["profiled_requests"] == 0
+
+    # Marcada por el middleware (cabecera o ?profile=1)
+    profiler.request(True)
+    check("abab")
+    profiler.request(False)
+    # Muestreo del 100%
+    profiler.set_sample_rate(1.0)
+    check("aba")
+
+    summary = profiler.summary()
+    assert summary["by_endpoint"] == {"/check": 2}
+    top = profiler.top(50)
+    assert any("simulate" in row["function"] for row in top)
+    assert top == sorted(top, key=lambda row: row["cumtime"], reverse=True)
+
+    path = tmp_path / "afd.pstats"
+    path.write_bytes(profiler.dump())
+    assert pstats.Stats(str(path)).total_calls > 0
+
+    profiler.reset()
+    assert profiler.top() == [] and profiler.summary()["profiled_requests"] == 0
+    assert profiler.dump() is None
+    with pytest.raises(ValueError):
+        profiler.set_sample_rate(1.5)
+
+def test_request_flag_can_be_disabled():
+    profiler = ProfileAggregator(allow_requests=False)
+
+    @profiler.profiled("/load")
+    def load():
+        return sum(range(100))
+
+    profiler.request(True)
+    load()
+    profiler.request(False)
+    assert profiler.summary()["profiled_requests"] == 0
+
+def _background_spin(stop):
+    while not stop.is_set():
+        sum(range(100))
+
+def test_profile_excludes_other_threads(per_thread):
+    """Lo que corre en otro hilo durante la petición no entra en el perfil"""
+    profiler = ProfileAggregator(sample_rate=1.0)
+    af04 = parse_file("data/automatas.txt")["AF04"]
+
+    @profiler.profiled("/check", sampled=True)
+    def check():
+        for _ in range(2000):
+            af04.simulate("abab")
+
+    stop = threading.Event()
+    worker = threading.Thread(target=_background_spin, args=(stop,))
+    worker.start()
+    try:
+        check()
+    finally:
+        stop.set()
+        worker.join()
+
+    rows = profiler.top(500)
+    assert not any("_background_spin" in row["function"] for row in rows)
+    simulate = [row for row in rows if "dfa.py:" in row["function"] and row["function"].endswith("(simulate)")]
+    assert [(row["primitive_calls"], row["calls"]) for row in simulate] == [(2000, 2000)]
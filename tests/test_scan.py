@@ -0,0 +1,39 @@
+"""
+Tests para el modo búsqueda (subcadenas aceptadas en un texto)
+"""
+import random
+from app.parser import parse_file
+
+def _brute_force(dfa, text, longest, max_match):
+    out = []
+    for i in range(len(text)):
+        ends = [e for e in range(i + 1, min(len(text), i + max_match) + 1) if dfa.accepts(text[i:e])[0]]
+        if longest and ends:
+            out.append((i, ends[-1]))
+        elif not longest:
+            out.extend((i, e) for e in ends)
+    return out
+
+def test_scan_matches_brute_force():
+    """Todas las coincidencias y la más larga por inicio"""
+    af04 = parse_file("data/automatas.txt")["AF04"]
+    rng = random.Random(0)
+    for _ in range(100):
+        text = "".join(rng.choice("ab x") for _ in range(rng.randint(0, 40)))
+        for longest in (False, True):
+            scanner = af04.scanner(longest=longest, max_match=12)
+            assert list(scanner.scan(text)) == _brute_force(af04, text, longest, 12)
+
+def test_scan_file_windows(tmp_path):
+    """El escaneo por ventanas del archivo mapeado da lo mismo que en memoria"""
+    af04 = parse_file("data/automatas.txt")["AF04"]
+    rng = random.Random(1)
+    text = "".join(rng.choice("ab x\n") for _ in range(500))
+    path = tmp_path / "text.txt"
+    path.write_text(text)
+    scanner = af04.scanner(longest=True, max_match=8)
+    stats = {}
+    rows = list(scanner.scan_file(str(path), window=32, stats=stats, with_text=True))
+    assert [(s, e) for s, e, _ in rows] == list(scanner.scan(text))
+    assert all(text[s:e] == match for s, e, match in rows)
+    assert stats == {"bytes": 500, "chars": 500}
@@ -0,0 +1,47 @@
+"""
+Tests para la simulación incremental (DFA.stepper y sesiones)
+"""
+import random
+import pytest
+from app.dfa import DFA
+from app.parser import parse_file
+from app.sessions import SessionManager
+
+def test_stepper_matches_accepts_for_any_split():
+    """Alimentar por partes da lo mismo que verificar la palabra completa"""
+    af04 = parse_file("data/automatas.txt")["AF04"]
+    multi = DFA(name="m", states={"q0", "q1"}, alphabet={"a", "ab", "10"}, start="q0",
+                finals={"q1"}, delta={("q0", "a"): "q1", ("q1", "ab"): "q0",
+                                      ("q0", "10"): "q1", ("q1", "a"): "q1"})
+    rng = random.Random(0)
+    for dfa, symbols in [(af04, "abx"), (multi, "ab10x")]:
+        for _ in range(500):
+            word = "".join(rng.choice(symbols) for _ in range(rng.randint(0, 10)))
+            stepper = dfa.stepper()
+            i = 0
+            while i < len(word):
+                k = rng.randint(1, 3)
+                stepper.feed(word[i:i + k])
+                i += k
+            assert stepper.result() == dfa.accepts(word)
+
+def test_session_manager_ttl_and_max_count():
+    """Las sesiones inactivas expiran y se respeta el máximo"""
+    now = [0.0]
+    af04 = parse_file("data/automatas.txt")["AF04"]
+    manager = SessionManager(ttl=10, max_sessions=2, clock=lambda: now[0])
+
+    first = manager.open(af04)
+    assert manager.feed(first.id, "ab")["state"] == "q2"
+    assert manager.feed(first.id, "a")["accepted"] is True
+
+    second = manager.open(af04)
+    manager.open(af04)  # supera el máximo: se descarta la menos reciente
+    with pytest.raises(KeyError):
+        manager.status(first.id)
+    assert manager.stats()["evicted"] == 1
+
+    now[0] = 11.0
+    with pytest.raises(KeyError):
+        manager.status(second.id)
+    assert manager.stats()["active"] == 0
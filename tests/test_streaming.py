@@ -0,0 +1,71 @@
+"""
+Tests para la verificación en flujo (NDJSON)
+"""
+import asyncio
+import json
+import threading
+from app.store import AutomataStore
+from app.streaming import check_stream, iter_line_batches, iter_lines
+
+async def _chunks(*parts):
+    for p in parts:
+        yield p
+
+async def _collect(agen):
+    return [x async for x in agen]
+
+def _results(out):
+    return [json.loads(line) for line in b"".join(out).splitlines()]
+
+def test_iter_lines_across_chunks():
+    """Las líneas partidas entre fragmentos se reconstruyen"""
+    lines = asyncio.run(_collect(iter_lines(_chunks(b"ab\nc", b"d\r\n\n", b"e"), 10)))
+    assert lines == ["ab", "cd", "", "e"]
+
+def test_iter_lines_overflow():
+    """Las líneas demasiado largas se reportan como None y se descartan"""
+    lines = asyncio.run(_collect(iter_lines(_chunks(b"x" * 8, b"x" * 8, b"\nok\n"), 10)))
+    assert lines == [None, "ok"]
+
+def test_iter_line_batches_per_chunk():
+    """Un lote por fragmento recibido, partido en lotes de a lo sumo max_lines"""
+    batches = asyncio.run(_collect(iter_line_batches(_chunks(b"a\nb\nc\nd", b"e\n"), 10, max_lines=2)))
+    assert batches == [["a", "b"], ["c"], ["de"]]
+
+def test_check_stream_words_and_records():
+    """Una línea de resultado por línea de entrada, en orden"""
+    store = AutomataStore()
+    store.load_from_file("data/automatas.txt")
+
+    out = asyncio.run(_collect(check_stream(store, _chunks(b"a\nab\nabx"), automata="AF04")))
+    results = _results(out)
+    assert [r["accepted"] for r in results] == [True, False, False]
+    assert results[2]["position"] == 2
+
+    body = b'{"automata": "AF04", "word": "a"}\n{"automata": "ZZ", "word": "a"}\nnot json\n'
+    out = asyncio.run(_collect(check_stream(store, _chunks(body))))
+    results = _results(out)
+    assert results[0]["accepted"] is True
+    assert "no encontrado" in results[1]["error"]
+    assert results[2]["line"] == 3 and "error" in results[2]
+
+def test_check_stream_runs_off_the_event_loop():
+    """La verificación corre en el threadpool, no en el hilo del event loop"""
+    store = AutomataStore()
+    store.load_from_file("data/automatas.txt")
+    threads = set()
+    check = store.check
+
+    def spy(*args, **kwargs):
+        threads.add(threading.get_ident())
+        return check(*args, **kwargs)
+
+    store.check = spy
+
+    async def run():
+        out = await _collect(check_stream(store, _chunks(b"a\nab\n", b"aba\n"), automata="AF04"))
+        return out, threading.get_ident()
+
+    out, loop_thread = asyncio.run(run())
+    assert [r["line"] for r in _results(out)] == [1, 2, 3]
+    assert threads and loop_thread not in threads
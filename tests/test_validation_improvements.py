@@ -155,5 +155,258 @@ def test_store_error_handling():
     with pytest.raises(KeyError):
         store.check("nonexistent", "test")
 
+def test_validation_runs_once_per_change():
+    """Test de validación cacheada entre simulaciones"""
+    import warnings
+
+    dfa = DFA(name="test")
+    dfa.states = {"q0", "q1"}
+    dfa.alphabet = {"a"}
+    dfa.start = "q0"
+    dfa.finals = {"q1"}
+    dfa.delta = {("q0", "a"): "q1"}  # Incompleto => warning al validar
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        for _ in range(5):
+            dfa.simulate("a")
+    assert len(caught) == 1
+
+    # Reasignar un atributo obliga a revalidar
+    dfa.start = "q9"
+    with pytest.raises(ValueError, match="estado inicial inválido"):
+        dfa.simulate("a")
+
+    # Modificaciones en sitio requieren invalidate()
+    dfa.start = "q0"
+    dfa.delta[("q1", "a")] = "q0"
+    dfa.invalidate()
+    assert dfa.simulate("aa") == (False, ["q0", "q1", "q0"])
+
+def test_accept_only_check():
+    """Test del modo solo-aceptación (sin trayectoria)"""
+
+    store = AutomataStore()
+    store.load_from_file("data/automatas.txt")
+
+    res = store.check("AF04", "aba", include_path=False)
+    assert res["accepted"] is True
+    assert "path" not in res
+    assert res["reason"] is None and res["position"] is None
+
+    res = store.check("AF04", "abx", include_path=False)
+    assert res["accepted"] is False
+    assert res["reason"] == "#ERR:unknown_symbol_x_at_pos_2"
+    assert res["position"] == 2
+
+    # Mismo resultado que la simulación completa
+    for word in ["", "a", "ab", "abab", "bbab"]:
+        assert store.check("AF04", word, include_path=False)["accepted"] == \
+            store.check("AF04", word)["accepted"]
+
+def test_check_many_columnar():
+    """Test de verificación por lotes en formato columnar"""
+
+    store = AutomataStore()
+    store.load_from_file("data/automatas.txt")
+
+    words = ["a", "ab", "abx", "a" * 20]
+    res = store.check_many("AF04", words, max_length=10)
+    assert res["count"] == 4
+    assert res["accepted"] == [True, False, False, False]
+    assert res["reason"][2] == "#ERR:unknown_symbol_x_at_pos_2"
+    assert res["position"] == [None, None, 2, None]
+    assert "word_too_long" in res["reason"][3]
+    assert "path" not in res
+
+    with pytest.raises(KeyError):
+        store.check_many("nonexistent", words)
+
+def test_store_minimized_keeps_original():
+    """Test de minimización en el store (original disponible para info)"""
+
+    store = AutomataStore()
+    store.load_from_file("data/automatas.txt", minimize=True)
+
+    assert len(store.get("AF04").states) == 2
+    assert len(store.get_original("AF04").states) == 3
+    stats = store.minimization_stats("AF04")
+    assert stats["states_before"] == 3 and stats["states_after"] == 2
+    assert store.check("AF04", "aba")["accepted"] is True
+
+    # Un autómata sin minimizar no tiene cifras
+    store2 = AutomataStore()
+    store2.load_from_file("data/automatas.txt")
+    assert store2.minimization_stats("AF04") is None
+
+def test_stream_parser_chunks_and_line_errors():
+    """Test del parser incremental (fragmentos arbitrarios y errores por línea)"""
+    from app.parser import StreamParser, parse_stream
+
+    with open("data/automatas.txt", "rb") as f:
+        content = f.read()
+    expected = parse_file("data/automatas.txt")
+
+    # Fragmentos de 7 bytes cortan líneas y caracteres UTF-8 por la mitad
+    parser = StreamParser()
+    for i in range(0, len(content), 7):
+        parser.feed(content[i:i + 7])
+    dfas = parser.close()
+    assert dfas.keys() == expected.keys()
+    assert dfas["AF04"].delta == expected["AF04"].delta
+
+    with pytest.raises(ValueError, match="Error en línea 3"):
+        parse_stream([b"1:X:q0\n", b"\n9:X:q0\n"])
+
+    with pytest.raises(ValueError, match="demasiado grande"):
+        parse_stream([b"1:X:q0\n" * 10], max_bytes=20)
+
+def test_incremental_merge_validation(monkeypatch):
+    """Test de merge incremental: solo se valida el delta agregado"""
+    import warnings
+
+    base = DFA(name="inc", states={"q0", "q1"}, alphabet={"a"}, start="q0",
+               finals={"q1"}, delta={("q0", "a"): "q1", ("q1", "a"): "q1"})
+    base.validate()
+    extra = DFA(name="inc", states={"q0", "q2"}, alphabet={"b"}, start="q0",
+                finals=set(), delta={("q0", "b"): "q2"})
+
+    with warnings.catch_warnings(record=True):
+        warnings.simplefilter("always")
+        base.merge(extra)
+    # El resultado queda validado: simular no vuelve a validar
+    validated = []
+    original = DFA.validate
+    monkeypatch.setattr(DFA, "validate", lambda self: (validated.append(self.name), original(self)))
+    assert base.accepts("a") == (True, None, None)
+    assert validated == []
+    monkeypatch.undo()
+    # El contador coincide con el recorrido completo
+    assert base.missing_transitions() == 6 - len(base.delta) == 3
+    assert not base.is_complete()
+
+    # Un conflicto no deja el AFD a medio fusionar
+    bad = DFA(name="inc", states={"q0", "q3"}, alphabet={"a"}, start="q0",
+              finals=set(), delta={("q0", "a"): "q0"})
+    before = (set(base.states), dict(base.delta))
+    with pytest.raises(ValueError, match="conflictos deterministas"):
+        base.merge(bad)
+    assert (base.states, base.delta) == before
+
+def test_store_revalidates_only_loaded(monkeypatch):
+    """Test de que una carga solo revalida los autómatas que trae"""
+    store = AutomataStore()
+    store.load_from_file("data/automatas.txt")
+
+    validated = []
+    original = DFA.validate
+    def spy(self):
+        validated.append(self.name)
+        original(self)
+    monkeypatch.setattr(DFA, "validate", spy)
+
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+        f.write("1:AF04:q0,q9\n2:AF04:a\n3:AF04:q0\n5:AF04:q9,a,q9\n")
+    try:
+        assert store.load_from_file(f.name) == ["AF04"]
+    finally:
+        os.unlink(f.name)
+    # Solo el autómata subido se valida (al parsear); el resto no se toca
+    assert set(validated) == {"AF04"}
+    assert "q9" in store.get("AF04").states
+
+def test_store_snapshots_copy_on_write():
+    """Test de instantáneas: una carga no altera lo que ya leyó otro lector"""
+    store = AutomataStore()
+    store.load_from_file("data/automatas.txt")
+    before = store.snapshot()
+    af04 = store.get("AF04")
+    states = set(af04.states)
+
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+        f.write("1:AF04:q0,q9\n2:AF04:a\n3:AF04:q0\n5:AF04:q9,a,q9\n")
+    try:
+        store.load_from_file(f.name)
+    finally:
+        os.unlink(f.name)
+
+    # La instantánea y el AFD leídos antes siguen intactos
+    assert af04.states == states and before.dfas["AF04"] is af04
+    after = store.snapshot()
+    assert after.generation == before.generation + 1
+    assert "q9" in store.get("AF04").states
+
+    versions = store.versions()
+    assert versions["generation"] == after.generation
+    assert versions["automata"]["AF04"]["version"] == store.get("AF04").version != af04.version
+    assert versions["automata"]["AF04"]["minimized_version"] is None
+
+    # Un merge fallido no publica nada
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+        f.write("1:AF04:q0\n2:AF04:a\n3:AF04:q0\n5:AF04:q0,a,q0\n")
+    try:
+        with pytest.raises(ValueError, match="conflictos deterministas"):
+            store.load_from_file(f.name)
+    finally:
+        os.unlink(f.name)
+    assert store.snapshot() is after
+
+def test_result_cache_lru_and_invalidation():
+    """Test de la caché de resultados: aciertos, LRU e invalidación por versión"""
+    store = AutomataStore(result_cache_entries=2)
+    store.load_from_file("data/automatas.txt")
+
+    first = store.check("AF04", "aba")
+    assert store.check("AF04", "aba") == first
+    store.check("AF04", "aba", include_path=False)
+    stats = store.result_cache_stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 2, 2)
+
+    # Una tercera entrada expulsa la menos usada
+    store.check("AF04", "ab")
+    assert store.result_cache_stats()["evictions"] == 1
+
+    # Tras un merge la versión cambia: no se reutiliza el resultado anterior
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+        f.write("1:AF04:q0,q9\n2:AF04:a\n3:AF04:q0\n4:AF04:q9\n")
+    try:
+        store.load_from_file(f.name)
+    finally:
+        os.unlink(f.name)
+    misses = store.result_cache_stats()["misses"]
+    store.check("AF04", "aba")
+    assert store.result_cache_stats()["misses"] == misses + 1
+
+    store.clear_all()
+    assert store.result_cache_stats()["entries"] == 0
+    assert AutomataStore().result_cache_stats() is None
+
+def test_classify_matches_individual_checks():
+    """Test de classify: una pasada equivale a verificar cada autómata por separado"""
+    store = AutomataStore()
+    store.load_from_file("data/automatas.txt")
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+        # Alfabeto multicarácter (se verifica aparte) y uno con estado muerto
+        f.write("1:MULTI:p0,p1\n2:MULTI:ab,a\n3:MULTI:p0\n4:MULTI:p1\n5:MULTI:p0,ab,p1;p1,a,p0\n\n"
+                "1:DEAD:d0,d1,d2\n2:DEAD:a,b\n3:DEAD:d0\n4:DEAD:d1\n"
+                "5:DEAD:d0,a,d1;d0,b,d2;d1,a,d1;d1,b,d1;d2,a,d2;d2,b,d2\n")
+    try:
+        store.load_from_file(f.name)
+    finally:
+        os.unlink(f.name)
+
+    names = store.list()
+    for word in ["", "a", "ab", "aba", "abab", "0", "01", "ba", "abaab", "x"]:
+        expected = sorted(n for n in names if store.check(n, word, include_path=False)["accepted"])
+        result = store.classify(word)
+        assert result["accepted"] == expected
+        assert result["checked"] == len(names)
+
+    assert store.classify("ab", names=["AF04", "MULTI"])["accepted"] == ["MULTI"]
+    with pytest.raises(KeyError):
+        store.classify("a", names=["NOPE"])
+    with pytest.raises(ValueError):
+        store.classify("aaa", max_length=2)
+
 if __name__ == "__main__":
-    pytest.main([__file__])
\ No newline at end of file
+    pytest.main([__file__])
@@ -0,0 +1,36 @@
+"""
+Tests para el motor vectorizado (NumPy)
+"""
+import random
+import pytest
+from app.dfa import DFA
+from app.store import AutomataStore
+
+pytest.importorskip("numpy")
+
+def test_vectorized_matches_scalar():
+    """Mismos resultados y motivos que la verificación escalar"""
+    dfa = DFA(name="test")
+    dfa.states = {"q0", "q1"}
+    dfa.alphabet = {"a", "b"}
+    dfa.start = "q0"
+    dfa.finals = {"q1"}
+    dfa.delta = {("q0", "a"): "q1", ("q1", "b"): "q0"}  # Incompleto
+    dfa.validate()
+    compiled = dfa.compile()
+
+    random.seed(0)
+    words = ["".join(random.choice("abc") for _ in range(random.randint(0, 8))) for _ in range(500)]
+    words.append("a" * 50)
+    assert compiled.vectorized().check_words(words, max_length=20) == compiled.check_words(words, max_length=20)
+
+def test_store_vectorized_batch():
+    """El lote vectorizado del store coincide con el escalar"""
+    store = AutomataStore()
+    store.load_from_file("data/automatas.txt")
+
+    words = ["a", "ab", "abx", "", "bba", "aab" * 5]
+    assert store.check_many("AF04", words, vectorized=True) == store.check_many("AF04", words)
+
+    with pytest.raises(ValueError, match="no construye rutas"):
+        store.check_many("AF04", words, vectorized=True, include_path=True)